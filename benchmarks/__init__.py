@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for the Lead Qualification API.
+
+Each module is a standalone script run from the project root, e.g.:
+
+    python -m benchmarks.bench_concurrent_scoring
+
+Benchmarks run against a throwaway test database and never call OpenAI.
+"""
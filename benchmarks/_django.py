@@ -0,0 +1,27 @@
+"""Django bootstrap shared by the benchmark scripts."""
+
+import os
+from contextlib import contextmanager
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lead_qualification_api.settings')
+    os.environ.setdefault('SECRET_KEY', 'benchmark-secret-key')
+    # Fake AI clients aren't rate limited; benchmarks that want pacing set these
+    os.environ.setdefault('AI_REQUESTS_PER_MINUTE', '0')
+    os.environ.setdefault('AI_TOKENS_PER_MINUTE', '0')
+    import django
+    django.setup()
+
+
+@contextmanager
+def benchmark_database():
+    """Create a throwaway test database for the duration of a benchmark"""
+    from django.db import connection
+
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,52 @@
+"""
+First scoring run vs re-run of an unchanged batch with the AI response cache.
+
+The second run clears the in-process tier first, so its hits come from the
+database table the way a fresh worker process would see them.
+
+    python -m benchmarks.bench_ai_cache --leads 500 --latency 0.05
+"""
+
+import argparse
+import time
+
+from benchmarks._django import benchmark_database, setup_django
+from benchmarks.fakes import FakeOpenAI
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--leads', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per fake AI call')
+    args = parser.parse_args()
+
+    setup_django()
+    from qualification.ai_cache import ai_response_cache
+    from qualification.models import Lead, Offer
+    from qualification.services import ScoringService
+
+    with benchmark_database():
+        offer = Offer.objects.create(name='Offer', value_props=['24/7 outreach'], ideal_use_cases=['B2B SaaS'])
+        Lead.objects.bulk_create(
+            Lead(name=f'Lead {i}', role='CTO', company=f'Company {i}', industry='SaaS',
+                 location='Remote', linkedin_bio='Bio', upload_batch='bench')
+            for i in range(args.leads)
+        )
+        leads = list(Lead.objects.filter(upload_batch='bench'))
+
+        print(f"{args.leads} leads, {args.latency * 1000:.0f} ms per AI call")
+        print(f"{'run':>8} {'seconds':>10} {'AI calls':>10} {'cache hits':>12}")
+        ai_response_cache.clear()
+        for run in ('first', 'rerun'):
+            if run == 'rerun':
+                ai_response_cache.clear()
+            service = ScoringService()
+            service.openai_client = client = FakeOpenAI(latency=args.latency)
+            start = time.perf_counter()
+            service.score_leads(leads, offer)
+            elapsed = time.perf_counter() - start
+            print(f"{run:>8} {elapsed:>10.2f} {client.calls:>10} {ai_response_cache.stats()['hits']:>12}")
+
+
+if __name__ == '__main__':
+    main()
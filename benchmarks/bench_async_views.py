@@ -0,0 +1,209 @@
+"""
+Sync WSGI workers vs the async views under ASGI, at equal worker counts.
+
+Starts the local OpenAI stub (``manage.py run_openai_stub``) with --latency
+seconds per completion and then, in turn, each server over one throwaway
+database, with --workers processes each:
+
+    wsgi   gunicorn lead_qualification_api.wsgi (sync workers)
+    asgi   gunicorn lead_qualification_api.asgi:application
+           -k uvicorn.workers.UvicornWorker (async views, see asgi.py)
+
+For every --clients level, that many clients keep one POST /score/ each in
+flight for --duration seconds. Every client rescores its own batch of
+--leads leads with "force" and the AI cache off, so each request waits on
+the stub once per lead (AI_SCORING_CONCURRENCY at a time). Reports
+completed requests per second, latency percentiles, failed requests and
+the peak number of threads across the workers (Linux only):
+
+    python -m benchmarks.bench_async_views --workers 2 --clients 8 64 256
+
+SQLite serialises the score writes of all workers; pass --database-url to
+run against PostgreSQL instead.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks._django import setup_django
+
+SERVERS = {
+    'wsgi': ['lead_qualification_api.wsgi'],
+    'asgi': ['lead_qualification_api.asgi:application', '-k', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, process: subprocess.Popen, timeout: float = 30):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with {process.returncode}")
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'{url} did not come up within {timeout:.0f}s')
+
+
+def stop(process: subprocess.Popen):
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def worker_threads(master_pid: int):
+    """Threads across the master's worker processes, or None where /proc is missing"""
+    try:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+            children = f.read().split()
+        return sum(len(os.listdir(f'/proc/{pid}/task')) for pid in children)
+    except OSError:
+        return None
+
+
+async def run_load(base_url: str, offer_id: int, clients: int, duration: float, warmup: float, master_pid: int):
+    import httpx
+
+    latencies = []
+    failures = 0
+    peak_threads = None
+    measuring = False
+
+    async def client(index: int, deadline: float):
+        nonlocal failures
+        payload = {'offer_id': offer_id, 'batch_id': f'bench_{index}', 'force': True}
+        # A connection pool per client: httpcore's pool costs O(connections^2) per request,
+        # which would put one shared pool of hundreds of connections on the measured CPU
+        async with httpx.AsyncClient(timeout=600) as http:
+            while time.monotonic() < deadline:
+                start = time.monotonic()
+                try:
+                    response = await http.post(f'{base_url}/score/', json=payload)
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if measuring:
+                    if ok:
+                        latencies.append(time.monotonic() - start)
+                    else:
+                        failures += 1
+
+    async def sample_threads(deadline: float):
+        nonlocal peak_threads
+        while time.monotonic() < deadline:
+            threads = worker_threads(master_pid)
+            if threads is not None:
+                peak_threads = max(peak_threads or 0, threads)
+            await asyncio.sleep(0.2)
+
+    deadline = time.monotonic() + warmup + duration
+    tasks = [asyncio.ensure_future(client(index, deadline)) for index in range(clients)]
+    tasks.append(asyncio.ensure_future(sample_threads(deadline)))
+    await asyncio.sleep(warmup)
+    measuring = True
+    start = time.monotonic()
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - start
+    return latencies, failures, elapsed, peak_threads
+
+
+def percentile(values, fraction):
+    return sorted(values)[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes per server')
+    parser.add_argument('--clients', type=int, nargs='+', default=[8, 64, 256], help='Concurrent requests')
+    parser.add_argument('--leads', type=int, default=5, help='Leads scored per request')
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds per stub completion')
+    parser.add_argument('--duration', type=float, default=15, help='Measured seconds per level')
+    parser.add_argument('--warmup', type=float, default=3, help='Unmeasured seconds before each level')
+    parser.add_argument('--servers', nargs='+', choices=SERVERS, default=list(SERVERS))
+    parser.add_argument('--database-url', help='Database to use instead of a throwaway SQLite file')
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    os.environ['DATABASE_URL'] = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'bench.sqlite3')}"
+    setup_django()
+    from django.core.management import call_command
+    from qualification.models import Lead, Offer
+
+    call_command('migrate', verbosity=0)
+    offer = Offer.objects.create(name='AI Outreach Automation', value_props=['24/7 outreach'],
+                                 ideal_use_cases=['B2B SaaS'])
+    Lead.objects.bulk_create(
+        Lead(name=f'Lead {client}-{i}', role='Head of Growth', company=f'Company {i}', industry='SaaS',
+             location='Remote', linkedin_bio='Scaling B2B SaaS teams', upload_batch=f'bench_{client}')
+        for client in range(max(args.clients)) for i in range(args.leads)
+    )
+
+    stub_port = free_port()
+    stub = subprocess.Popen([sys.executable, 'manage.py', 'run_openai_stub', '--port', str(stub_port),
+                             '--latency', str(args.latency), '--distribution', 'fixed'],
+                            stdout=subprocess.DEVNULL)
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY='stub',
+        OPENAI_BASE_URL=f'http://127.0.0.1:{stub_port}/v1',
+        AI_CACHE_ENABLED='False',
+        # Every server gets room for all in-flight AI calls; only the request model differs
+        AI_PROCESS_CONCURRENCY=str(max(args.clients) * args.leads),
+        AI_HTTP_POOL_SIZE=str(max(args.clients) * args.leads),
+        DEBUG='False',
+        PROMETHEUS_MULTIPROC_DIR=os.path.join(tmp.name, 'metrics'),
+    )
+    try:
+        wait_for(f'http://127.0.0.1:{stub_port}/', stub)
+        print(f"{args.workers} workers per server, {args.leads} leads per request, "
+              f"{args.latency * 1000:.0f} ms per completion, {args.duration:.0f}s per level")
+        print(f"{'server':>6} {'clients':>8} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'failed':>7} {'threads':>8}")
+        for name in args.servers:
+            port = free_port()
+            server = subprocess.Popen(
+                ['gunicorn', *SERVERS[name], '-w', str(args.workers), '-b', f'127.0.0.1:{port}',
+                 '--timeout', '600', '--backlog', '4096', '--log-level', 'warning'],
+                env=env,
+            )
+            try:
+                base_url = f'http://127.0.0.1:{port}'
+                wait_for(f'{base_url}/', server)
+                for clients in args.clients:
+                    latencies, failures, elapsed, threads = asyncio.run(
+                        run_load(base_url, offer.id, clients, args.duration, args.warmup, server.pid)
+                    )
+                    print(f"{name:>6} {clients:>8} {len(latencies):>9} {len(latencies) / elapsed:>8.1f} "
+                          f"{statistics.median(latencies) * 1000 if latencies else float('nan'):>8.0f} "
+                          f"{percentile(latencies, 0.95) * 1000:>8.0f} {failures:>7} "
+                          f"{threads if threads is not None else '-':>8}")
+            finally:
+                stop(server)
+    finally:
+        stop(stub)
+        tmp.cleanup()
+
+
+if __name__ == '__main__':
+    main()
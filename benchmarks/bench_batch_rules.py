@@ -0,0 +1,70 @@
+"""
+Rule scoring of stored leads: per-object methods vs the vectorized engine.
+
+Both paths include loading the leads from the database. The engine result is
+cross-checked against ScoringService for every lead.
+
+    python -m benchmarks.bench_batch_rules --leads 200000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks._django import benchmark_database, setup_django
+
+ROLES = ['CEO', 'VP Sales', 'Head of Growth', 'Marketing Manager', 'Senior Analyst', 'Engineer', 'Intern', '']
+INDUSTRIES = ['SaaS', 'Software', 'Fintech', 'Healthcare', 'Retail', 'Manufacturing', 'B2B Services', '']
+LOCATIONS = ['New York', 'London', 'Remote', '']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--leads', type=int, default=200000)
+    args = parser.parse_args()
+
+    setup_django()
+    from qualification.batch_scoring import score_rules_for_queryset
+    from qualification.models import Lead, Offer
+    from qualification.services import ScoringService
+
+    rng = random.Random(11)
+    with benchmark_database():
+        offer = Offer.objects.create(name='Offer', value_props=[], ideal_use_cases=['B2B SaaS', 'mid-market'])
+        for start in range(0, args.leads, 10000):
+            Lead.objects.bulk_create(
+                Lead(
+                    name=f'Lead {i}', role=rng.choice(ROLES), company=rng.choice(['Acme', '']),
+                    industry=rng.choice(INDUSTRIES), location=rng.choice(LOCATIONS),
+                    linkedin_bio=rng.choice(['', f'Bio {i}']), upload_batch='bench',
+                )
+                for i in range(start, min(start + 10000, args.leads))
+            )
+        leads = Lead.objects.filter(upload_batch='bench')
+        service = ScoringService()
+
+        print(f"{args.leads} leads")
+        print(f"{'path':>12} {'seconds':>10} {'leads/s':>12}")
+
+        start = time.perf_counter()
+        per_object = {}
+        for lead in leads.order_by().iterator(chunk_size=5000):
+            per_object[lead.id] = (
+                service._calculate_role_score(lead.role),
+                service._calculate_industry_score(lead.industry, offer),
+                service._calculate_completeness_score(lead),
+            )
+        elapsed = time.perf_counter() - start
+        print(f"{'per-object':>12} {elapsed:>10.2f} {args.leads / elapsed:>12.0f}")
+
+        start = time.perf_counter()
+        batch = score_rules_for_queryset(leads, offer)
+        elapsed = time.perf_counter() - start
+        print(f"{'vectorized':>12} {elapsed:>10.2f} {args.leads / elapsed:>12.0f}")
+
+        assert batch.as_dict() == per_object
+        print("cross-check: identical")
+
+
+if __name__ == '__main__':
+    main()
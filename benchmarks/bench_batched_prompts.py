@@ -0,0 +1,62 @@
+"""
+AI requests and tokens per batch with single-lead vs multi-lead prompts.
+
+Token counts are estimated by the fake client (about four characters per
+token); the offer context and instructions are paid once per request.
+
+    python -m benchmarks.bench_batched_prompts --leads 200 --batch-sizes 1 5 10 20
+"""
+
+import argparse
+import time
+
+from benchmarks._django import benchmark_database, setup_django
+from benchmarks.fakes import FakeOpenAI
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--leads', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.02, help='Seconds per fake AI call')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 5, 10, 20])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import override_settings
+    from qualification.ai_cache import ai_response_cache
+    from qualification.models import Lead, LeadScore, Offer
+    from qualification.services import ScoringService
+
+    with benchmark_database():
+        offer = Offer.objects.create(
+            name='AI Outreach Automation',
+            value_props=['24/7 outreach', '6x more meetings', 'Automated follow-ups'],
+            ideal_use_cases=['B2B SaaS', 'mid-market', 'sales teams'],
+        )
+        Lead.objects.bulk_create(
+            Lead(name=f'Lead {i}', role='Head of Growth', company=f'Company {i}', industry='SaaS',
+                 location='Remote', linkedin_bio='Scaling B2B SaaS teams with data-driven outbound.',
+                 upload_batch='bench')
+            for i in range(args.leads)
+        )
+        leads = list(Lead.objects.filter(upload_batch='bench'))
+
+        print(f"{args.leads} leads, {args.latency * 1000:.0f} ms per AI call")
+        print(f"{'batch size':>10} {'requests':>10} {'prompt tok':>11} {'total tok':>10} {'seconds':>9}")
+        for batch_size in args.batch_sizes:
+            ai_response_cache.clear()
+            LeadScore.objects.all().delete()
+            service = ScoringService()
+            service.openai_client = client = FakeOpenAI(latency=args.latency)
+            with override_settings(AI_PROMPT_BATCH_SIZE=batch_size, AI_CACHE_ENABLED=False):
+                start = time.perf_counter()
+                scored, errors = service.score_leads(leads, offer)
+                elapsed = time.perf_counter() - start
+            assert len(scored) == args.leads and not errors
+            assert not LeadScore.objects.filter(ai_reasoning__contains='AI unavailable').exists()
+            print(f"{batch_size:>10} {client.calls:>10} {client.prompt_tokens:>11} "
+                  f"{client.prompt_tokens + client.completion_tokens:>10} {elapsed:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
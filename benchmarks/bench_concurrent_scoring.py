@@ -0,0 +1,63 @@
+"""
+Sequential vs concurrent AI scoring against a fake OpenAI client.
+
+    python -m benchmarks.bench_concurrent_scoring --leads 200 --latency 0.05
+"""
+
+import argparse
+import time
+
+from benchmarks._django import benchmark_database, setup_django
+from benchmarks.fakes import FakeOpenAI
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--leads', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per fake AI call')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import override_settings
+    from qualification.models import Lead, Offer
+    from qualification.services import ScoringService
+
+    with benchmark_database():
+        offer = Offer.objects.create(
+            name='AI Outreach Automation',
+            value_props=['24/7 outreach', '6x more meetings'],
+            ideal_use_cases=['B2B SaaS', 'mid-market'],
+        )
+        Lead.objects.bulk_create(
+            Lead(
+                name=f'Lead {i}', role='Head of Growth', company=f'Company {i}',
+                industry='SaaS', location='Remote', linkedin_bio='Scaling B2B SaaS teams',
+                upload_batch='bench',
+            )
+            for i in range(args.leads)
+        )
+        leads = list(Lead.objects.filter(upload_batch='bench'))
+
+        print(f"{args.leads} leads, {args.latency * 1000:.0f} ms per AI call")
+        print(f"{'concurrency':>12} {'seconds':>10} {'leads/s':>10} {'speedup':>10}")
+        baseline = None
+        for concurrency in args.concurrency:
+            service = ScoringService()
+            service.openai_client = FakeOpenAI(latency=args.latency)
+
+            # Every level sends every AI request; cached answers would make later levels look faster
+            with override_settings(AI_CACHE_ENABLED=False):
+                start = time.perf_counter()
+                scored, errors = service.score_leads(leads, offer, concurrency=concurrency)
+                elapsed = time.perf_counter() - start
+
+            assert len(scored) == args.leads and not errors, errors[:3]
+            assert service.openai_client.calls == args.leads, service.openai_client.calls
+            baseline = baseline or elapsed
+            print(f"{concurrency:>12} {elapsed:>10.2f} {args.leads / elapsed:>10.1f} "
+                  f"{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
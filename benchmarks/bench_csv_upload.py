@@ -0,0 +1,96 @@
+"""
+Peak memory and rows/second for CSV lead ingestion.
+
+Compares the previous whole-file, one-INSERT-per-row upload with the
+streaming ``LeadImportService``. Peak memory is Python heap measured with
+tracemalloc.
+
+    python -m benchmarks.bench_csv_upload --rows 100000
+"""
+
+import argparse
+import csv
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks._django import benchmark_database, setup_django
+
+ROLES = ['CEO', 'VP Sales', 'Head of Growth', 'Marketing Manager', 'Analyst', 'Engineer']
+INDUSTRIES = ['SaaS', 'Fintech', 'Healthcare', 'Retail', 'Manufacturing']
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['name', 'role', 'company', 'industry', 'location', 'linkedin_bio'])
+        for i in range(rows):
+            writer.writerow([
+                f'Lead {i}', ROLES[i % len(ROLES)], f'Company {i % 5000}',
+                INDUSTRIES[i % len(INDUSTRIES)], 'Remote',
+                f'Experienced professional #{i} working on growth, revenue and data-driven go-to-market.',
+            ])
+
+
+def legacy_import(csv_file, batch_id):
+    """The upload path before streaming ingestion"""
+    from qualification.models import Lead
+
+    file_content = csv_file.read().decode('utf-8')
+    csv_reader = csv.DictReader(io.StringIO(file_content))
+    created = 0
+    for row in csv_reader:
+        lead_data = {key: row.get(key, '').strip() for key in
+                     ['name', 'role', 'company', 'industry', 'location', 'linkedin_bio']}
+        Lead.objects.create(upload_batch=batch_id, **lead_data)
+        created += 1
+    return created
+
+
+def streaming_import(csv_file, batch_id):
+    from qualification.services import LeadImportService
+
+    created, _ = LeadImportService(batch_id, max_leads=10 ** 9).import_csv(csv_file)
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.files import File
+    from qualification.models import Lead
+
+    with tempfile.TemporaryDirectory() as tmp, benchmark_database():
+        path = os.path.join(tmp, 'leads.csv')
+        write_csv(path, args.rows)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+
+        print(f"{args.rows} rows, {size_mb:.1f} MB")
+        print(f"{'path':>10} {'seconds':>10} {'rows/s':>10} {'peak MB':>10}")
+        def timed_run(run, name):
+            with open(path, 'rb') as f:
+                start = time.perf_counter()
+                created = run(File(f, name='leads.csv'), f'bench_{name}')
+                elapsed = time.perf_counter() - start
+            assert created == args.rows, created
+            return elapsed
+
+        for name, run in (('legacy', legacy_import), ('streaming', streaming_import)):
+            # tracemalloc slows allocation-heavy code, so time and trace separately
+            Lead.objects.all().delete()
+            elapsed = timed_run(run, name)
+            Lead.objects.all().delete()
+            tracemalloc.start()
+            timed_run(run, name)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:>10} {elapsed:>10.2f} {args.rows / elapsed:>10.0f} {peak / 1024 / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
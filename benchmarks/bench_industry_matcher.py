@@ -0,0 +1,104 @@
+"""
+Industry scoring: original per-lead loops vs the per-offer IndustryMatcher.
+
+Cross-checks both implementations on randomized offers and industries, then
+times scoring a batch of leads against one offer.
+
+    python -m benchmarks.bench_industry_matcher --leads 200000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks._django import setup_django
+
+TERMS = ['SaaS', 'software', 'Technology', 'tech', 'B2B', 'enterprise', 'mid-market', 'SMB', 'fintech',
+         'Financial Services', 'banking', 'healthcare', 'Medical Devices', 'ecommerce', 'Retail', 'online',
+         'marketplace', 'IT', 'digital', 'Manufacturing', 'Logistics', 'Education', 'Real Estate', 'corporate']
+
+
+def legacy_industry_score(industry, ideal_use_cases):
+    """The industry scoring implementation before IndustryMatcher"""
+    if not industry or not ideal_use_cases:
+        return 0
+    industry_lower = industry.lower()
+    for use_case in ideal_use_cases:
+        if use_case.lower() in industry_lower or industry_lower in use_case.lower():
+            return 20
+    adjacent_mappings = {
+        'saas': ['software', 'technology', 'tech', 'b2b', 'enterprise'],
+        'software': ['saas', 'technology', 'tech', 'it', 'digital'],
+        'technology': ['software', 'saas', 'tech', 'it', 'digital'],
+        'b2b': ['saas', 'enterprise', 'business', 'corporate'],
+        'enterprise': ['b2b', 'corporate', 'business', 'large'],
+        'mid-market': ['medium', 'middle', 'smb', 'small business'],
+        'fintech': ['finance', 'financial', 'banking', 'payments'],
+        'healthcare': ['medical', 'health', 'pharma', 'biotech'],
+        'ecommerce': ['retail', 'commerce', 'online', 'marketplace'],
+    }
+    for use_case in ideal_use_cases:
+        use_case_lower = use_case.lower()
+        for key, adjacents in adjacent_mappings.items():
+            if key in use_case_lower:
+                for adjacent in adjacents:
+                    if adjacent in industry_lower:
+                        return 10
+            elif key in industry_lower:
+                for adjacent in adjacents:
+                    if adjacent in use_case_lower:
+                        return 10
+    return 0
+
+
+def random_phrase(rng, max_terms=3):
+    return ' '.join(rng.choice(TERMS) for _ in range(rng.randint(1, max_terms)))
+
+
+def cross_check(rng, offers=2000, industries_per_offer=200):
+    from qualification.matchers import IndustryMatcher
+
+    checked = 0
+    for _ in range(offers):
+        use_cases = [random_phrase(rng) for _ in range(rng.randint(0, 4))]
+        matcher = IndustryMatcher(use_cases)
+        for _ in range(industries_per_offer):
+            industry = random_phrase(rng, max_terms=2) if rng.random() < 0.95 else ''
+            expected = legacy_industry_score(industry, use_cases)
+            assert matcher.score(industry) == expected, (use_cases, industry)
+            checked += 1
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--leads', type=int, default=200000)
+    args = parser.parse_args()
+
+    setup_django()
+    from qualification.matchers import IndustryMatcher
+
+    rng = random.Random(7)
+    print(f"cross-checked {cross_check(rng)} offer/industry pairs: identical")
+
+    use_cases = ['B2B SaaS mid-market', 'Fintech', 'Healthcare providers']
+    industries = [random_phrase(rng, max_terms=2) for _ in range(args.leads)]
+    print(f"{args.leads} leads against one offer")
+    print(f"{'matcher':>10} {'seconds':>10} {'leads/s':>12}")
+
+    start = time.perf_counter()
+    for industry in industries:
+        legacy_industry_score(industry, use_cases)
+    elapsed = time.perf_counter() - start
+    print(f"{'legacy':>10} {elapsed:>10.2f} {args.leads / elapsed:>12.0f}")
+
+    start = time.perf_counter()
+    matcher = IndustryMatcher(use_cases)
+    for industry in industries:
+        matcher.score(industry)
+    elapsed = time.perf_counter() - start
+    print(f"{'compiled':>10} {elapsed:>10.2f} {args.leads / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
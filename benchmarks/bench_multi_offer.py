@@ -0,0 +1,85 @@
+"""
+Scoring one batch against several offers: separate runs vs one matrix run.
+
+``separate`` calls score_leads() once per offer, as repeated /score
+requests would, loading the leads and computing role, completeness and
+prompt context every time. ``matrix`` uses score_leads_for_offers(), which
+loads each chunk of leads once and shares those features across offers.
+Both run with the rule-based fallback (``--ai none``) or a fake AI client
+with --latency seconds per call.
+
+    python -m benchmarks.bench_multi_offer --leads 5000 --offers 10
+    python -m benchmarks.bench_multi_offer --leads 2000 --offers 10 --ai fake --latency 0.002
+"""
+
+import argparse
+import time
+
+from benchmarks._django import benchmark_database, setup_django
+from benchmarks.fakes import FakeOpenAI
+
+INDUSTRIES = ['SaaS', 'Fintech', 'Retail', 'Healthcare', 'Manufacturing', 'Logistics', 'Education']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--leads', type=int, default=5000)
+    parser.add_argument('--offers', type=int, default=10)
+    parser.add_argument('--ai', choices=['none', 'fake'], default='none')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds per fake AI call')
+    parser.add_argument('--concurrency', type=int, default=8)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test.utils import override_settings
+    from qualification.models import Lead, LeadScore, Offer
+    from qualification.services import ScoringService
+
+    with benchmark_database(), override_settings(AI_CACHE_ENABLED=False):
+        offers = [
+            Offer.objects.create(name=f'Offer {i}', value_props=['Faster onboarding'],
+                                 ideal_use_cases=[INDUSTRIES[i % len(INDUSTRIES)], 'mid-market'])
+            for i in range(args.offers)
+        ]
+        Lead.objects.bulk_create(
+            Lead(name=f'Lead {i}', role=('VP Sales', 'Head of Growth', 'Engineer', 'Analyst')[i % 4],
+                 company=f'Company {i}', industry=INDUSTRIES[i % len(INDUSTRIES)], location='Remote',
+                 linkedin_bio='Building go-to-market teams', upload_batch='bench')
+            for i in range(args.leads)
+        )
+
+        def separate(service):
+            for offer in offers:
+                service.score_leads(Lead.objects.filter(upload_batch='bench'), offer, concurrency=args.concurrency)
+
+        def matrix(service):
+            service.score_leads_for_offers(Lead.objects.filter(upload_batch='bench'), offers,
+                                           concurrency=args.concurrency)
+
+        pairs = args.leads * args.offers
+        print(f"{args.leads} leads x {args.offers} offers, AI: {args.ai}"
+              + (f" ({args.latency * 1000:.1f} ms/call, concurrency {args.concurrency})" if args.ai == 'fake' else ''))
+        print(f"{'path':>10} {'seconds':>8} {'scores/s':>9} {'queries':>8} {'AI calls':>9}")
+        for name, run in (('separate', separate), ('matrix', matrix)):
+            LeadScore.objects.all().delete()
+            service = ScoringService()
+            service.openai_client = FakeOpenAI(latency=args.latency) if args.ai == 'fake' else None
+            queries = 0
+
+            def count_queries(execute, sql, params, many, context):
+                nonlocal queries
+                queries += 1
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count_queries):
+                start = time.perf_counter()
+                run(service)
+                elapsed = time.perf_counter() - start
+            assert LeadScore.objects.count() == pairs
+            calls = service.openai_client.calls if service.openai_client else 0
+            print(f"{name:>10} {elapsed:>8.2f} {pairs / elapsed:>9.0f} {queries:>8} {calls:>9}")
+
+
+if __name__ == '__main__':
+    main()
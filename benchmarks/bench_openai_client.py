@@ -0,0 +1,74 @@
+"""
+Per-request vs process-wide pooled OpenAI client.
+
+Simulates --requests sequential /score calls of --leads leads each against
+a local chat-completions server. ``per-request`` builds a new client for
+every call, as ScoringService used to; ``pooled`` shares one client like
+``get_openai_client()``. The server sleeps --handshake on every new
+connection to stand in for TCP + TLS setup.
+
+    python -m benchmarks.bench_openai_client --requests 200 --leads 5
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks._django import benchmark_database, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='/score calls to simulate')
+    parser.add_argument('--leads', type=int, default=5, help='Leads scored per call')
+    parser.add_argument('--latency', type=float, default=0.02, help='Seconds per completion')
+    parser.add_argument('--handshake', type=float, default=0.03, help='Seconds per new connection')
+    parser.add_argument('--concurrency', type=int, default=4)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import override_settings
+    from qualification.ai_stub import OpenAIStubServer
+    from qualification.models import Lead, Offer
+    from qualification.openai_client import build_openai_client
+    from qualification.services import ScoringService
+
+    server = OpenAIStubServer(latency=args.latency, handshake=args.handshake).start()
+    with benchmark_database(), override_settings(AI_CACHE_ENABLED=False):
+        offer = Offer.objects.create(name='Offer', value_props=['24/7 outreach'], ideal_use_cases=['B2B SaaS'])
+        Lead.objects.bulk_create(
+            Lead(name=f'Lead {i}', role='CTO', company=f'Company {i}', industry='SaaS',
+                 location='Remote', linkedin_bio='Bio', upload_batch='bench')
+            for i in range(args.leads)
+        )
+        leads = list(Lead.objects.filter(upload_batch='bench'))
+        pooled = build_openai_client('bench-key', base_url=server.base_url)
+        clients = {
+            'per-request': lambda: build_openai_client('bench-key', base_url=server.base_url),
+            'pooled': lambda: pooled,
+        }
+
+        print(f"{args.requests} calls x {args.leads} leads, {args.latency * 1000:.0f} ms per completion, "
+              f"{args.handshake * 1000:.0f} ms per new connection, concurrency {args.concurrency}")
+        print(f"{'client':>12} {'seconds':>8} {'p50 ms':>8} {'p95 ms':>8} {'connections':>12} {'completions':>12}")
+        for name, client_for_call in clients.items():
+            server.reset_counts()
+            timings = []
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                call_start = time.perf_counter()
+                service = ScoringService()
+                service.openai_client = client_for_call()
+                scored, errors = service.score_leads(leads, offer, concurrency=args.concurrency)
+                timings.append(time.perf_counter() - call_start)
+                assert not errors, errors[:3]
+            elapsed = time.perf_counter() - start
+            timings.sort()
+            print(f"{name:>12} {elapsed:>8.2f} {statistics.median(timings) * 1000:>8.1f} "
+                  f"{timings[int(len(timings) * 0.95)] * 1000:>8.1f} {server.connections:>12} {server.requests:>12}")
+        pooled.close()
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
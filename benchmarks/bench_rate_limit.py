@@ -0,0 +1,69 @@
+"""
+Goodput against an API that enforces a requests-per-minute limit with 429s.
+
+The fake server admits --server-rpm requests per minute (one second of
+burst) and rejects the rest with retry-after-ms. Three client setups score
+the same leads:
+
+    no-retry   previous behaviour: a 429 falls straight back to rule scoring
+    retry      backoff honouring Retry-After, no client-side pacing
+    limited    retries plus the token bucket set to the server's limit
+
+    python -m benchmarks.bench_rate_limit --leads 300 --server-rpm 1200
+"""
+
+import argparse
+import time
+
+from benchmarks._django import benchmark_database, setup_django
+from benchmarks.fakes import RateLimitedFakeOpenAI
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--leads', type=int, default=300)
+    parser.add_argument('--server-rpm', type=int, default=1200)
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per fake AI call')
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test.utils import override_settings
+    from qualification.models import Lead, LeadScore, Offer
+    from qualification.rate_limit import openai_limiter
+    from qualification.services import ScoringService
+
+    scenarios = {
+        'no-retry': {'AI_MAX_RETRIES': 0},
+        'retry': {'AI_MAX_RETRIES': 8},
+        'limited': {'AI_MAX_RETRIES': 8, 'AI_REQUESTS_PER_MINUTE': args.server_rpm},
+    }
+
+    with benchmark_database():
+        offer = Offer.objects.create(name='Offer', value_props=['24/7 outreach'], ideal_use_cases=['B2B SaaS'])
+        Lead.objects.bulk_create(
+            Lead(name=f'Lead {i}', role='CTO', company=f'Company {i}', industry='SaaS',
+                 location='Remote', linkedin_bio='Bio', upload_batch='bench')
+            for i in range(args.leads)
+        )
+        leads = list(Lead.objects.filter(upload_batch='bench'))
+
+        print(f"{args.leads} leads, server limit {args.server_rpm} rpm, concurrency {args.concurrency}")
+        print(f"{'client':>10} {'seconds':>8} {'AI/min':>8} {'429s':>6} {'fallbacks':>10} {'final limit':>12}")
+        for name, overrides in scenarios.items():
+            with override_settings(AI_CACHE_ENABLED=False, AI_SCORING_CONCURRENCY=args.concurrency, **overrides):
+                openai_limiter.reset()
+                service = ScoringService()
+                service.openai_client = client = RateLimitedFakeOpenAI(args.server_rpm, latency=args.latency)
+                start = time.perf_counter()
+                service.score_leads(leads, offer)
+                elapsed = time.perf_counter() - start
+
+                fallbacks = LeadScore.objects.filter(ai_reasoning__startswith='AI unavailable').count()
+                answered = args.leads - fallbacks
+                print(f"{name:>10} {elapsed:>8.2f} {answered / elapsed * 60:>8.0f} {client.rejected:>6} "
+                      f"{fallbacks:>10} {openai_limiter.concurrency.limit:>12}")
+
+
+if __name__ == '__main__':
+    main()
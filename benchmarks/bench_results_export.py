@@ -0,0 +1,129 @@
+"""
+Time-to-first-byte and peak RSS for /results/export.
+
+Compares the previous buffered export (every LeadScore, Lead and Offer
+loaded and the whole CSV built in an HttpResponse) with the streaming
+view. The parent seeds a SQLite file; each measurement runs in a fresh
+subprocess so peak RSS is not polluted by seeding or by the other path.
+RSS is reported as growth over the process baseline after Django setup.
+
+    python -m benchmarks.bench_results_export --rows 10000 100000 300000
+"""
+
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks._django import setup_django
+
+
+def legacy_export(request):
+    """The export view before streaming"""
+    from django.http import HttpResponse
+    from qualification.models import LeadScore
+    from qualification.reasoning import build_reasoning
+    from qualification.views import filter_results
+
+    queryset = filter_results(LeadScore.objects.select_related('lead', 'offer'), request.GET)
+    response = HttpResponse(content_type='text/csv')
+    writer = csv.writer(response)
+    writer.writerow(['Name', 'Role', 'Company', 'Industry', 'Location',
+                     'Intent', 'Score', 'Rule Score', 'AI Score', 'Reasoning'])
+    for score in queryset:
+        writer.writerow([
+            score.lead.name, score.lead.role, score.lead.company, score.lead.industry, score.lead.location,
+            score.intent_label, score.total_score, score.rule_score, score.ai_score,
+            build_reasoning(score.role_score, score.industry_score, score.completeness_score, score.ai_reasoning),
+        ])
+    return response
+
+
+def max_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1024 / 1024
+
+
+def measure(path, batch_id):
+    """Run one export in this process and print a JSON result line"""
+    setup_django()
+    from django.test import RequestFactory
+    from qualification.views import ExportResultsView
+
+    request = RequestFactory().get('/results/export/', {'batch_id': batch_id})
+    baseline = max_rss_mb()
+
+    start = time.perf_counter()
+    if path == 'legacy':
+        response = legacy_export(request)
+        chunks = iter([response.content])
+    else:
+        response = ExportResultsView.as_view()(request)
+        chunks = iter(response.streaming_content)
+    size = len(next(chunks))
+    first_byte = time.perf_counter() - start
+    for chunk in chunks:
+        size += len(chunk)
+    total = time.perf_counter() - start
+
+    print(json.dumps({'ttfb': first_byte, 'total': total, 'bytes': size, 'rss_mb': max_rss_mb() - baseline}))
+
+
+def seed(rows):
+    from django.core.management import call_command
+    from qualification.models import Lead, LeadScore, Offer
+
+    call_command('migrate', verbosity=0)
+    offer = Offer.objects.create(name='Offer', value_props=[], ideal_use_cases=['SaaS'])
+    for start in range(0, rows, 10000):
+        leads = Lead.objects.bulk_create(
+            Lead(name=f'Lead {i}', role='Head of Growth', company=f'Company {i}', industry='SaaS',
+                 location='Remote', linkedin_bio='Scaling B2B SaaS teams', upload_batch=f'export_{rows}')
+            for i in range(start, min(start + 10000, rows))
+        )
+        scores = [LeadScore(lead=lead, offer=offer, role_score=20, industry_score=20, completeness_score=10,
+                            ai_score=30, ai_intent='Medium',
+                            ai_reasoning='Relevant role at a company in the target market.')
+                  for lead in leads]
+        for score in scores:
+            score.calculate_derived_fields()
+        LeadScore.objects.bulk_create(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 300000])
+    parser.add_argument('--measure', nargs=2, metavar=('PATH', 'BATCH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'export.sqlite3')}")
+        env.setdefault('SECRET_KEY', 'benchmark-secret-key')
+        os.environ.update(env)
+        setup_django()
+
+        print(f"{'rows':>8} {'path':>10} {'TTFB s':>8} {'total s':>8} {'MB out':>8} {'peak RSS MB':>12}")
+        for rows in args.rows:
+            seed(rows)
+            for path in ('legacy', 'streaming'):
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_results_export', '--measure', path, f'export_{rows}'],
+                    env=env, check=True, capture_output=True, text=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{rows:>8} {path:>10} {result['ttfb']:>8.2f} {result['total']:>8.2f} "
+                      f"{result['bytes'] / 1024 / 1024:>8.1f} {result['rss_mb']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
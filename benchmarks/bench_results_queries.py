@@ -0,0 +1,162 @@
+"""
+Query plans and timings for every /results and /results/export filter combination.
+
+Seeds --rows scored leads spread over a few offers and batches of 10k, runs
+ANALYZE, then for each combination of offer_id, batch_id and intent records
+the EXPLAIN output and best-of-N timings of the queries the endpoints issue:
+
+    page    /results first page (LIMIT PAGE_SIZE)
+    count   the paginator's COUNT(*)
+    export  first 1000 rows of the ordered /results/export query
+
+It then compares an unfiltered /results page at increasing depths using
+limit/offset against the keyset cursor (?cursor=).
+
+    python -m benchmarks.bench_results_queries --rows 1000000
+    python -m benchmarks.bench_results_queries --rows 1000000 --drop-indexes  # without the result indexes
+    python -m benchmarks.bench_results_queries --output plans.json
+"""
+
+import argparse
+import itertools
+import json
+import random
+import time
+from itertools import islice
+
+from benchmarks._django import benchmark_database, setup_django
+
+OFFERS = 4
+LEADS_PER_BATCH = 10000
+EXPORT_ROWS = 1000
+
+
+def seed(rows, rng):
+    from qualification.models import Lead, LeadScore, Offer
+
+    offers = [Offer.objects.create(name=f'Offer {i}', value_props=[], ideal_use_cases=['SaaS']) for i in range(OFFERS)]
+    for start in range(0, rows, LEADS_PER_BATCH):
+        leads = Lead.objects.bulk_create(
+            Lead(name=f'Lead {i}', role='CEO', company=f'Company {i}', industry='SaaS',
+                 upload_batch=f'batch_{start // LEADS_PER_BATCH}')
+            for i in range(start, min(start + LEADS_PER_BATCH, rows))
+        )
+        scores = []
+        for lead in leads:
+            score = LeadScore(
+                lead=lead, offer=rng.choice(offers),
+                role_score=rng.choice([0, 10, 20]), industry_score=rng.choice([0, 10, 20]),
+                completeness_score=rng.choice([0, 5, 10]), ai_score=rng.choice([10, 25, 30, 50]),
+                ai_intent='Medium', ai_reasoning='Seeded score.',
+            )
+            score.calculate_derived_fields()
+            scores.append(score)
+        LeadScore.objects.bulk_create(scores)
+    return offers
+
+
+def drop_result_indexes():
+    """Put the schema back to its state before the result indexes"""
+    from django.db import connection, models
+    from qualification.models import Lead, LeadScore
+
+    with connection.schema_editor() as editor:
+        for model in (Lead, LeadScore):
+            for index in model._meta.indexes:
+                editor.remove_index(model, index)
+        editor.add_index(LeadScore, models.Index(fields=['offer'], name='leadscore_offer_fk_idx'))
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+def compare_page_depths(rows, page_size, repeat):
+    from qualification.models import LeadScore
+    from qualification.pagination import KeysetPagination
+
+    from qualification.views import ResultsListView
+
+    queryset = LeadScore.objects.only(*ResultsListView.COLUMNS).order_by(*KeysetPagination.ordering)
+    print(f"\n{'depth':>9} {'offset ms':>10} {'keyset ms':>10}")
+    for depth in (0, rows // 10, rows // 2, rows - page_size):
+        # Position of the row just before this page, as a cursor would carry it
+        position = queryset.values_list('total_score', 'created_at', 'id')[depth - 1] if depth else None
+        keyset = queryset.filter(KeysetPagination.rows_after(*position)) if position else queryset
+        offset_ms = best_of(repeat, lambda: list(queryset[depth:depth + page_size]))
+        keyset_ms = best_of(repeat, lambda: list(keyset[:page_size + 1]))
+        print(f"{depth:>9} {offset_ms:>10.1f} {keyset_ms:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--drop-indexes', action='store_true', help='measure without the result indexes')
+    parser.add_argument('--output', help='write plans and timings to this JSON file')
+    parser.add_argument('--plans', action='store_true', help='print EXPLAIN output')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from qualification.models import LeadScore
+    from qualification.views import ExportResultsView, ResultsListView, filter_results
+
+    page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+    rng = random.Random(5)
+    with benchmark_database():
+        start = time.perf_counter()
+        offers = seed(args.rows, rng)
+        if args.drop_indexes:
+            drop_result_indexes()
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        print(f"{args.rows} rows seeded in {time.perf_counter() - start:.1f}s "
+              f"({connection.vendor}, indexes {'dropped' if args.drop_indexes else 'present'})")
+
+        batch = f'batch_{args.rows // LEADS_PER_BATCH // 2}'
+        combinations = itertools.product([None, offers[0].id], [None, batch], [None, 'High'])
+
+        print(f"{'offer_id':>9} {'batch_id':>12} {'intent':>7} {'page ms':>9} {'count ms':>9} {'export ms':>10}")
+        records = []
+        for offer_id, batch_id, intent in combinations:
+            params = {name: value for name, value in
+                      (('offer_id', offer_id), ('batch_id', batch_id), ('intent', intent)) if value}
+            queryset = filter_results(LeadScore.objects.only(*ResultsListView.COLUMNS), params)
+            export = ExportResultsView.export_queryset(params)
+
+            record = {
+                'params': params,
+                'page_ms': best_of(args.repeat, lambda: list(queryset[:page_size])),
+                'count_ms': best_of(args.repeat, queryset.count),
+                'export_ms': best_of(args.repeat, lambda: list(islice(export.iterator(chunk_size=EXPORT_ROWS),
+                                                                       EXPORT_ROWS))),
+                'page_plan': queryset[:page_size].explain(),
+                'count_plan': queryset.order_by().explain(),
+                'export_plan': export.explain(),
+            }
+            records.append(record)
+            print(f"{offer_id or '-':>9} {batch_id or '-':>12} {intent or '-':>7} "
+                  f"{record['page_ms']:>9.1f} {record['count_ms']:>9.1f} {record['export_ms']:>10.1f}")
+
+        compare_page_depths(args.rows, page_size, args.repeat)
+
+        if args.plans:
+            for record in records:
+                print(f"\n{record['params'] or 'no filters'}\n{record['page_plan']}")
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump({'rows': args.rows, 'vendor': connection.vendor,
+                           'indexes_dropped': args.drop_indexes, 'results': records}, f, indent=2)
+            print(f"\nWrote {args.output}")
+
+
+if __name__ == '__main__':
+    main()
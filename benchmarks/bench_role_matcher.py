@@ -0,0 +1,81 @@
+"""
+Micro-benchmark for role scoring on synthetic job titles.
+
+Compares the original per-call keyword lists with the compiled matcher and
+checks that both give identical scores for every title.
+
+    python -m benchmarks.bench_role_matcher --titles 1000000
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks._django import setup_django
+
+SENIORITY = ['', 'Senior ', 'Junior ', 'Lead ', 'Principal ', 'Associate ', 'Chief ', 'VP of ', 'Head of ']
+FUNCTIONS = ['Engineer', 'Developer', 'Analyst', 'Designer', 'Marketing Manager', 'Sales', 'Product Manager',
+             'Operations', 'Coordinator', 'Specialist', 'Recruiter', 'Supervisor', 'Consultant', 'Accountant']
+SUFFIXES = ['', ' II', ', EMEA', ' - Growth', ' (Contract)', ' & Founder', ' at Startup']
+EXTRAS = ['CEO', 'CTO', 'Owner', 'Director of Engineering', 'Intern', 'Team Lead', 'Vice President Sales', '']
+
+
+def legacy_role_score(role):
+    """The role scoring implementation before the compiled matcher"""
+    if not role:
+        return 0
+    role_lower = role.lower()
+    decision_maker_keywords = [
+        'ceo', 'cto', 'cfo', 'cmo', 'vp', 'vice president', 'president',
+        'director', 'head of', 'chief', 'founder', 'owner', 'manager',
+        'lead', 'principal', 'senior manager'
+    ]
+    influencer_keywords = [
+        'senior', 'specialist', 'analyst', 'coordinator', 'supervisor',
+        'team lead', 'project manager', 'product manager', 'marketing manager'
+    ]
+    for keyword in decision_maker_keywords:
+        if keyword in role_lower:
+            return 20
+    for keyword in influencer_keywords:
+        if keyword in role_lower:
+            return 10
+    return 0
+
+
+def synthetic_titles(count, seed=42):
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        if rng.random() < 0.1:
+            titles.append(rng.choice(EXTRAS))
+        else:
+            titles.append(rng.choice(SENIORITY) + rng.choice(FUNCTIONS) + rng.choice(SUFFIXES))
+    return titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=1000000)
+    args = parser.parse_args()
+
+    setup_django()
+    from qualification.matchers import score_role
+
+    titles = synthetic_titles(args.titles)
+    print(f"{args.titles} titles")
+    print(f"{'matcher':>10} {'seconds':>10} {'titles/s':>12}")
+    results = {}
+    for name, func in (('legacy', legacy_role_score), ('compiled', score_role)):
+        start = time.perf_counter()
+        results[name] = [func(title) for title in titles]
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10} {elapsed:>10.2f} {args.titles / elapsed:>12.0f}")
+
+    mismatches = sum(a != b for a, b in zip(results['legacy'], results['compiled']))
+    print(f"mismatches: {mismatches}")
+    assert mismatches == 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Query counts and timings for persisting LeadScore rows.
+
+Compares the per-lead ``update_or_create`` path with the bulk write path of
+``ScoringService.score_leads``. The AI is stubbed out (rule-based fallback)
+so only database work is measured. Each path runs twice: once inserting
+fresh scores and once updating them.
+
+    python -m benchmarks.bench_score_writes --leads 10000
+"""
+
+import argparse
+import time
+
+from benchmarks._django import benchmark_database, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--leads', type=int, default=10000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from qualification.models import Lead, LeadScore, Offer
+    from qualification.services import ScoringService
+
+    with benchmark_database():
+        offer = Offer.objects.create(
+            name='AI Outreach Automation',
+            value_props=['24/7 outreach'],
+            ideal_use_cases=['B2B SaaS', 'mid-market'],
+        )
+        Lead.objects.bulk_create(
+            Lead(
+                name=f'Lead {i}', role=('CTO', 'Analyst', 'Engineer')[i % 3], company=f'Company {i}',
+                industry=('SaaS', 'Retail', 'Fintech')[i % 3], location='Remote',
+                linkedin_bio='Bio', upload_batch='bench',
+            )
+            for i in range(args.leads)
+        )
+        leads = list(Lead.objects.filter(upload_batch='bench'))
+        service = ScoringService()
+        service.openai_client = None
+
+        def per_lead():
+            for lead in leads:
+                service.score_lead(lead, offer)
+
+        def bulk():
+            service.score_leads(leads, offer)
+
+        print(f"{args.leads} leads")
+        print(f"{'path':>10} {'phase':>8} {'queries':>10} {'seconds':>10}")
+        for name, run in (('per-lead', per_lead), ('bulk', bulk)):
+            LeadScore.objects.all().delete()
+            for phase in ('insert', 'update'):
+                queries = 0
+
+                def count_queries(execute, sql, params, many, context):
+                    nonlocal queries
+                    queries += 1
+                    return execute(sql, params, many, context)
+
+                with connection.execute_wrapper(count_queries):
+                    start = time.perf_counter()
+                    run()
+                    elapsed = time.perf_counter() - start
+                print(f"{name:>10} {phase:>8} {queries:>10} {elapsed:>10.2f}")
+            assert LeadScore.objects.count() == args.leads
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Fake collaborators used by the benchmarks."""
+
+import itertools
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from qualification.rate_limit import estimate_tokens
+
+PROSPECT = re.compile(r'^PROSPECT (\d+):$', re.MULTILINE)
+
+
+class FakeOpenAI:
+    """Stand-in for ``openai.OpenAI`` that sleeps instead of calling the network.
+
+    Answers single-lead prompts with one INTENT/REASONING pair and batched
+    prompts with one numbered PROSPECT section per lead. Request and token
+    counts are recorded so benchmarks can compare prompting strategies.
+    """
+
+    INTENTS = ('High', 'Medium', 'Low')
+
+    def __init__(self, latency: float = 0.2):
+        self.latency = latency
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+        self._intents = itertools.cycle(self.INTENTS)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _answer(self):
+        return f"INTENT: {next(self._intents)}\nREASONING: Canned assessment for benchmarking."
+
+    def _create(self, model, messages, **kwargs):
+        prompt = ''.join(message['content'] for message in messages)
+        prospects = PROSPECT.findall(prompt)
+        with self._lock:
+            if prospects:
+                content = '\n\n'.join(f"PROSPECT {number}\n{self._answer()}" for number in prospects)
+            else:
+                content = self._answer()
+            usage = SimpleNamespace(prompt_tokens=estimate_tokens(prompt), completion_tokens=estimate_tokens(content))
+            usage.total_tokens = usage.prompt_tokens + usage.completion_tokens
+            self.calls += 1
+            self.prompt_tokens += usage.prompt_tokens
+            self.completion_tokens += usage.completion_tokens
+        time.sleep(self.latency)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=usage,
+        )
+
+
+class FakeRateLimitError(Exception):
+    """Shaped like ``openai.RateLimitError``"""
+
+    status_code = 429
+
+    def __init__(self, retry_after: float):
+        super().__init__('Rate limit reached')
+        self.response = SimpleNamespace(headers={'retry-after-ms': str(int(retry_after * 1000))})
+
+
+class RateLimitedFakeOpenAI(FakeOpenAI):
+    """FakeOpenAI that enforces a requests-per-minute limit like the real API.
+
+    Requests over the limit fail immediately with a 429 carrying
+    retry-after-ms, so benchmarks can measure goodput under throttling.
+    """
+
+    def __init__(self, requests_per_minute: int, latency: float = 0.2, burst_seconds: float = 1.0):
+        super().__init__(latency)
+        self.per_second = requests_per_minute / 60
+        self.capacity = max(1.0, self.per_second * burst_seconds)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.rejected = 0
+
+    def _create(self, model, messages, **kwargs):
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.per_second)
+            self.updated = now
+            if self.tokens < 1:
+                self.rejected += 1
+                raise FakeRateLimitError((1 - self.tokens) / self.per_second)
+            self.tokens -= 1
+        return super()._create(model, messages, **kwargs)
@@ -0,0 +1,119 @@
+"""
+Synthetic lead CSVs for benchmarks.
+
+Roles, industries and locations follow skewed, roughly realistic
+distributions: most leads are individual contributors and managers, a
+minority are decision makers, and a long tail of industries sits behind a
+few common ones. A small share of rows have missing fields and a small
+share repeat an earlier lead (name, company and role), as real exports do.
+The output is deterministic for a given --seed.
+
+    python -m benchmarks.generate_leads --rows 100000 --output leads_100k.csv
+"""
+
+import argparse
+import csv
+import random
+
+COLUMNS = ['name', 'role', 'company', 'industry', 'location', 'linkedin_bio']
+
+# (value, weight)
+ROLES = [
+    ('Software Engineer', 18), ('Account Executive', 10), ('Marketing Manager', 9), ('Analyst', 9),
+    ('Product Manager', 7), ('Sales Manager', 6), ('Operations Manager', 5), ('Designer', 5),
+    ('Head of Growth', 4), ('Director of Marketing', 4), ('VP Sales', 3), ('VP Engineering', 3),
+    ('Head of Operations', 3), ('CTO', 2), ('COO', 1.5), ('CEO', 2), ('Founder', 2.5),
+    ('Co-Founder & CEO', 1), ('Chief Revenue Officer', 1), ('Intern', 3),
+]
+INDUSTRIES = [
+    ('SaaS', 22), ('Software', 10), ('Fintech', 8), ('Healthcare', 7), ('E-commerce', 6), ('Retail', 6),
+    ('Manufacturing', 5), ('Education', 4), ('Logistics', 4), ('Marketing Services', 4), ('Real Estate', 3),
+    ('Consulting', 3), ('Media', 3), ('Insurance', 2), ('Telecommunications', 2), ('Energy', 2),
+    ('Biotech', 2), ('Government', 1), ('Non-profit', 1), ('Hospitality', 1),
+]
+LOCATIONS = [
+    ('Remote', 15), ('New York, USA', 10), ('San Francisco, USA', 9), ('London, UK', 8), ('Berlin, Germany', 5),
+    ('Bangalore, India', 7), ('Toronto, Canada', 4), ('Austin, USA', 4), ('Sydney, Australia', 3),
+    ('Singapore', 3), ('Paris, France', 3), ('Amsterdam, Netherlands', 2), ('Dubai, UAE', 2),
+]
+FIRST_NAMES = ['Ava', 'Liam', 'Maya', 'Noah', 'Priya', 'Ethan', 'Sofia', 'Arjun', 'Emma', 'Lucas', 'Zara',
+               'Mateo', 'Chloe', 'Omar', 'Hannah', 'Kenji', 'Isla', 'Diego', 'Leah', 'Ravi']
+LAST_NAMES = ['Patel', 'Smith', 'Garcia', 'Chen', 'Khan', 'Muller', 'Rossi', 'Johnson', 'Nguyen', 'Silva',
+              'Brown', 'Kim', 'Singh', 'Lopez', 'Cohen', 'Ali', 'Martin', 'Sato', 'Okafor', 'Novak']
+COMPANY_WORDS = ['Flow', 'Data', 'Cloud', 'Peak', 'Bright', 'North', 'Blue', 'Stack', 'Signal', 'Nova',
+                 'Metric', 'Pulse', 'Forge', 'Harbor', 'Lumen', 'Vector']
+COMPANY_SUFFIXES = ['Labs', 'Metrics', 'Systems', 'AI', 'Works', 'HQ', 'Analytics', 'Health', 'Pay', 'Logistics']
+BIOS = [
+    'Scaling {industry} teams and building repeatable growth.',
+    '{role} focused on revenue operations and pipeline quality.',
+    'Helping {industry} companies modernise their go-to-market.',
+    'Ex-founder, now leading {role_lower} initiatives at a fast-growing startup.',
+    'Passionate about automation, data and customer experience in {industry}.',
+]
+
+
+def _weighted(pairs):
+    values, weights = zip(*pairs)
+    return list(values), list(weights)
+
+
+def generate_rows(rows: int, seed: int = 42, missing_rate: float = 0.05, duplicate_rate: float = 0.01):
+    """Yield ``rows`` lead rows as lists in COLUMNS order"""
+    rng = random.Random(seed)
+    roles, role_weights = _weighted(ROLES)
+    industries, industry_weights = _weighted(INDUSTRIES)
+    locations, location_weights = _weighted(LOCATIONS)
+    recent = []
+
+    for i in range(rows):
+        if recent and rng.random() < duplicate_rate:
+            # Same person exported again, possibly with a fresher bio
+            row = list(rng.choice(recent))
+            row[5] = rng.choice(BIOS).format(industry=row[3], role=row[1], role_lower=row[1].lower())
+            yield row
+            continue
+
+        role = rng.choices(roles, role_weights)[0]
+        industry = rng.choices(industries, industry_weights)[0]
+        row = [
+            f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+            role,
+            f'{rng.choice(COMPANY_WORDS)}{rng.choice(COMPANY_SUFFIXES)} {i // 40}',
+            industry,
+            rng.choices(locations, location_weights)[0],
+            rng.choice(BIOS).format(industry=industry, role=role, role_lower=role.lower()),
+        ]
+        if rng.random() < missing_rate:
+            # Blank one optional field; name is required by the upload
+            row[rng.randrange(1, len(COLUMNS))] = ''
+        if len(recent) < 1000:
+            recent.append(row)
+        else:
+            recent[rng.randrange(len(recent))] = row
+        yield row
+
+
+def write_leads_csv(path: str, rows: int, seed: int = 42, **kwargs) -> str:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        writer.writerows(generate_rows(rows, seed, **kwargs))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--output', default=None, help='defaults to leads_<rows>.csv')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--missing-rate', type=float, default=0.05)
+    parser.add_argument('--duplicate-rate', type=float, default=0.01)
+    args = parser.parse_args()
+
+    path = write_leads_csv(args.output or f'leads_{args.rows}.csv', args.rows, args.seed,
+                           missing_rate=args.missing_rate, duplicate_rate=args.duplicate_rate)
+    print(f"Wrote {args.rows} leads to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,312 @@
+"""
+End-to-end benchmark suite: upload, score, results paging and export.
+
+For each --rows size a synthetic CSV (see generate_leads) is pushed through
+the real endpoints in-process with the DRF test client, against a
+throwaway database and a fake AI client with --latency seconds per call
+(or, with --stub, the OpenAI SDK talking HTTP to the local stand-in server
+from qualification.ai_stub, with its latency distribution and error rates):
+
+    upload          POST /leads/upload/
+    score           POST /score/ (inline)
+    rescore         POST /score/ again; unchanged leads are skipped
+    score_stream    POST /score/ with "force" and "stream": "ndjson"; also
+                    records the time to the first score record
+    results_first   GET /results/ first page
+    results_deep    GET /results/ last limit/offset page
+    results_walk    GET /results/?cursor= for up to --pages keyset pages
+    export          GET /results/export/, streamed to the end
+
+Each scenario records wall time, SQL queries and peak memory: growth of
+peak RSS over the scenario (the kernel's high-water mark is reset before
+each one, Linux only) or, with --tracemalloc, peak Python heap, which is
+more precise but slows everything down several times. Results are written
+as JSON tagged with the git commit, so runs can be compared across commits:
+
+    python -m benchmarks.suite --rows 1000 100000 --output before.json
+    python -m benchmarks.suite --rows 1000 100000 --output after.json
+    python -m benchmarks.suite --compare before.json after.json
+    python -m benchmarks.suite --rows 1000 --stub --distribution lognormal --latency 0.05
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from contextlib import nullcontext
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks._django import benchmark_database, setup_django
+from benchmarks.fakes import FakeOpenAI
+from benchmarks.generate_leads import write_leads_csv
+
+METRICS = ('seconds', 'queries', 'peak_mb')
+
+
+def git_commit():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.strip(), dirty
+
+
+def _status_kb(field):
+    with open('/proc/self/status') as f:
+        return int(re.search(rf'^{field}:\s+(\d+)', f.read(), re.MULTILINE).group(1))
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak-RSS mark for this process; False where unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class Recorder:
+    """Runs scenarios and collects their measurements"""
+
+    def __init__(self, memory: str):
+        if memory == 'rss' and not reset_peak_rss():
+            memory = None
+        self.memory = memory
+        self.results = []
+
+    def run(self, scenario, rows, func):
+        from django.db import connection
+
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        if self.memory == 'tracemalloc':
+            tracemalloc.start()
+        elif self.memory == 'rss':
+            reset_peak_rss()
+            baseline_kb = _status_kb('VmRSS')
+        with connection.execute_wrapper(count_queries):
+            start = time.perf_counter()
+            extra = func() or {}
+            elapsed = time.perf_counter() - start
+        peak_mb = None
+        if self.memory == 'tracemalloc':
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+            tracemalloc.stop()
+        elif self.memory == 'rss':
+            peak_mb = (_status_kb('VmHWM') - baseline_kb) / 1024
+
+        result = {'scenario': scenario, 'rows': rows, 'seconds': elapsed, 'queries': queries,
+                  'peak_mb': peak_mb, **extra}
+        self.results.append(result)
+        peak = f"{peak_mb:>9.1f}" if peak_mb is not None else f"{'-':>9}"
+        print(f"{rows:>9} {scenario:>14} {elapsed:>9.3f} {queries:>8} {peak}  "
+              + ' '.join(f"{key}={value}" for key, value in extra.items()))
+        return extra
+
+
+def run_size(recorder, rows, args, tmp, stub=None):
+    from rest_framework.test import APIClient
+    from qualification.models import Offer
+
+    client = APIClient()
+    csv_path = write_leads_csv(os.path.join(tmp, f'leads_{rows}.csv'), rows, seed=args.seed)
+    offer = Offer.objects.create(
+        name='AI Outreach Automation',
+        value_props=['24/7 outreach', '6x more meetings'],
+        ideal_use_cases=['B2B SaaS', 'mid-market'],
+    )
+
+    def upload():
+        with open(csv_path, 'rb') as f:
+            response = client.post('/leads/upload/', {'file': f}, format='multipart')
+        assert response.status_code == 201, response.content[:500]
+        return {'leads_created': response.data['leads_created'], 'batch_id': response.data['batch_id']}
+
+    batch_id = recorder.run('upload', rows, upload)['batch_id']
+    if stub is None:
+        fake = FakeOpenAI(latency=args.latency)
+        ai_calls = lambda: fake.calls
+        ai_client = mock.patch('qualification.services.get_openai_client', return_value=fake)
+    else:
+        ai_calls = lambda: stub.stats()['requests']
+        ai_client = nullcontext()
+
+    def score():
+        calls = ai_calls()
+        response = client.post('/score/', {'offer_id': offer.id, 'batch_id': batch_id}, format='json')
+        assert response.status_code == 200, response.content[:500]
+        return {'scored_leads': response.data['scored_leads'], 'skipped_leads': response.data['skipped_leads'],
+                'ai_calls': ai_calls() - calls}
+
+    def score_stream():
+        start = time.perf_counter()
+        first_score = None
+        records = 0
+        response = client.post('/score/', {'offer_id': offer.id, 'batch_id': batch_id, 'force': True,
+                                           'stream': 'ndjson'}, format='json')
+        assert response.status_code == 200
+        for chunk in response.streaming_content:
+            if first_score is None and b'"type": "score"' in chunk:
+                first_score = time.perf_counter() - start
+            records += chunk.count(b'\n')
+        return {'first_score_ms': round(first_score * 1000, 1) if first_score is not None else None,
+                'records': records}
+
+    with ai_client:
+        recorder.run('score', rows, score)
+        recorder.run('rescore', rows, score)
+        recorder.run('score_stream', rows, score_stream)
+
+    def first_page():
+        response = client.get('/results/', {'batch_id': batch_id})
+        assert response.status_code == 200
+        return {'count': response.data['count']}
+
+    count = recorder.run('results_first', rows, first_page)['count']
+
+    def deep_page():
+        page_size = len(client.get('/results/', {'batch_id': batch_id}).data['results']) or 1
+        last_page = max(1, -(-count // page_size))
+        response = client.get('/results/', {'batch_id': batch_id, 'page': last_page})
+        assert response.status_code == 200
+        return {'page': last_page}
+
+    recorder.run('results_deep', rows, deep_page)
+
+    def keyset_walk():
+        params = {'batch_id': batch_id, 'cursor': '', 'limit': args.page_size}
+        pages = fetched = 0
+        while pages < args.pages:
+            response = client.get('/results/', params)
+            assert response.status_code == 200, response.content[:500]
+            data = response.data
+            pages += 1
+            fetched += len(data['results'])
+            if not data['next']:
+                break
+            params['cursor'] = parse_qs(urlparse(data['next']).query)['cursor'][0]
+        return {'pages': pages, 'fetched': fetched}
+
+    recorder.run('results_walk', rows, keyset_walk)
+
+    def export():
+        response = client.get('/results/export/', {'batch_id': batch_id})
+        assert response.status_code == 200
+        size = sum(len(chunk) for chunk in response.streaming_content)
+        return {'bytes': size}
+
+    recorder.run('export', rows, export)
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    baseline = {(r['scenario'], r['rows']): r for r in old['results']}
+
+    print(f"{(old.get('commit') or '?')[:10]} -> {(new.get('commit') or '?')[:10]}")
+    print(f"{'rows':>9} {'scenario':>14} " + ' '.join(f"{m:>20}" for m in METRICS))
+    for result in new['results']:
+        before = baseline.get((result['scenario'], result['rows']))
+        cells = []
+        for metric in METRICS:
+            value = result.get(metric)
+            if value is None:
+                cells.append(f"{'-':>20}")
+            elif before is None or not before.get(metric):
+                cells.append(f"{value:>20.3f}")
+            else:
+                cells.append(f"{value:>10.3f} ({value / before[metric]:>5.2f}x)")
+        print(f"{result['rows']:>9} {result['scenario']:>14} " + ' '.join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000])
+    parser.add_argument('--latency', type=float, default=0.002, help='Seconds per fake AI call')
+    parser.add_argument('--stub', action='store_true', help='score over HTTP against the local OpenAI stub')
+    parser.add_argument('--distribution', default='fixed', help='Stub latency distribution')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of stub requests failing with a 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of stub requests answered with a 429')
+    parser.add_argument('--pages', type=int, default=50, help='Keyset pages walked by results_walk')
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--tracemalloc', dest='memory', action='store_const', const='tracemalloc', default='rss',
+                        help='measure peak Python heap instead of peak RSS (slow)')
+    parser.add_argument('--output', help='JSON file (default: suite-<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings
+    from qualification.ai_stub import OpenAIStubServer
+    from qualification.openai_client import close_openai_client
+
+    commit, dirty = git_commit()
+    recorder = Recorder(args.memory)
+    largest = max(args.rows)
+    overrides = {
+        # The test client's host, and uploads as large as the biggest run
+        'ALLOWED_HOSTS': ['testserver'],
+        'MAX_LEADS_PER_UPLOAD': largest,
+        'MAX_FILE_SIZE': largest * 200 + 1024 * 1024,
+    }
+    stub = None
+    if args.stub:
+        stub = OpenAIStubServer(latency=args.latency, distribution=args.distribution, error_rate=args.error_rate,
+                                rate_limit_rate=args.rate_limit_rate, retry_after=0.05, seed=args.seed).start()
+        overrides.update(OPENAI_API_KEY='stub', OPENAI_BASE_URL=stub.base_url)
+
+    print(f"commit {(commit or 'unknown')[:10]}{' (dirty)' if dirty else ''}, "
+          f"{'stub' if stub else 'fake'} AI {args.latency * 1000:.1f} ms/call, concurrency {settings.AI_SCORING_CONCURRENCY}")
+    print(f"{'rows':>9} {'scenario':>14} {'seconds':>9} {'queries':>8} {'peak MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp, override_settings(**overrides):
+        for rows in args.rows:
+            with benchmark_database():
+                run_size(recorder, rows, args, tmp, stub)
+        vendor = connection.vendor
+        close_openai_client()
+    if stub is not None:
+        stub.stop()
+
+    report = {
+        'commit': commit,
+        'dirty': dirty,
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': vendor,
+        'memory': recorder.memory,
+        'args': {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        'results': recorder.results,
+    }
+    output = args.output or f"suite-{(commit or 'unknown')[:10]}.json"
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,27 @@
+"""Gunicorn settings, picked up automatically from the working directory.
+
+Sets up prometheus_client's multiprocess mode so GET /metrics reports the
+sum over all workers rather than whichever worker served the scrape.
+"""
+import os
+import shutil
+import tempfile
+
+# Must be in the environment before the workers import prometheus_client
+multiproc_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'lead-scoring-metrics')
+)
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to this one's
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
@@ -2,6 +2,8 @@
 ASGI config for lead_qualification_api project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Under ASGI the upload, score and results endpoints are served by the async
+views in ``qualification.async_views`` unless ASYNC_VIEWS=False.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
@@ -12,5 +14,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'lead_qualification_api.settings')
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
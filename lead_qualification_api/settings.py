@@ -48,9 +48,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'qualification.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'qualification.middleware.AsyncWhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -159,7 +160,8 @@ CORS_ALLOWED_ORIGINS = os.getenv('CORS_ALLOWED_ORIGINS', 'http://localhost:3000,
 CORS_ALLOW_CREDENTIALS = True
 
 # File upload settings
-FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv('MAX_FILE_SIZE', '10485760'))  # 10MB
+MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', '10485760'))  # 10MB, largest accepted CSV upload
+FILE_UPLOAD_MAX_MEMORY_SIZE = MAX_FILE_SIZE
 DATA_UPLOAD_MAX_MEMORY_SIZE = FILE_UPLOAD_MAX_MEMORY_SIZE
 
 # Static files settings
@@ -173,6 +175,60 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+# Alternative API endpoint, e.g. the local stub from `manage.py run_openai_stub`
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None
 
 # Application specific settings
 MAX_LEADS_PER_UPLOAD = int(os.getenv('MAX_LEADS_PER_UPLOAD', '1000'))
+
+# Maximum number of concurrent OpenAI requests while scoring a batch
+AI_SCORING_CONCURRENCY = int(os.getenv('AI_SCORING_CONCURRENCY', '8'))
+
+# Cap on OpenAI requests in flight across the whole process (0 = AI_SCORING_CONCURRENCY).
+# Raise it, with AI_HTTP_POOL_SIZE, under ASGI where many /score requests share a process
+AI_PROCESS_CONCURRENCY = int(os.getenv('AI_PROCESS_CONCURRENCY', '0'))
+
+# Serve upload, score and results with the async views (asgi.py turns this on)
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() == 'true'
+
+# Number of LeadScore rows written per bulk INSERT/UPDATE
+SCORE_WRITE_BATCH_SIZE = int(os.getenv('SCORE_WRITE_BATCH_SIZE', '1000'))
+
+# Streaming /score: longest wait before written scores are sent, and keep-alive interval
+SCORE_STREAM_FLUSH_SECONDS = float(os.getenv('SCORE_STREAM_FLUSH_SECONDS', '0.25'))
+SCORE_STREAM_HEARTBEAT_SECONDS = float(os.getenv('SCORE_STREAM_HEARTBEAT_SECONDS', '15'))
+
+# Number of Lead rows inserted per bulk INSERT during CSV upload
+LEAD_UPLOAD_CHUNK_SIZE = int(os.getenv('LEAD_UPLOAD_CHUNK_SIZE', '1000'))
+
+# AI response cache: in-process LRU backed by the AIResponse table
+AI_CACHE_ENABLED = os.getenv('AI_CACHE_ENABLED', 'True').lower() == 'true'
+AI_CACHE_TTL_SECONDS = int(os.getenv('AI_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+AI_CACHE_MAX_ENTRIES = int(os.getenv('AI_CACHE_MAX_ENTRIES', '10000'))
+AI_CACHE_DB_MAX_ENTRIES = int(os.getenv('AI_CACHE_DB_MAX_ENTRIES', '200000'))
+
+# Leads assessed per OpenAI request (1 disables multi-lead prompts)
+AI_PROMPT_BATCH_SIZE = int(os.getenv('AI_PROMPT_BATCH_SIZE', '1'))
+
+# Uploaded rows matching an existing lead: skip, link (reuse its score) or allow
+LEAD_DEDUP_POLICY = os.getenv('LEAD_DEDUP_POLICY', 'link')
+
+# Rows fetched per server-side cursor round trip and written per chunk in /results/export
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# OpenAI pacing (0 disables a limit) and retries for 429 / 5xx / timeouts
+AI_REQUESTS_PER_MINUTE = int(os.getenv('AI_REQUESTS_PER_MINUTE', '3500'))
+AI_TOKENS_PER_MINUTE = int(os.getenv('AI_TOKENS_PER_MINUTE', '90000'))
+AI_MAX_RETRIES = int(os.getenv('AI_MAX_RETRIES', '4'))
+AI_RETRY_BASE_DELAY = float(os.getenv('AI_RETRY_BASE_DELAY', '0.5'))
+AI_RETRY_MAX_DELAY = float(os.getenv('AI_RETRY_MAX_DELAY', '20'))
+
+# Consecutive provider failures that open the AI circuit, and the cooldown before a probe
+AI_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('AI_CIRCUIT_FAILURE_THRESHOLD', '5'))
+AI_CIRCUIT_RESET_SECONDS = float(os.getenv('AI_CIRCUIT_RESET_SECONDS', '30'))
+
+# Pooled HTTP client shared by all OpenAI calls in a worker process
+AI_HTTP_POOL_SIZE = int(os.getenv('AI_HTTP_POOL_SIZE', '20'))
+AI_HTTP_KEEPALIVE_SECONDS = float(os.getenv('AI_HTTP_KEEPALIVE_SECONDS', '60'))
+AI_REQUEST_TIMEOUT = float(os.getenv('AI_REQUEST_TIMEOUT', '30'))
+AI_CONNECT_TIMEOUT = float(os.getenv('AI_CONNECT_TIMEOUT', '5'))
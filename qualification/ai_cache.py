@@ -0,0 +1,137 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from django.conf import settings
+from django.utils import timezone
+from .metrics import AI_CACHE_LOOKUPS
+from .models import AIResponse
+
+
+class AIResponseCache:
+    """Cache of AI assessments keyed by a fingerprint of the prompt.
+
+    Two tiers: an in-process LRU that worker threads read and write without
+    touching the database, backed by the ``AIResponse`` table. Database reads
+    happen in bulk through ``prefetch()`` and writes are queued until
+    ``flush()``, both called from the thread that owns the DB connection.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.db_loads = 0
+        self.writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.AI_CACHE_ENABLED
+
+    @staticmethod
+    def make_key(model: str, prompt_version: int, lead_context: str, offer_context: str) -> str:
+        payload = json.dumps([model, prompt_version, lead_context, offer_context])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, str]]:
+        """Return (intent, reasoning) from memory, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.time():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        AI_CACHE_LOOKUPS.labels('miss' if entry is None else 'hit').inc()
+        return None if entry is None else (entry[1], entry[2])
+
+    def set(self, key: str, model: str, intent: str, reasoning: str):
+        """Store an assessment in memory and queue it for the database"""
+        expires = time.time() + settings.AI_CACHE_TTL_SECONDS
+        with self._lock:
+            self._remember(key, expires, intent, reasoning)
+            self._pending[key] = (model, intent, reasoning)
+
+    def prefetch(self, keys: Iterable[str]):
+        """Load database entries for ``keys`` that aren't in memory yet"""
+        with self._lock:
+            missing = [key for key in set(keys) if key not in self._entries]
+        if not missing:
+            return
+
+        rows = AIResponse.objects.filter(key__in=missing, expires_at__gt=timezone.now()).values_list(
+            'key', 'intent', 'reasoning', 'expires_at'
+        )
+        with self._lock:
+            for key, intent, reasoning, expires_at in rows:
+                self._remember(key, expires_at.timestamp(), intent, reasoning)
+                self.db_loads += 1
+
+    def flush(self):
+        """Write queued entries to the database"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+
+        expires_at = timezone.now() + timedelta(seconds=settings.AI_CACHE_TTL_SECONDS)
+        AIResponse.objects.bulk_create(
+            [AIResponse(key=key, model=model, intent=intent, reasoning=reasoning, expires_at=expires_at)
+             for key, (model, intent, reasoning) in pending.items()],
+            update_conflicts=True,
+            unique_fields=['key'],
+            update_fields=['intent', 'reasoning', 'expires_at'],
+        )
+        with self._lock:
+            self.writes += len(pending)
+
+    def prune(self) -> int:
+        """Delete expired rows and trim the table to AI_CACHE_DB_MAX_ENTRIES"""
+        deleted, _ = AIResponse.objects.filter(expires_at__lte=timezone.now()).delete()
+
+        overflow = AIResponse.objects.order_by('-expires_at').values_list('key', flat=True)[
+            settings.AI_CACHE_DB_MAX_ENTRIES:
+        ]
+        keys = list(overflow)
+        for start in range(0, len(keys), 500):
+            deleted += AIResponse.objects.filter(key__in=keys[start:start + 500]).delete()[0]
+        return deleted
+
+    def clear(self):
+        """Drop the in-process tier and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self._pending.clear()
+            self.hits = self.misses = self.db_loads = self.writes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'db_loads': self.db_loads,
+                'writes': self.writes,
+            }
+
+    def _remember(self, key: str, expires: float, intent: str, reasoning: str):
+        # Caller holds the lock
+        self._entries[key] = (expires, intent, reasoning)
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.AI_CACHE_MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+
+# Shared by every ScoringService in the process
+ai_response_cache = AIResponseCache()
@@ -0,0 +1,247 @@
+"""Local stand-in for the OpenAI chat-completions API.
+
+``OpenAIStubServer`` speaks just enough of the API for ScoringService:
+POST ``/v1/chat/completions`` answered with canned ``INTENT``/``REASONING``
+text, one numbered ``PROSPECT`` section per lead for batched prompts, and
+token usage. Latency follows a configurable distribution and a share of
+requests can fail with a 500 or a 429 carrying retry-after-ms, so scoring
+throughput, retries and the circuit breaker can be exercised on any Linux
+box without an API key. Point the app at it with::
+
+    python manage.py run_openai_stub --port 8765 --latency 0.3 --distribution lognormal
+    OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python manage.py runserver
+
+The intent for a prospect is derived from a hash of its prompt section, so
+the same lead always gets the same answer and runs are reproducible.
+"""
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from .rate_limit import estimate_tokens
+
+DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+
+INTENTS = ('High', 'Medium', 'Low')
+
+REASONINGS = {
+    'High': 'Decision-maker in a target industry with a complete profile.',
+    'Medium': 'Relevant role or industry, but not a clear fit on both.',
+    'Low': 'Limited authority or weak alignment with the ideal use cases.',
+}
+
+# Batched prompts number their prospects "PROSPECT 1:", "PROSPECT 2:", ...
+PROSPECT = re.compile(r'^PROSPECT (\d+):$', re.MULTILINE)
+
+
+def canned_intent(text: str) -> str:
+    return INTENTS[hashlib.sha256(text.encode()).digest()[0] % len(INTENTS)]
+
+
+def canned_answer(text: str) -> str:
+    intent = canned_intent(text)
+    return f"INTENT: {intent}\nREASONING: {REASONINGS[intent]}"
+
+
+def canned_content(prompt: str) -> str:
+    """Response text for a single-lead or batched scoring prompt"""
+    headers = list(PROSPECT.finditer(prompt))
+    if not headers:
+        return canned_answer(prompt)
+    sections = []
+    for index, header in enumerate(headers):
+        end = headers[index + 1].start() if index + 1 < len(headers) else len(prompt)
+        sections.append(f"PROSPECT {header.group(1)}\n{canned_answer(prompt[header.end():end])}")
+    return '\n\n'.join(sections)
+
+
+class OpenAIStubServer(ThreadingHTTPServer):
+    """Chat-completions endpoint with configurable latency and failures.
+
+    ``latency`` is the mean seconds per request for ``fixed``, ``uniform``
+    (0 to twice the mean) and ``exponential``, and the median for
+    ``lognormal`` (sigma ``latency_sigma``), whose long tail is closest to
+    a real provider. ``error_rate`` and ``rate_limit_rate`` are the shares
+    of requests answered with a 500 and a 429. ``handshake`` is slept once
+    per new connection to stand in for TCP + TLS setup.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+    # socketserver's default backlog of 5 drops connections under load tests
+    request_queue_size = 1024
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 distribution: str = 'fixed', latency_sigma: float = 0.5, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float = 1.0, handshake: float = 0.0,
+                 seed: Optional[int] = None):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+        super().__init__((host, port), _StubHandler)
+        self.latency = latency
+        self.distribution = distribution
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.handshake = handshake
+        self.lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._thread = None
+        self.reset_counts()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'OpenAIStubServer':
+        """Serve from a daemon thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_counts(self):
+        with self.lock:
+            self.connections = 0
+            self.requests = 0
+            self.completions = 0
+            self.errors = 0
+            self.throttled = 0
+            self.prompt_tokens = 0
+            self.completion_tokens = 0
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                'connections': self.connections,
+                'requests': self.requests,
+                'completions': self.completions,
+                'errors': self.errors,
+                'throttled': self.throttled,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+            }
+
+    def next_outcome(self):
+        """(seconds to wait, status code) for the next request"""
+        with self.lock:
+            self.requests += 1
+            roll = self._random.random()
+            if roll < self.rate_limit_rate:
+                # Throttled requests are rejected up front, as the real API does
+                self.throttled += 1
+                return 0.0, 429
+            status = 200
+            if roll < self.rate_limit_rate + self.error_rate:
+                self.errors += 1
+                status = 500
+            return self._sample_latency(), status
+
+    def _sample_latency(self) -> float:
+        # Caller holds the lock
+        if self.latency <= 0 or self.distribution == 'fixed':
+            return max(0.0, self.latency)
+        if self.distribution == 'uniform':
+            return self._random.uniform(0, 2 * self.latency)
+        if self.distribution == 'exponential':
+            return self._random.expovariate(1 / self.latency)
+        return self._random.lognormvariate(math.log(self.latency), self.latency_sigma)
+
+    def record_completion(self, prompt_tokens: int, completion_tokens: int):
+        with self.lock:
+            self.completions += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+    # Headers and body go out in separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK and adds ~40 ms to every response
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        if self.server.handshake:
+            time.sleep(self.server.handshake)
+
+    def do_POST(self):
+        # Read the body whatever the outcome, so the connection stays usable
+        body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send_json(404, _error(f'Unknown path {self.path}', 'invalid_request_error'))
+            return
+        try:
+            request = json.loads(body)
+            prompt = ''.join(message['content'] for message in request['messages'])
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, _error('Malformed chat completion request', 'invalid_request_error'))
+            return
+
+        server = self.server
+        delay, status = server.next_outcome()
+        if delay:
+            time.sleep(delay)
+        if status == 429:
+            retry_after = server.retry_after
+            self._send_json(429, _error('Rate limit reached for requests', 'requests', 'rate_limit_exceeded'), {
+                'retry-after-ms': str(int(retry_after * 1000)),
+                'retry-after': str(max(1, math.ceil(retry_after))),
+            })
+            return
+        if status == 500:
+            self._send_json(500, _error('The server had an error while processing your request', 'server_error'))
+            return
+
+        content = canned_content(prompt)
+        prompt_tokens, completion_tokens = estimate_tokens(prompt), estimate_tokens(content)
+        server.record_completion(prompt_tokens, completion_tokens)
+        self._send_json(200, {
+            'id': f'chatcmpl-stub-{server.completions}',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': request.get('model', 'stub'),
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}],
+            'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                      'total_tokens': prompt_tokens + completion_tokens},
+        })
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _error(message: str, error_type: str, code: Optional[str] = None) -> Dict:
+    return {'error': {'message': message, 'type': error_type, 'param': None, 'code': code}}
@@ -0,0 +1,237 @@
+"""Async versions of the upload, score, results and export endpoints.
+
+Served in place of the DRF views when ASYNC_VIEWS is set, which
+``lead_qualification_api/asgi.py`` does by default. Under an ASGI server a
+/score request then waits on the provider as a coroutine rather than a
+blocked worker thread: AI calls go through the async OpenAI client and
+queries use Django's async ORM methods, so one process can hold hundreds
+of AI-bound requests in flight. Work that is synchronous anyway (parsing
+the CSV upload, bulk score writes, serializer validation that queries the
+database) runs through ``sync_to_async``.
+
+Request and response bodies match the DRF views exactly; the response
+building is shared with them.
+
+Streamed responses need async iterators here: under ASGI, Django 4.2
+reads a sync iterator to the end with ``sync_to_async(list)`` before
+sending the first byte.
+"""
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from .jobs import enqueue_scoring_job
+from .models import Lead, LeadScore, Offer
+from .pagination import KeysetPagination
+from .serializers import CSVUploadSerializer, LeadResultSerializer, ScoreRequestSerializer
+from .services import ScoringService
+from .views import ExportResultsView, LeadsUploadView, ResultsListView, ScoreLeadsView, filter_results
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    return JsonResponse(data, status=status_code, encoder=JSONEncoder, safe=False)
+
+
+class AsyncAPIView(View):
+    """Base for the async views: CSRF exempt like DRF's APIView"""
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Django 4.2's csrf_exempt() would wrap the coroutine function in a sync one
+        view.csrf_exempt = True
+        return view
+
+    @staticmethod
+    def request_data(request):
+        """JSON or form body, like DRF's request.data; raises ValueError on malformed JSON"""
+        if request.content_type == 'application/json':
+            return json.loads(request.body or b'{}')
+        data = request.POST.copy()
+        data.update(request.FILES)
+        return data
+
+    async def validate(self, request, serializer_class):
+        """(validated data, None), or (None, a 400 response)"""
+        try:
+            data = self.request_data(request)
+        except ValueError as e:
+            return None, json_response({'detail': f'JSON parse error - {e}'}, status.HTTP_400_BAD_REQUEST)
+        serializer = serializer_class(data=data)
+        # Validators may query the database
+        if not await sync_to_async(serializer.is_valid)():
+            return None, json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+        return serializer.validated_data, None
+
+
+class AsyncLeadsUploadView(AsyncAPIView):
+    """POST /leads/upload - Accept CSV file with lead data"""
+
+    async def post(self, request):
+        data, error_response = await self.validate(request, CSVUploadSerializer)
+        if error_response:
+            return error_response
+
+        # Parsing and bulk inserts are synchronous work with nothing to wait on
+        return json_response(*await sync_to_async(LeadsUploadView.import_upload)(data))
+
+
+class AsyncScoreLeadsView(AsyncAPIView):
+    """POST /score - Run scoring on uploaded leads (see ScoreLeadsView)"""
+
+    async def post(self, request):
+        data, error_response = await self.validate(request, ScoreRequestSerializer)
+        if error_response:
+            return error_response
+
+        offer_id = data.get('offer_id')
+        offer_ids = data.get('offer_ids')
+        batch_id = data.get('batch_id')
+        force = data['force']
+
+        try:
+            if offer_ids:
+                # Several offers: every lead is scored against each of them
+                offers = await Offer.objects.ain_bulk(offer_ids)
+                offers = [offers[pk] for pk in offer_ids]
+            else:
+                offers = [await Offer.objects.aget(id=offer_id)]
+
+            # Determine which leads to score
+            if batch_id:
+                leads = Lead.objects.filter(upload_batch=batch_id)
+                if not await leads.aexists():
+                    return json_response(
+                        {'error': f'No leads found for batch_id: {batch_id}'}, status.HTTP_404_NOT_FOUND
+                    )
+            else:
+                leads = Lead.objects.all()
+                if not await leads.aexists():
+                    return json_response({'error': 'No leads found to score'}, status.HTTP_404_NOT_FOUND)
+
+            if data['background']:
+                total_leads = await leads.acount()
+                enqueue = sync_to_async(enqueue_scoring_job)
+                jobs = [await enqueue(offer, batch_id, total_leads=total_leads, force=force) for offer in offers]
+                return json_response(ScoreLeadsView.queued(jobs, total_leads, data), status.HTTP_202_ACCEPTED)
+
+            scoring_service = ScoringService()
+
+            if data.get('stream'):
+                content_type, encode = ScoreLeadsView.STREAM_FORMATS[data['stream']]
+                response = StreamingHttpResponse(
+                    self.stream_events(scoring_service, leads, offers, data, encode), content_type=content_type
+                )
+                response['Cache-Control'] = 'no-cache'
+                response['X-Accel-Buffering'] = 'no'
+                return response
+
+            scored_leads, errors = await scoring_service.ascore_leads_for_offers(leads, offers, incremental=not force)
+
+            response_data = ScoreLeadsView.summary(scoring_service, await leads.acount(), len(scored_leads), errors,
+                                                   offers, data)
+            return json_response(response_data)
+
+        except Offer.DoesNotExist:
+            return json_response({'error': f'Offer with id {offer_id} not found'}, status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return json_response({'error': f'Scoring failed: {str(e)}'}, status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @staticmethod
+    async def stream_events(scoring_service, leads, offers, data, encode):
+        """ScoreLeadsView.stream_events() as an async generator"""
+        total_leads = await leads.acount()
+        yield encode('start', {'total_leads': total_leads, 'offer_ids': [offer.id for offer in offers]})
+
+        scored_count = 0
+        errors = []
+        try:
+            batches = scoring_service.aiter_score_batches(
+                leads, offers, incremental=not data['force'],
+                flush_seconds=settings.SCORE_STREAM_FLUSH_SECONDS,
+                heartbeat_seconds=settings.SCORE_STREAM_HEARTBEAT_SECONDS,
+            )
+            async for batch in batches:
+                if batch is None:
+                    yield encode('heartbeat', {})
+                    continue
+                saved, failed = batch
+                scored_count += len(saved)
+                errors.extend(failed)
+                chunk = ''.join(
+                    encode('score', {'lead_id': score.lead_id, **LeadResultSerializer(score).data}) for score in saved
+                ) + ''.join(encode('error', {'error': message}) for message in failed)
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            yield encode('error', {'error': f'Scoring failed: {str(e)}', 'fatal': True})
+            return
+
+        yield encode('summary', ScoreLeadsView.summary(scoring_service, total_leads, scored_count, errors, offers, data))
+
+
+class AsyncResultsListView(AsyncAPIView):
+    """GET /results - Return scored leads (see ResultsListView)"""
+
+    async def get(self, request):
+        # DRF's request wrapper gives the paginators query_params and absolute URLs
+        request = Request(request)
+        queryset = filter_results(LeadScore.objects.only(*ResultsListView.COLUMNS), request.query_params)
+
+        if KeysetPagination.cursor_query_param in request.query_params:
+            paginator = KeysetPagination()
+            try:
+                rows = await sync_to_async(paginator.paginate_queryset)(queryset, request)
+            except NotFound as e:
+                return json_response({'detail': str(e.detail)}, status.HTTP_404_NOT_FOUND)
+        else:
+            paginator = api_settings.DEFAULT_PAGINATION_CLASS()
+            rows = await self.paginate_limit_offset(paginator, queryset, request)
+
+        data = LeadResultSerializer(rows, many=True).data
+        return json_response(paginator.get_paginated_response(data).data)
+
+    @staticmethod
+    async def paginate_limit_offset(paginator, queryset, request):
+        """LimitOffsetPagination.paginate_queryset() with async queries"""
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        paginator.offset = paginator.get_offset(request)
+        paginator.count = await queryset.acount()
+        if paginator.count == 0 or paginator.offset > paginator.count:
+            return []
+        return [row async for row in queryset[paginator.offset:paginator.offset + paginator.limit]]
+
+
+class AsyncExportResultsView(AsyncAPIView):
+    """GET /results/export - Export results as CSV (see ExportResultsView)"""
+
+    async def get(self, request):
+        rows = ExportResultsView.export_queryset(request.GET).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+        response = StreamingHttpResponse(self.stream_csv(rows), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="lead_scores.csv"'
+        return response
+
+    @staticmethod
+    async def stream_csv(rows):
+        """ExportResultsView.stream_csv() one chunk at a time, keeping memory flat under ASGI"""
+        # Every chunk is fetched and formatted on Django's sync thread, where the cursor lives
+        chunks = ExportResultsView().stream_csv(rows)
+        next_chunk = sync_to_async(next)
+        try:
+            while True:
+                chunk = await next_chunk(chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            await sync_to_async(chunks.close)()
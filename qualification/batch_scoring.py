@@ -0,0 +1,111 @@
+"""Vectorized rule scoring for whole batches of leads"""
+from typing import Dict, Iterator, Sequence, Tuple
+from .matchers import industry_matcher_for_offer, score_role
+
+# Safe NumPy import
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+LEAD_COLUMNS = ('id', 'name', 'role', 'company', 'industry', 'location', 'linkedin_bio')
+COMPLETENESS_COLUMNS = LEAD_COLUMNS[1:]
+
+
+class RuleScores:
+    """Rule-based score components for a batch of leads, as parallel arrays"""
+
+    def __init__(self, lead_ids, role_scores, industry_scores, completeness_scores):
+        self.lead_ids = lead_ids
+        self.role_scores = role_scores
+        self.industry_scores = industry_scores
+        self.completeness_scores = completeness_scores
+        self.rule_scores = role_scores.astype(np.int16) + industry_scores + completeness_scores
+
+    def __len__(self):
+        return len(self.lead_ids)
+
+    def rows(self) -> Iterator[Tuple[int, int, int]]:
+        """(role, industry, completeness) per lead as plain ints"""
+        return zip(self.role_scores.tolist(), self.industry_scores.tolist(), self.completeness_scores.tolist())
+
+    def as_dict(self) -> Dict[int, Tuple[int, int, int]]:
+        return dict(zip(self.lead_ids.tolist(), self.rows()))
+
+
+def _is_filled(value) -> bool:
+    return bool(value and value.strip())
+
+
+def _map_distinct(values: Sequence, func, dtype) -> 'np.ndarray':
+    """Apply ``func`` once per distinct value and broadcast the results.
+
+    Lead columns repeat heavily (roles, industries, locations), so string
+    work is paid per distinct value and the rest is array indexing.
+    """
+    index = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values),
+                        dtype=np.int64, count=len(values))
+    return np.array([func(value) for value in index], dtype=dtype)[codes]
+
+
+class LeadFeatures:
+    """Offer-independent rule scores for a batch of leads.
+
+    Role and completeness scores don't depend on the offer, so scoring the
+    same leads against several offers computes them once and only matches
+    industries per offer.
+    """
+
+    def __init__(self, lead_ids, industries: Sequence, role_scores, completeness_scores):
+        self.lead_ids = lead_ids
+        self.industries = industries
+        self.role_scores = role_scores
+        self.completeness_scores = completeness_scores
+
+    def for_offer(self, offer) -> RuleScores:
+        matcher = industry_matcher_for_offer(offer)
+        industry_scores = _map_distinct(self.industries, matcher.score, np.int8)
+        return RuleScores(self.lead_ids, self.role_scores, industry_scores, self.completeness_scores)
+
+
+def lead_feature_columns(columns: Dict[str, Sequence]) -> LeadFeatures:
+    """Compute role and completeness scores for column-oriented lead data"""
+    role_scores = _map_distinct(columns['role'], score_role, np.int8)
+
+    filled = np.zeros(len(columns['id']), dtype=np.int8)
+    for column in COMPLETENESS_COLUMNS:
+        filled += _map_distinct(columns[column], _is_filled, np.int8)
+
+    # All fields present = 10 points, most fields present = 5 points
+    completeness_scores = np.select(
+        [filled == len(COMPLETENESS_COLUMNS), filled >= 4], [10, 5], default=0
+    ).astype(np.int8)
+
+    return LeadFeatures(np.asarray(columns['id'], dtype=np.int64), columns['industry'],
+                        role_scores, completeness_scores)
+
+
+def score_rule_columns(columns: Dict[str, Sequence], offer) -> RuleScores:
+    """Compute role, industry and completeness scores for column-oriented lead data"""
+    return lead_feature_columns(columns).for_offer(offer)
+
+
+def score_rules_for_queryset(queryset, offer) -> RuleScores:
+    """Score every lead in ``queryset`` from a single values_list() query"""
+    rows = list(queryset.order_by().values_list(*LEAD_COLUMNS))
+    columns = dict(zip(LEAD_COLUMNS, zip(*rows))) if rows else {column: () for column in LEAD_COLUMNS}
+    return score_rule_columns(columns, offer)
+
+
+def lead_features_for_leads(leads: Sequence) -> LeadFeatures:
+    """Offer-independent scores for already-loaded Lead instances"""
+    columns = {column: [getattr(lead, column) for lead in leads] for column in LEAD_COLUMNS}
+    return lead_feature_columns(columns)
+
+
+def score_rules_for_leads(leads: Sequence, offer) -> RuleScores:
+    """Score already-loaded Lead instances"""
+    return lead_features_for_leads(leads).for_offer(offer)
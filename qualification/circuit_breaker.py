@@ -0,0 +1,115 @@
+"""Circuit breaker around the AI provider.
+
+After AI_CIRCUIT_FAILURE_THRESHOLD consecutive failed requests the circuit
+opens and requests fail immediately, so leads go straight to rule-based
+scoring instead of each waiting out timeouts and retries. After
+AI_CIRCUIT_RESET_SECONDS one probe request is let through (half-open); its
+success closes the circuit, its failure opens it for another cooldown. A
+probe that ends without either (its task was cancelled) is released, and
+one that never reports back expires after AI_CIRCUIT_RESET_SECONDS, so the
+circuit can't stay half-open forever.
+"""
+import threading
+import time
+from typing import Callable, Dict
+from django.conf import settings
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit is open"""
+
+
+class CircuitBreaker:
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        # Caller holds the lock
+        if self._state == STATE_OPEN and self._clock() - self._opened_at >= settings.AI_CIRCUIT_RESET_SECONDS:
+            self._state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+        if (self._state == STATE_HALF_OPEN and self._probe_in_flight
+                and self._clock() - self._probe_started_at >= settings.AI_CIRCUIT_RESET_SECONDS):
+            # The probe never reported back; let another one through
+            self._probe_in_flight = False
+        return self._state
+
+    def before_request(self) -> bool:
+        """Raise CircuitOpenError unless a request may be sent now; True if it is the half-open probe"""
+        with self._lock:
+            state = self._current_state()
+            if state == STATE_CLOSED:
+                return False
+            if state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._probe_started_at = self._clock()
+                return True
+            self.rejected += 1
+        raise CircuitOpenError('AI provider circuit is open')
+
+    def release_probe(self):
+        """Give up a probe that ended without recording success or failure"""
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            state = self._current_state()
+            if state == STATE_HALF_OPEN or (
+                state == STATE_CLOSED and self._failures >= settings.AI_CIRCUIT_FAILURE_THRESHOLD
+            ):
+                self._state = STATE_OPEN
+                self._opened_at = self._clock()
+                self._probe_in_flight = False
+                self.times_opened += 1
+
+    def reset(self):
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+            self.times_opened = self.rejected = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            state = self._current_state()
+            retry_in = 0.0
+            if state == STATE_OPEN:
+                retry_in = max(0.0, settings.AI_CIRCUIT_RESET_SECONDS - (self._clock() - self._opened_at))
+            return {
+                'state': state,
+                'consecutive_failures': self._failures,
+                'retry_in_seconds': round(retry_in, 1),
+                'times_opened': self.times_opened,
+                'rejected': self.rejected,
+            }
+
+
+# Shared by every ScoringService in the process
+openai_breaker = CircuitBreaker()
@@ -0,0 +1,22 @@
+"""Duplicate lead detection by normalized name, company and role"""
+import hashlib
+import re
+
+# What to do with an uploaded row whose fingerprint matches an existing lead
+DEDUP_SKIP = 'skip'    # don't create the row
+DEDUP_LINK = 'link'    # create it with duplicate_of pointing at the existing lead
+DEDUP_ALLOW = 'allow'  # create it as an independent lead
+DEDUP_POLICIES = (DEDUP_SKIP, DEDUP_LINK, DEDUP_ALLOW)
+
+_PUNCTUATION = re.compile(r'[^\w\s]+')
+
+
+def normalize(value: str) -> str:
+    """Case-fold, drop punctuation and collapse whitespace"""
+    return ' '.join(_PUNCTUATION.sub(' ', (value or '').casefold()).split())
+
+
+def lead_fingerprint(name: str, company: str, role: str) -> str:
+    """SHA-256 of the normalized identity fields, stored in Lead.fingerprint"""
+    payload = '\x1f'.join(normalize(value) for value in (name, company, role))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
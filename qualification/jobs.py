@@ -0,0 +1,87 @@
+import time
+from datetime import timedelta
+from typing import Optional
+from django.utils import timezone
+from .models import Lead, ScoringJob
+from .services import ScoringService
+
+# Flush job progress (and the worker heartbeat) to the database at most this often
+PROGRESS_INTERVAL_SECONDS = 2.0
+
+
+def enqueue_scoring_job(offer, batch_id: str = '', total_leads: int = 0, force: bool = False) -> ScoringJob:
+    """Queue a scoring run for the worker"""
+    return ScoringJob.objects.create(offer=offer, batch_id=batch_id or '', total_leads=total_leads, force=force)
+
+
+def claim_next_job() -> Optional[ScoringJob]:
+    """Atomically move the oldest queued job to running and return it.
+
+    The claim is a conditional UPDATE on the status column, so two workers
+    can never run the same job. This works the same on SQLite and
+    PostgreSQL without row locks or an external broker.
+    """
+    candidates = ScoringJob.objects.filter(status=ScoringJob.STATUS_QUEUED).order_by('created_at')
+    for job_id in candidates.values_list('id', flat=True)[:10]:
+        now = timezone.now()
+        claimed = ScoringJob.objects.filter(id=job_id, status=ScoringJob.STATUS_QUEUED).update(
+            status=ScoringJob.STATUS_RUNNING, started_at=now, updated_at=now
+        )
+        if claimed:
+            return ScoringJob.objects.select_related('offer').get(id=job_id)
+    return None
+
+
+def requeue_stale_jobs(stale_after_seconds: int) -> int:
+    """Put running jobs whose worker stopped heartbeating back in the queue"""
+    cutoff = timezone.now() - timedelta(seconds=stale_after_seconds)
+    return ScoringJob.objects.filter(status=ScoringJob.STATUS_RUNNING, updated_at__lt=cutoff).update(
+        status=ScoringJob.STATUS_QUEUED, updated_at=timezone.now()
+    )
+
+
+def run_job(job: ScoringJob, scoring_service: Optional[ScoringService] = None) -> ScoringJob:
+    """Score every lead of a claimed job, recording progress as it goes"""
+    scoring_service = scoring_service or ScoringService()
+
+    try:
+        leads = Lead.objects.filter(upload_batch=job.batch_id) if job.batch_id else Lead.objects.all()
+        job.total_leads = leads.count()
+        job.save(update_fields=['total_leads', 'updated_at'])
+
+        last_flush = time.monotonic()
+        scored_count = 0
+        errors = []
+
+        # Progress doubles as the heartbeat that keeps requeue_stale_jobs() away.
+        # With heartbeat_seconds the loop also wakes while AI requests are slow,
+        # so a long write batch under throttling can't look like a dead worker.
+        batches = scoring_service.iter_score_batches(
+            leads.iterator(chunk_size=500), [job.offer], incremental=not job.force,
+            heartbeat_seconds=PROGRESS_INTERVAL_SECONDS
+        )
+        for batch in batches:
+            if batch is not None:
+                saved, failed = batch
+                scored_count += len(saved)
+                errors.extend(failed)
+            if time.monotonic() - last_flush < PROGRESS_INTERVAL_SECONDS:
+                continue
+            last_flush = time.monotonic()
+            ScoringJob.objects.filter(id=job.id).update(
+                scored_leads=scored_count, failed_leads=len(errors), skipped_leads=scoring_service.skipped_leads,
+                updated_at=timezone.now()
+            )
+
+        job.scored_leads = scored_count
+        job.failed_leads = len(errors)
+        job.skipped_leads = scoring_service.skipped_leads
+        job.errors = errors[:10]  # Limit error messages
+        job.status = ScoringJob.STATUS_COMPLETED
+    except Exception as e:
+        job.errors = (job.errors or [])[:9] + [f'Scoring failed: {str(e)}']
+        job.status = ScoringJob.STATUS_FAILED
+
+    job.finished_at = timezone.now()
+    job.save()
+    return job
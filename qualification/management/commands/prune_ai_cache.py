@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from qualification.ai_cache import ai_response_cache
+
+
+class Command(BaseCommand):
+    help = 'Delete expired cached AI responses and trim the table to AI_CACHE_DB_MAX_ENTRIES'
+
+    def handle(self, *args, **options):
+        deleted = ai_response_cache.prune()
+        self.stdout.write(f'Deleted {deleted} cached AI response(s)')
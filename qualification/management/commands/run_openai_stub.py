@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from qualification.ai_stub import DISTRIBUTIONS, OpenAIStubServer
+
+
+class Command(BaseCommand):
+    help = 'Serve a local stand-in for the OpenAI chat-completions API for load and latency testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--latency', type=float, default=0.3,
+                            help='Seconds per completion (the median for lognormal)')
+        parser.add_argument('--distribution', choices=DISTRIBUTIONS, default='lognormal')
+        parser.add_argument('--sigma', type=float, default=0.5, help='Spread of the lognormal distribution')
+        parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 500')
+        parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                            help='Share of requests answered with a 429')
+        parser.add_argument('--retry-after', type=float, default=1.0, help='Seconds requested by each 429')
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        server = OpenAIStubServer(
+            host=options['host'],
+            port=options['port'],
+            latency=options['latency'],
+            distribution=options['distribution'],
+            latency_sigma=options['sigma'],
+            error_rate=options['error_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            retry_after=options['retry_after'],
+            seed=options['seed'],
+        )
+        self.stdout.write(
+            f"OpenAI stub listening on {server.base_url} "
+            f"({options['distribution']} latency {options['latency'] * 1000:.0f} ms, "
+            f"{options['error_rate']:.0%} errors, {options['rate_limit_rate']:.0%} 429s)\n"
+            f"Point the app at it with OPENAI_API_KEY=stub OPENAI_BASE_URL={server.base_url}"
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(' '.join(f"{key}={value}" for key, value in server.stats().items()))
@@ -0,0 +1,40 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from qualification.jobs import claim_next_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Claim and run queued scoring jobs (POST /score with "background": true)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to wait between polls when the queue is empty')
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help='Requeue running jobs with no progress for this many seconds')
+
+    def handle(self, *args, **options):
+        self.stdout.write('Scoring worker started')
+        try:
+            while True:
+                close_old_connections()
+                requeued = requeue_stale_jobs(options['stale_after'])
+                if requeued:
+                    self.stdout.write(f'Requeued {requeued} stale job(s)')
+
+                job = claim_next_job()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                self.stdout.write(f'Running job {job.id} (offer {job.offer_id}, batch {job.batch_id or "all"})')
+                job = run_job(job)
+                self.stdout.write(f'Job {job.id} {job.status}: {job.scored_leads}/{job.total_leads} scored, '
+                                  f'{job.skipped_leads} unchanged')
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write('Scoring worker stopped')
@@ -0,0 +1,161 @@
+"""Keyword matchers used by rule-based scoring, compiled once and reused"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable, List
+
+# Decision maker roles (20 points)
+DECISION_MAKER_KEYWORDS = (
+    'ceo', 'cto', 'cfo', 'cmo', 'vp', 'vice president', 'president',
+    'director', 'head of', 'chief', 'founder', 'owner', 'manager',
+    'lead', 'principal', 'senior manager'
+)
+
+# Influencer roles (10 points)
+INFLUENCER_KEYWORDS = (
+    'senior', 'specialist', 'analyst', 'coordinator', 'supervisor',
+    'team lead', 'project manager', 'product manager', 'marketing manager'
+)
+
+
+def compile_keywords(keywords: Iterable[str], shadowed_by: Iterable[str] = ()) -> re.Pattern:
+    """One alternation regex that matches if any keyword is a substring.
+    
+    Keywords containing another keyword of the same or a higher-priority
+    list (``shadowed_by``) can never change the result and are dropped.
+    """
+    keywords = list(dict.fromkeys(keywords))
+    blockers = list(shadowed_by) + keywords
+    needed = [
+        keyword for keyword in keywords
+        if not any(other != keyword and other in keyword for other in blockers)
+    ]
+    return re.compile('|'.join(re.escape(keyword) for keyword in needed))
+
+
+_DECISION_MAKER_PATTERN = compile_keywords(DECISION_MAKER_KEYWORDS)
+_INFLUENCER_PATTERN = compile_keywords(INFLUENCER_KEYWORDS, shadowed_by=DECISION_MAKER_KEYWORDS)
+
+
+def score_role(role: str) -> int:
+    """Calculate score based on role relevance (max 20 points)"""
+    if not role:
+        return 0
+    
+    role_lower = role.lower()
+    
+    # Decision maker terms win wherever they appear in the title
+    if _DECISION_MAKER_PATTERN.search(role_lower):
+        return 20
+    
+    if _INFLUENCER_PATTERN.search(role_lower):
+        return 10
+    
+    return 0
+
+
+# Adjacent/related industries (10 points)
+ADJACENT_INDUSTRIES = {
+    'saas': ['software', 'technology', 'tech', 'b2b', 'enterprise'],
+    'software': ['saas', 'technology', 'tech', 'it', 'digital'],
+    'technology': ['software', 'saas', 'tech', 'it', 'digital'],
+    'b2b': ['saas', 'enterprise', 'business', 'corporate'],
+    'enterprise': ['b2b', 'corporate', 'business', 'large'],
+    'mid-market': ['medium', 'middle', 'smb', 'small business'],
+    'fintech': ['finance', 'financial', 'banking', 'payments'],
+    'healthcare': ['medical', 'health', 'pharma', 'biotech'],
+    'ecommerce': ['retail', 'commerce', 'online', 'marketplace'],
+}
+
+
+class IndustryMatcher:
+    """Industry scoring against one offer's ideal use cases.
+    
+    Everything that depends only on the offer is worked out up front:
+    
+    * an exact match needs a use case inside the industry (one regex) or
+      the industry inside a use case (one substring check on the joined
+      use cases);
+    * an adjacent match needs the industry to contain either an adjacent
+      term of a mapping key found in a use case, or a mapping key whose
+      adjacent terms appear in a use case that lacks the key. Both sets of
+      terms are collected into a single regex.
+    
+    Scores are memoized per industry string, since batches repeat them.
+    """
+    
+    MEMO_SIZE = 10000
+    _SEPARATOR = '\x00'
+    
+    def __init__(self, ideal_use_cases: List[str], version=None):
+        self.version = version
+        self.use_cases = [use_case.lower() for use_case in ideal_use_cases or []]
+        self._joined_use_cases = self._SEPARATOR.join(self.use_cases)
+        self._exact_pattern = compile_keywords(self.use_cases) if self.use_cases else None
+        
+        adjacent_terms = []
+        for use_case in self.use_cases:
+            for key, adjacents in ADJACENT_INDUSTRIES.items():
+                if key in use_case:
+                    adjacent_terms.extend(adjacents)
+                elif any(adjacent in use_case for adjacent in adjacents):
+                    adjacent_terms.append(key)
+        self._adjacent_pattern = compile_keywords(adjacent_terms) if adjacent_terms else None
+        self._memo = {}
+    
+    def score(self, industry: str) -> int:
+        """Calculate score based on industry match (max 20 points)"""
+        if not industry or not self.use_cases:
+            return 0
+        
+        score = self._memo.get(industry)
+        if score is None:
+            score = self._score(industry.lower())
+            if len(self._memo) < self.MEMO_SIZE:
+                self._memo[industry] = score
+        return score
+    
+    def _score(self, industry_lower: str) -> int:
+        # Check for exact matches (20 points)
+        if self._exact_pattern.search(industry_lower):
+            return 20
+        if self._SEPARATOR in industry_lower:
+            # Could straddle two use cases in the joined string
+            if any(industry_lower in use_case for use_case in self.use_cases):
+                return 20
+        elif industry_lower in self._joined_use_cases:
+            return 20
+        
+        # Check for adjacent/related industries (10 points)
+        if self._adjacent_pattern and self._adjacent_pattern.search(industry_lower):
+            return 10
+        
+        return 0
+
+
+_offer_matchers = OrderedDict()
+_offer_matchers_lock = threading.Lock()
+OFFER_MATCHER_CACHE_SIZE = 128
+
+
+def industry_matcher_for_offer(offer) -> IndustryMatcher:
+    """Return the offer's IndustryMatcher, rebuilt whenever the offer is saved.
+    
+    Matchers are cached per offer id and invalidated by ``updated_at``.
+    """
+    if offer.pk is None:
+        return IndustryMatcher(offer.ideal_use_cases)
+    
+    with _offer_matchers_lock:
+        matcher = _offer_matchers.get(offer.pk)
+        if matcher is not None and matcher.version == offer.updated_at:
+            _offer_matchers.move_to_end(offer.pk)
+            return matcher
+    
+    matcher = IndustryMatcher(offer.ideal_use_cases, version=offer.updated_at)
+    with _offer_matchers_lock:
+        _offer_matchers[offer.pk] = matcher
+        _offer_matchers.move_to_end(offer.pk)
+        while len(_offer_matchers) > OFFER_MATCHER_CACHE_SIZE:
+            _offer_matchers.popitem(last=False)
+    return matcher
@@ -0,0 +1,138 @@
+"""Prometheus metrics for scoring, AI calls and uploads.
+
+``stage_timer(stage)`` times one stage of the /score hot path (rules,
+prompt, ai_request, parse, db_write, ...) into a single histogram labelled
+by stage. Counters track AI requests by outcome, fallbacks, AI cache
+lookups, scored leads and uploaded rows; GET /metrics renders them in the
+Prometheus text format.
+
+Under gunicorn every worker is its own process, so PROMETHEUS_MULTIPROC_DIR
+must point at a directory shared by the workers (gunicorn.conf.py sets one
+up): each process writes its samples there and /metrics adds them up. Run
+the scoring worker with the same directory and its samples are included.
+
+Without prometheus_client installed every metric is a no-op.
+"""
+import os
+import time
+from contextlib import contextmanager
+from typing import Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+# Safe prometheus_client import
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+    )
+    PROMETHEUS_AVAILABLE = True
+except ImportError:
+    PROMETHEUS_AVAILABLE = False
+
+# From well under a millisecond (rules for a chunk, parsing) to slow AI calls
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+REQUEST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+UPLOAD_RATE_BUCKETS = (100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000)
+
+
+class _NoopMetric:
+    """Stands in for a metric when prometheus_client is missing"""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, amount):
+        pass
+
+
+if PROMETHEUS_AVAILABLE:
+    SCORING_STAGE_SECONDS = Histogram(
+        'leadscoring_stage_seconds', 'Time spent per scoring stage', ['stage'], buckets=STAGE_BUCKETS
+    )
+    AI_REQUESTS = Counter(
+        'leadscoring_ai_requests', 'AI provider requests by outcome (one per attempt)', ['outcome']
+    )
+    AI_FALLBACKS = Counter(
+        'leadscoring_ai_fallbacks', 'Leads scored by rules instead of AI', ['reason']
+    )
+    AI_CACHE_LOOKUPS = Counter(
+        'leadscoring_ai_cache_lookups', 'In-process AI response cache lookups', ['result']
+    )
+    SCORED_LEADS = Counter(
+        'leadscoring_leads', 'Leads processed by scoring runs', ['result']
+    )
+    UPLOAD_ROWS = Counter(
+        'leadscoring_upload_rows', 'CSV rows processed by uploads', ['result']
+    )
+    UPLOAD_ROWS_PER_SECOND = Histogram(
+        'leadscoring_upload_rows_per_second', 'Rows per second of each upload', buckets=UPLOAD_RATE_BUCKETS
+    )
+    REQUEST_SECONDS = Histogram(
+        'leadscoring_request_seconds', 'API request latency', ['view', 'method', 'status'], buckets=REQUEST_BUCKETS
+    )
+else:
+    SCORING_STAGE_SECONDS = AI_REQUESTS = AI_FALLBACKS = AI_CACHE_LOOKUPS = _NoopMetric()
+    SCORED_LEADS = UPLOAD_ROWS = UPLOAD_ROWS_PER_SECOND = REQUEST_SECONDS = _NoopMetric()
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Record the time spent in the block under ``stage``, even if it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SCORING_STAGE_SECONDS.labels(stage).observe(time.perf_counter() - start)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Exposition body and content type, aggregated across processes when multiprocess"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+class RequestMetricsMiddleware:
+    """Observe the latency of every API request, labelled by URL name.
+
+    Streamed responses (the CSV export) are timed up to their headers.
+    Works in sync and async chains, so async views run without a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, start)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, start)
+        return response
+
+    @staticmethod
+    def observe(request, response, start: float):
+        match = request.resolver_match
+        # Unmatched paths share one label so scanners can't blow up cardinality
+        view = match.url_name if match and match.url_name else 'unmatched'
+        if view != 'metrics':
+            REQUEST_SECONDS.labels(view, request.method, str(response.status_code)).observe(
+                time.perf_counter() - start
+            )
@@ -0,0 +1,37 @@
+"""Middleware adapted for async views.
+
+Django runs a sync-only middleware in a thread and the rest of the chain
+through ``async_to_sync`` from it, so one sync-only middleware is enough
+for every request served by an async view to hold a thread while it
+waits. WhiteNoise 6 is sync-only; this subclass adds the async path.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """WhiteNoiseMiddleware that also works in an async middleware chain"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        # Static lookups are an in-memory dict (a stat() with autorefresh), cheap enough for the loop
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualification', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoringJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.CharField(blank=True, help_text='Batch to score (blank scores all leads)', max_length=100)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='queued', max_length=10)),
+                ('total_leads', models.IntegerField(default=0)),
+                ('scored_leads', models.IntegerField(default=0)),
+                ('failed_leads', models.IntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list, help_text='First error messages from the run')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Doubles as the worker heartbeat')),
+                ('offer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scoring_jobs', to='qualification.offer')),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+    ]
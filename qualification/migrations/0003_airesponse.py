@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualification', '0002_scoringjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIResponse',
+            fields=[
+                ('key', models.CharField(help_text='SHA-256 of model, prompt version and contexts', max_length=64, primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=100)),
+                ('intent', models.CharField(choices=[('High', 'High'), ('Medium', 'Medium'), ('Low', 'Low')], max_length=10)),
+                ('reasoning', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
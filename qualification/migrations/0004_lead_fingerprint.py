@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+from qualification.dedup import lead_fingerprint
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """Fingerprint existing leads and link later copies to the oldest one"""
+    Lead = apps.get_model('qualification', 'Lead')
+    canonical = {}
+    batch = []
+    for lead in Lead.objects.order_by('id').only('id', 'name', 'company', 'role').iterator(chunk_size=2000):
+        lead.fingerprint = lead_fingerprint(lead.name, lead.company, lead.role)
+        lead.duplicate_of_id = canonical.setdefault(lead.fingerprint, lead.id)
+        if lead.duplicate_of_id == lead.id:
+            lead.duplicate_of_id = None
+        batch.append(lead)
+        if len(batch) >= 2000:
+            Lead.objects.bulk_update(batch, ['fingerprint', 'duplicate_of'])
+            batch = []
+    if batch:
+        Lead.objects.bulk_update(batch, ['fingerprint', 'duplicate_of'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualification', '0003_airesponse'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earlier lead with the same fingerprint', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='qualification.lead'),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, help_text='SHA-256 of normalized name, company and role', max_length=64),
+        ),
+        migrations.RunPython(backfill_fingerprints, migrations.RunPython.noop),
+    ]
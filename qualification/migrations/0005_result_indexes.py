@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualification', '0004_lead_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leadscore',
+            name='offer',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='qualification.offer'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['upload_batch'], name='lead_upload_batch_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leadscore',
+            index=models.Index(fields=['offer', '-total_score', '-created_at'], name='leadscore_offer_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leadscore',
+            index=models.Index(fields=['offer', 'intent_label', '-total_score', '-created_at'], name='leadscore_offer_intent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leadscore',
+            index=models.Index(fields=['intent_label', '-total_score', '-created_at'], name='leadscore_intent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leadscore',
+            index=models.Index(fields=['-total_score', '-created_at'], name='leadscore_ranking_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualification', '0005_result_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='leadscore',
+            options={'ordering': ['-total_score', '-created_at', '-id']},
+        ),
+        migrations.RemoveIndex(
+            model_name='leadscore',
+            name='leadscore_offer_rank_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='leadscore',
+            name='leadscore_offer_intent_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='leadscore',
+            name='leadscore_intent_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='leadscore',
+            name='leadscore_ranking_idx',
+        ),
+        migrations.AddIndex(
+            model_name='leadscore',
+            index=models.Index(fields=['offer', '-total_score', '-created_at', '-id'], name='leadscore_offer_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leadscore',
+            index=models.Index(fields=['offer', 'intent_label', '-total_score', '-created_at', '-id'], name='leadscore_offer_intent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leadscore',
+            index=models.Index(fields=['intent_label', '-total_score', '-created_at', '-id'], name='leadscore_intent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leadscore',
+            index=models.Index(fields=['-total_score', '-created_at', '-id'], name='leadscore_ranking_idx'),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:01
+
+from django.db import migrations, models
+from qualification.reasoning import build_reasoning
+
+READ_MODEL_FIELDS = [
+    'reasoning', 'lead_name', 'lead_role', 'lead_company', 'lead_industry', 'lead_location', 'upload_batch',
+]
+
+
+def backfill_read_model(apps, schema_editor):
+    """Fill reasoning and the copied lead columns for existing scores"""
+    LeadScore = apps.get_model('qualification', 'LeadScore')
+    batch = []
+    for score in LeadScore.objects.select_related('lead').order_by('id').iterator(chunk_size=2000):
+        lead = score.lead
+        score.reasoning = build_reasoning(score.role_score, score.industry_score, score.completeness_score,
+                                          score.ai_reasoning)
+        score.lead_name, score.lead_role, score.lead_company = lead.name, lead.role, lead.company
+        score.lead_industry, score.lead_location, score.upload_batch = lead.industry, lead.location, lead.upload_batch
+        batch.append(score)
+        if len(batch) >= 2000:
+            LeadScore.objects.bulk_update(batch, READ_MODEL_FIELDS)
+            batch = []
+    if batch:
+        LeadScore.objects.bulk_update(batch, READ_MODEL_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualification', '0006_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leadscore',
+            name='lead_company',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='leadscore',
+            name='lead_industry',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='leadscore',
+            name='lead_location',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='leadscore',
+            name='lead_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='leadscore',
+            name='lead_role',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='leadscore',
+            name='reasoning',
+            field=models.TextField(blank=True, help_text='Rule and AI explanation shown in results'),
+        ),
+        migrations.AddField(
+            model_name='leadscore',
+            name='upload_batch',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.RunPython(backfill_read_model, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='leadscore',
+            index=models.Index(fields=['upload_batch', '-total_score', '-created_at', '-id'], name='leadscore_batch_idx'),
+        ),
+    ]
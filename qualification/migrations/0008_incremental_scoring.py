@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualification', '0007_results_read_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='leadscore',
+            name='lead_hash',
+            field=models.CharField(blank=True, help_text='ScoringService.lead_hash() when scored', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='leadscore',
+            name='offer_version',
+            field=models.DateTimeField(blank=True, help_text='Offer.updated_at when scored', null=True),
+        ),
+        migrations.AddField(
+            model_name='scoringjob',
+            name='force',
+            field=models.BooleanField(default=False, help_text='Re-score leads whose score is still current'),
+        ),
+        migrations.AddField(
+            model_name='scoringjob',
+            name='skipped_leads',
+            field=models.IntegerField(default=0, help_text='Leads left alone because their score was current'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-17 03:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qualification', '0008_incremental_scoring'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='leadscore',
+            constraint=models.UniqueConstraint(fields=('lead', 'offer'), name='leadscore_lead_offer_uniq'),
+        ),
+        migrations.AlterField(
+            model_name='leadscore',
+            name='lead',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='scores', to='qualification.lead'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 import json
+from .dedup import lead_fingerprint
+from .reasoning import build_reasoning
 
 
 class Offer(models.Model):
@@ -27,13 +29,30 @@ class Lead(models.Model):
     location = models.CharField(max_length=255, blank=True)
     linkedin_bio = models.TextField(blank=True)
     upload_batch = models.CharField(max_length=100, help_text="Batch identifier for uploaded leads")
+    fingerprint = models.CharField(
+        max_length=64, blank=True, db_index=True,
+        help_text="SHA-256 of normalized name, company and role"
+    )
+    duplicate_of = models.ForeignKey(
+        'self', null=True, blank=True, on_delete=models.SET_NULL, related_name='duplicates',
+        help_text="Earlier lead with the same fingerprint"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
+    def save(self, *args, **kwargs):
+        # bulk_create() skips this, so bulk inserts set the fingerprint themselves
+        self.fingerprint = lead_fingerprint(self.name, self.company, self.role)
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.name} - {self.company}"
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # /score and /results?batch_id=
+            models.Index(fields=['upload_batch'], name='lead_upload_batch_idx'),
+        ]
 
 
 class LeadScore(models.Model):
@@ -44,8 +63,10 @@ class LeadScore(models.Model):
         ('Low', 'Low'),
     ]
     
-    lead = models.OneToOneField(Lead, on_delete=models.CASCADE, related_name='score')
-    offer = models.ForeignKey(Offer, on_delete=models.CASCADE)
+    # One score per (lead, offer); the unique constraint's index covers lookups by lead
+    lead = models.ForeignKey(Lead, on_delete=models.CASCADE, related_name='scores', db_index=False)
+    # Covered by the offer-first composite indexes in Meta
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, db_index=False)
     
     # Rule-based scoring (max 50 points)
     role_score = models.IntegerField(
@@ -90,9 +111,37 @@ class LeadScore(models.Model):
         help_text="Final intent classification"
     )
     
+    # Read model for /results and /results/export, filled in at write time
+    reasoning = models.TextField(blank=True, help_text="Rule and AI explanation shown in results")
+    lead_name = models.CharField(max_length=255, blank=True)
+    lead_role = models.CharField(max_length=255, blank=True)
+    lead_company = models.CharField(max_length=255, blank=True)
+    lead_industry = models.CharField(max_length=255, blank=True)
+    lead_location = models.CharField(max_length=255, blank=True)
+    upload_batch = models.CharField(max_length=100, blank=True)
+    
+    # Inputs the score was computed from; unchanged inputs skip incremental re-scoring
+    offer_version = models.DateTimeField(null=True, blank=True, help_text="Offer.updated_at when scored")
+    lead_hash = models.CharField(max_length=64, blank=True, help_text="ScoringService.lead_hash() when scored")
+    
     created_at = models.DateTimeField(auto_now_add=True)
     
-    def save(self, *args, **kwargs):
+    def calculate_derived_fields(self):
+        """Derive totals, intent label, reasoning and the copied lead columns.
+        
+        Called by save(); bulk writes bypass save() and call it directly.
+        """
+        lead = self.lead
+        self.lead_name = lead.name
+        self.lead_role = lead.role
+        self.lead_company = lead.company
+        self.lead_industry = lead.industry
+        self.lead_location = lead.location
+        self.upload_batch = lead.upload_batch
+        
+        self.reasoning = build_reasoning(self.role_score, self.industry_score, self.completeness_score,
+                                         self.ai_reasoning)
+        
         # Calculate total score
         rule_score = self.role_score + self.industry_score + self.completeness_score
         self.total_score = rule_score + self.ai_score
@@ -104,7 +153,9 @@ class LeadScore(models.Model):
             self.intent_label = 'Medium'
         else:
             self.intent_label = 'Low'
-            
+    
+    def save(self, *args, **kwargs):
+        self.calculate_derived_fields()
         super().save(*args, **kwargs)
     
     @property
@@ -115,4 +166,73 @@ class LeadScore(models.Model):
         return f"{self.lead.name} - {self.intent_label} ({self.total_score})"
     
     class Meta:
-        ordering = ['-total_score', '-created_at']
+        ordering = ['-total_score', '-created_at', '-id']
+        constraints = [
+            models.UniqueConstraint(fields=['lead', 'offer'], name='leadscore_lead_offer_uniq'),
+        ]
+        indexes = [
+            # /results and /results/export filters, in ranking order; id makes
+            # the order total so keyset pagination can seek on it
+            models.Index(fields=['offer', '-total_score', '-created_at', '-id'], name='leadscore_offer_rank_idx'),
+            models.Index(fields=['offer', 'intent_label', '-total_score', '-created_at', '-id'],
+                         name='leadscore_offer_intent_idx'),
+            models.Index(fields=['intent_label', '-total_score', '-created_at', '-id'], name='leadscore_intent_idx'),
+            models.Index(fields=['upload_batch', '-total_score', '-created_at', '-id'], name='leadscore_batch_idx'),
+            models.Index(fields=['-total_score', '-created_at', '-id'], name='leadscore_ranking_idx'),
+        ]
+
+
+class AIResponse(models.Model):
+    """Cached AI assessment, keyed by a hash of the prompt inputs"""
+    key = models.CharField(max_length=64, primary_key=True, help_text="SHA-256 of model, prompt version and contexts")
+    model = models.CharField(max_length=100)
+    intent = models.CharField(max_length=10, choices=LeadScore.INTENT_CHOICES)
+    reasoning = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+    
+    def __str__(self):
+        return f"{self.key[:12]} - {self.intent}"
+
+
+class ScoringJob(models.Model):
+    """Background scoring run queued through POST /score"""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    offer = models.ForeignKey(Offer, on_delete=models.CASCADE, related_name='scoring_jobs')
+    batch_id = models.CharField(max_length=100, blank=True, help_text="Batch to score (blank scores all leads)")
+    force = models.BooleanField(default=False, help_text="Re-score leads whose score is still current")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    
+    # Progress counters
+    total_leads = models.IntegerField(default=0)
+    scored_leads = models.IntegerField(default=0)
+    failed_leads = models.IntegerField(default=0)
+    skipped_leads = models.IntegerField(default=0, help_text="Leads left alone because their score was current")
+    errors = models.JSONField(default=list, blank=True, help_text="First error messages from the run")
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, help_text="Doubles as the worker heartbeat")
+    
+    @property
+    def progress(self):
+        if not self.total_leads:
+            return 100 if self.status == self.STATUS_COMPLETED else 0
+        return round(100 * (self.scored_leads + self.failed_leads + self.skipped_leads) / self.total_leads)
+    
+    def __str__(self):
+        return f"Job {self.id} - {self.status} ({self.scored_leads}/{self.total_leads})"
+    
+    class Meta:
+        ordering = ['created_at']
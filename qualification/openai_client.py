@@ -0,0 +1,139 @@
+"""One pooled OpenAI client per worker process.
+
+Building an ``OpenAI`` client creates a fresh HTTP connection pool, so a
+client per ScoringService meant a TCP and TLS handshake on the first calls
+of every /score request. ``get_openai_client()`` builds the client once,
+lazily and under a lock, on top of an ``httpx.Client`` whose keep-alive pool
+and timeouts come from settings. The client is rebuilt after a fork so
+pre-forked workers never share sockets with their parent, and whenever
+OPENAI_API_KEY or OPENAI_BASE_URL change (e.g. to point at the local stub
+in ``qualification.ai_stub``).
+
+Async views use ``get_async_openai_client()`` instead: an ``AsyncOpenAI``
+on an ``httpx.AsyncClient`` with the same pool settings. Async connections
+belong to the event loop that opened them, so clients are kept per loop
+(one per ASGI worker process in practice). httpcore's pool does work
+quadratic in its connection count on every request, which dominated CPU
+with hundreds of AI calls in flight, so a loop gets one client of
+AI_HTTP_POOL_SIZE connections per that many allowed in-flight calls
+(AI_PROCESS_CONCURRENCY) and hands them out in turn.
+"""
+import asyncio
+import itertools
+import logging
+import math
+import os
+import threading
+import weakref
+from typing import Optional
+from django.conf import settings
+
+# Safe OpenAI import
+try:
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+    AsyncOpenAI = OpenAI = None
+
+PLACEHOLDER_API_KEY = 'your_openai_api_key_here'
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_client_config = None
+
+# Event loop -> (config, clients in turn); entries go away with their loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _http_options():
+    timeout = httpx.Timeout(settings.AI_REQUEST_TIMEOUT, connect=settings.AI_CONNECT_TIMEOUT)
+    limits = httpx.Limits(
+        max_connections=settings.AI_HTTP_POOL_SIZE,
+        max_keepalive_connections=settings.AI_HTTP_POOL_SIZE,
+        keepalive_expiry=settings.AI_HTTP_KEEPALIVE_SECONDS,
+    )
+    return timeout, limits
+
+
+def build_openai_client(api_key: str, base_url: Optional[str] = None):
+    """New OpenAI client with its own pooled HTTP client"""
+    timeout, limits = _http_options()
+    http_client = httpx.Client(timeout=timeout, limits=limits)
+    # Retries are ours (see ScoringService._request_completion), not the SDK's
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, timeout=timeout, max_retries=0)
+
+
+def build_async_openai_client(api_key: str, base_url: Optional[str] = None, ssl_context=None):
+    """New AsyncOpenAI client with its own pooled async HTTP client"""
+    timeout, limits = _http_options()
+    http_client = httpx.AsyncClient(timeout=timeout, limits=limits, verify=ssl_context or True)
+    return AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, timeout=timeout, max_retries=0)
+
+
+def _configured() -> Optional[tuple]:
+    """(api key, base url), or None when OpenAI is not configured"""
+    api_key = settings.OPENAI_API_KEY
+    if not (OPENAI_AVAILABLE and api_key and api_key != PLACEHOLDER_API_KEY):
+        return None
+    return api_key, settings.OPENAI_BASE_URL
+
+
+def get_openai_client():
+    """The process-wide client, or None when OpenAI is not configured"""
+    global _client, _client_pid, _client_config
+    config = _configured()
+    if config is None:
+        return None
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid and _client_config == config:
+        return _client
+    with _lock:
+        if _client is None or _client_pid != pid or _client_config != config:
+            if _client is not None and _client_pid == pid:
+                _client.close()
+            try:
+                _client = build_openai_client(*config)
+                _client_pid = pid
+                _client_config = config
+            except Exception as e:
+                logger.error("Failed to initialize OpenAI client: %s", e)
+                return None
+        return _client
+
+
+def get_async_openai_client():
+    """The next of the running event loop's async clients, or None when OpenAI is not configured"""
+    config = _configured()
+    if config is None:
+        return None
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(loop)
+    if entry is None or entry[0] != config:
+        in_flight = settings.AI_PROCESS_CONCURRENCY or settings.AI_SCORING_CONCURRENCY
+        count = max(1, math.ceil(in_flight / max(1, settings.AI_HTTP_POOL_SIZE)))
+        # Only the loop's own coroutines touch its entry, so no lock is needed
+        try:
+            # Loading the CA bundle takes tens of milliseconds; do it once for all of them
+            ssl_context = httpx.create_ssl_context()
+            clients = [build_async_openai_client(*config, ssl_context=ssl_context) for _ in range(count)]
+        except Exception as e:
+            logger.error("Failed to initialize async OpenAI client: %s", e)
+            return None
+        entry = _async_clients[loop] = (config, itertools.cycle(clients))
+    return next(entry[1])
+
+
+def close_openai_client():
+    """Close the pooled connections; the next get_openai_client() builds a new client"""
+    global _client, _client_pid, _client_config
+    with _lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+        _client_config = None
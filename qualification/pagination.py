@@ -0,0 +1,105 @@
+import base64
+import json
+from collections import OrderedDict
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only keyset pagination over (-total_score, -created_at, -id).
+
+    Each page filters for rows after the last one of the previous page
+    instead of using OFFSET, so deep pages cost the same as the first when
+    an index matches the ordering. COUNT(*) only runs for ``count=true``.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    count_query_param = 'count'
+    max_page_size = 1000
+    ordering = ('-total_score', '-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        self.count = queryset.count() if self.wants_count(request) else None
+        if position is not None:
+            queryset = queryset.filter(self.rows_after(*position))
+
+        # One extra row tells us whether there is a next page
+        rows = list(queryset[:self.page_size + 1])
+        self.next_position = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            last = rows[-1]
+            self.next_position = (last.total_score, last.created_at, last.id)
+        return rows
+
+    def get_paginated_response(self, data):
+        fields = [('next', self.get_next_link())]
+        if self.count is not None:
+            fields.append(('count', self.count))
+        fields.append(('results', data))
+        return Response(OrderedDict(fields))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+            if page_size > 0:
+                return min(page_size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return api_settings.PAGE_SIZE
+
+    def wants_count(self, request) -> bool:
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true')
+
+    @staticmethod
+    def rows_after(total_score, created_at, pk) -> Q:
+        # The leading total_score bound lets the planner range-scan the index
+        return Q(total_score__lte=total_score) & (
+            Q(total_score__lt=total_score)
+            | Q(total_score=total_score, created_at__lt=created_at)
+            | Q(total_score=total_score, created_at=created_at, id__lt=pk)
+        )
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        total_score, created_at, pk = self.next_position
+        payload = json.dumps([total_score, created_at.isoformat(), pk]).encode('utf-8')
+        cursor = base64.urlsafe_b64encode(payload).decode('ascii')
+        url = remove_query_param(self.request.build_absolute_uri(), self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """Return (total_score, created_at, id) from the cursor, or None for the first page"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            total_score, created_at, pk = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            created_at = parse_datetime(created_at)
+            if created_at is None:
+                raise ValueError(created_at)
+            return int(total_score), created_at, int(pk)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
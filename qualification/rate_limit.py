@@ -0,0 +1,263 @@
+"""Process-wide rate limiting and retry policy for OpenAI requests.
+
+Every AI request in the process goes through ``openai_limiter``:
+
+- two token buckets (requests per minute and tokens per minute) pace
+  requests before they are sent;
+- an AIMD concurrency limit halves the number of requests in flight on a
+  429 and creeps back up one slot per window of successes;
+- ``retry_delay`` gives jittered exponential backoff that honours the
+  server's Retry-After.
+
+Buckets hand out reservations rather than sleeping, so threaded and
+asyncio callers can share them: ``reserve()`` returns how long the caller
+must wait before sending. Concurrency slots are held with ``slot()`` from
+threads and ``aslot()`` from coroutines; both count against one limit.
+"""
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Optional
+from django.conf import settings
+
+# Transient statuses worth retrying; anything else 4xx is the request's fault
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Connection problems raised by the openai SDK carry no status code
+RETRYABLE_ERROR_NAMES = {'APIConnectionError', 'APITimeoutError'}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough OpenAI token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def status_code_of(error: Exception) -> Optional[int]:
+    return getattr(error, 'status_code', None)
+
+
+def is_retryable(error: Exception) -> bool:
+    status_code = status_code_of(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Server-requested wait from Retry-After / retry-after-ms, if any"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+    try:
+        if headers.get('retry-after-ms') is not None:
+            return float(headers['retry-after-ms']) / 1000
+        if headers.get('retry-after') is not None:
+            return float(headers['retry-after'])
+    except (TypeError, ValueError):
+        pass  # HTTP-date form; fall back to our own backoff
+    return None
+
+
+def retry_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff for retry number ``attempt`` (0-based)"""
+    ceiling = min(settings.AI_RETRY_MAX_DELAY, settings.AI_RETRY_BASE_DELAY * 2 ** attempt)
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        # Never retry before the server asked us to, but spread callers out
+        delay = retry_after + random.uniform(0, settings.AI_RETRY_BASE_DELAY)
+    return delay
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate()`` per minute.
+
+    The API enforces per-minute limits over shorter windows, so the bucket
+    only holds ``burst_seconds`` worth of tokens. ``rate`` is a callable so
+    limits follow settings changes; a rate of 0 disables the bucket.
+    """
+
+    def __init__(self, rate: Callable[[], float], burst_seconds: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._rate = rate
+        self._burst_seconds = burst_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = None
+        self._updated = None
+
+    def reserve(self, amount: float = 1) -> float:
+        """Take ``amount`` tokens now; return seconds to wait before using them"""
+        rate = self._rate()
+        if rate <= 0:
+            return 0.0
+        per_second = rate / 60
+        capacity = self._capacity(rate)
+        with self._lock:
+            now = self._clock()
+            if self._tokens is None:
+                self._tokens = capacity
+            else:
+                self._tokens = min(capacity, self._tokens + (now - self._updated) * per_second)
+            self._updated = now
+            # Going negative queues the caller behind earlier reservations
+            self._tokens -= amount
+            return max(0.0, -self._tokens / per_second)
+
+    def _capacity(self, rate: float) -> float:
+        return max(1.0, rate / 60 * self._burst_seconds)
+
+    def reset(self):
+        with self._lock:
+            self._tokens = None
+            self._updated = None
+
+    def refund(self, amount: float):
+        """Return unused tokens, e.g. when a request used fewer than estimated"""
+        rate = self._rate()
+        if rate <= 0:
+            return
+        with self._lock:
+            if self._tokens is not None:
+                self._tokens = min(self._capacity(rate), self._tokens + amount)
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on requests in flight.
+
+    Starts at ``maximum()``; every throttled response halves the limit and
+    every ``limit`` successes raise it by one, so the process settles just
+    under the rate the API accepts.
+    """
+
+    def __init__(self, maximum: Callable[[], int]):
+        self._maximum = maximum
+        self._condition = threading.Condition()
+        self._limit = None
+        self._in_flight = 0
+        self._successes = 0
+
+    @property
+    def limit(self) -> int:
+        with self._condition:
+            return self._current_limit()
+
+    def _current_limit(self) -> int:
+        # Caller holds the lock
+        maximum = max(1, self._maximum())
+        if self._limit is None or self._limit > maximum:
+            self._limit = maximum
+        return self._limit
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= self._current_limit():
+                self._condition.wait()
+            self._in_flight += 1
+
+    def try_acquire(self) -> bool:
+        """Take a slot if one is free, without blocking"""
+        with self._condition:
+            if self._in_flight >= self._current_limit():
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self, throttled: bool = False):
+        with self._condition:
+            self._in_flight -= 1
+            limit = self._current_limit()
+            if throttled:
+                self._limit = max(1, limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self._successes >= limit:
+                    self._limit = min(max(1, self._maximum()), limit + 1)
+                    self._successes = 0
+            self._condition.notify_all()
+
+    def reset(self):
+        with self._condition:
+            self._limit = None
+            self._successes = 0
+            self._condition.notify_all()
+
+
+class OpenAILimiter:
+    """Request and token buckets plus adaptive concurrency for one process"""
+
+    def __init__(self):
+        self.requests = TokenBucket(lambda: settings.AI_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(lambda: settings.AI_TOKENS_PER_MINUTE)
+        self.concurrency = AdaptiveConcurrency(
+            lambda: settings.AI_PROCESS_CONCURRENCY or settings.AI_SCORING_CONCURRENCY
+        )
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.throttled = 0
+
+    def reserve(self, estimated_tokens: int) -> float:
+        """Reserve one request and its tokens; return seconds to wait"""
+        return max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def settle(self, estimated_tokens: int, used_tokens: Optional[int]):
+        """Give back the part of a token estimate the request didn't use"""
+        if used_tokens is not None and used_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - used_tokens)
+
+    @contextmanager
+    def slot(self):
+        """Hold one concurrency slot; call ``throttled()`` on the yielded handle after a 429"""
+        handle = _Slot()
+        self.concurrency.acquire()
+        try:
+            yield handle
+        finally:
+            self.concurrency.release(throttled=handle.was_throttled)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """``slot()`` for coroutines: waits for a free slot without blocking the event loop"""
+        handle = _Slot()
+        delay = 0.005
+        # Slots are released from threads as well, so poll rather than wait on an asyncio primitive
+        while not self.concurrency.try_acquire():
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+        try:
+            yield handle
+        finally:
+            self.concurrency.release(throttled=handle.was_throttled)
+
+    def record_retry(self, throttled: bool):
+        with self._lock:
+            self.retries += 1
+            if throttled:
+                self.throttled += 1
+
+    def reset(self):
+        """Forget bucket levels, the learned concurrency limit and counters"""
+        self.requests.reset()
+        self.tokens.reset()
+        self.concurrency.reset()
+        with self._lock:
+            self.retries = self.throttled = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'concurrency_limit': self.concurrency.limit,
+                'retries': self.retries,
+                'throttled': self.throttled,
+            }
+
+
+class _Slot:
+    was_throttled = False
+
+    def throttled(self):
+        self.was_throttled = True
+
+
+# Shared by every ScoringService in the process
+openai_limiter = OpenAILimiter()
@@ -0,0 +1,27 @@
+"""Human-readable explanation stored with each LeadScore"""
+
+
+def build_reasoning(role_score: int, industry_score: int, completeness_score: int, ai_reasoning: str) -> str:
+    """Explain a score from its rule components plus the AI reasoning"""
+    rule_reasoning = []
+    
+    if role_score == 20:
+        rule_reasoning.append("decision maker role")
+    elif role_score == 10:
+        rule_reasoning.append("influencer role")
+    
+    if industry_score == 20:
+        rule_reasoning.append("exact ICP match")
+    elif industry_score == 10:
+        rule_reasoning.append("adjacent industry")
+    
+    if completeness_score > 0:
+        rule_reasoning.append("complete data profile")
+    
+    rule_part = ", ".join(rule_reasoning)
+    if rule_part and ai_reasoning:
+        return f"Fits {rule_part}. {ai_reasoning}"
+    elif rule_part:
+        return f"Fits {rule_part}."
+    else:
+        return ai_reasoning or "Basic scoring applied."
@@ -1,5 +1,7 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Offer, Lead, LeadScore
+from .dedup import DEDUP_POLICIES
+from .models import Offer, Lead, LeadScore, ScoringJob
 
 
 class OfferSerializer(serializers.ModelSerializer):
@@ -23,8 +25,8 @@ class LeadSerializer(serializers.ModelSerializer):
     class Meta:
         model = Lead
         fields = ['id', 'name', 'role', 'company', 'industry', 'location', 
-                 'linkedin_bio', 'upload_batch', 'created_at']
-        read_only_fields = ['id', 'created_at']
+                 'linkedin_bio', 'upload_batch', 'duplicate_of', 'created_at']
+        read_only_fields = ['id', 'duplicate_of', 'created_at']
 
 
 class LeadScoreSerializer(serializers.ModelSerializer):
@@ -45,64 +47,74 @@ class LeadScoreSerializer(serializers.ModelSerializer):
 
 
 class LeadResultSerializer(serializers.ModelSerializer):
-    name = serializers.CharField(source='lead.name')
-    role = serializers.CharField(source='lead.role')
-    company = serializers.CharField(source='lead.company')
+    # Served from the columns LeadScore copies at write time, no join to Lead
+    name = serializers.CharField(source='lead_name')
+    role = serializers.CharField(source='lead_role')
+    company = serializers.CharField(source='lead_company')
     intent = serializers.CharField(source='intent_label')
     score = serializers.IntegerField(source='total_score')
-    reasoning = serializers.SerializerMethodField()
+    offer_id = serializers.IntegerField()
     
     class Meta:
         model = LeadScore
-        fields = ['name', 'role', 'company', 'intent', 'score', 'reasoning']
-    
-    def get_reasoning(self, obj):
-        rule_reasoning = []
-        
-        if obj.role_score > 0:
-            if obj.role_score == 20:
-                rule_reasoning.append("decision maker role")
-            elif obj.role_score == 10:
-                rule_reasoning.append("influencer role")
-        
-        if obj.industry_score > 0:
-            if obj.industry_score == 20:
-                rule_reasoning.append("exact ICP match")
-            elif obj.industry_score == 10:
-                rule_reasoning.append("adjacent industry")
-        
-        if obj.completeness_score > 0:
-            rule_reasoning.append("complete data profile")
-        
-        rule_part = ", ".join(rule_reasoning)
-        if rule_part and obj.ai_reasoning:
-            return f"Fits {rule_part}. {obj.ai_reasoning}"
-        elif rule_part:
-            return f"Fits {rule_part}."
-        else:
-            return obj.ai_reasoning or "Basic scoring applied."
+        fields = ['name', 'role', 'company', 'offer_id', 'intent', 'score', 'reasoning']
 
 
 class CSVUploadSerializer(serializers.Serializer):
     file = serializers.FileField()
+    dedup = serializers.ChoiceField(choices=DEDUP_POLICIES, required=False)
     
     def validate_file(self, value):
         if not value.name.endswith('.csv'):
             raise serializers.ValidationError("File must be a CSV file")
         
-        if value.size > 10 * 1024 * 1024:  # 10MB limit
-            raise serializers.ValidationError("File size cannot exceed 10MB")
+        if value.size > settings.MAX_FILE_SIZE:
+            raise serializers.ValidationError(f"File size cannot exceed {settings.MAX_FILE_SIZE // (1024 * 1024)}MB")
         
         return value
 
 
 class ScoreRequestSerializer(serializers.Serializer):
-    offer_id = serializers.IntegerField()
+    offer_id = serializers.IntegerField(required=False)
+    offer_ids = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False)
     batch_id = serializers.CharField(max_length=100, required=False)
+    background = serializers.BooleanField(required=False, default=False)
+    force = serializers.BooleanField(required=False, default=False)
+    stream = serializers.ChoiceField(choices=['ndjson', 'sse'], required=False)
     
     def validate_offer_id(self, value):
         try:
             Offer.objects.get(id=value)
         except Offer.DoesNotExist:
             raise serializers.ValidationError("Offer with this ID does not exist")
-        return value
\ No newline at end of file
+        return value
+    
+    def validate_offer_ids(self, value):
+        value = list(dict.fromkeys(value))
+        found = set(Offer.objects.filter(id__in=value).values_list('id', flat=True))
+        missing = [offer_id for offer_id in value if offer_id not in found]
+        if missing:
+            raise serializers.ValidationError(f"Offers with these IDs do not exist: {missing}")
+        return value
+    
+    def validate(self, data):
+        if ('offer_id' in data) == ('offer_ids' in data):
+            raise serializers.ValidationError("Provide either offer_id or offer_ids")
+        if data.get('stream') and data.get('background'):
+            raise serializers.ValidationError("stream and background cannot be combined")
+        return data
+
+
+class ScoringJobSerializer(serializers.ModelSerializer):
+    job_id = serializers.IntegerField(source='id', read_only=True)
+    offer_id = serializers.IntegerField(read_only=True)
+    progress = serializers.ReadOnlyField()
+    
+    class Meta:
+        model = ScoringJob
+        fields = [
+            'job_id', 'offer_id', 'batch_id', 'status', 'total_leads',
+            'scored_leads', 'failed_leads', 'skipped_leads', 'progress', 'errors',
+            'created_at', 'started_at', 'finished_at'
+        ]
+        read_only_fields = fields
@@ -1,123 +1,600 @@
+import asyncio
+import codecs
+import csv
+import hashlib
+import json
+import logging
 import re
-from typing import Dict, List, Tuple
+import time
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.db import transaction
+from .ai_cache import AIResponseCache, ai_response_cache
+from .batch_scoring import NUMPY_AVAILABLE, lead_features_for_leads
+from .circuit_breaker import CircuitOpenError, openai_breaker
+from .dedup import DEDUP_ALLOW, DEDUP_SKIP, lead_fingerprint
+from .matchers import industry_matcher_for_offer, score_role
+from .metrics import AI_FALLBACKS, AI_REQUESTS, SCORED_LEADS, UPLOAD_ROWS, UPLOAD_ROWS_PER_SECOND, stage_timer
 from .models import Lead, Offer, LeadScore
+from .openai_client import get_async_openai_client, get_openai_client
+from .rate_limit import (
+    estimate_tokens, is_retryable, openai_limiter, retry_after_seconds, retry_delay, status_code_of
+)
 
-# Safe OpenAI import
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    OpenAI = None
+logger = logging.getLogger(__name__)
 
 
 class ScoringService:
     """Service for scoring leads using rule-based logic and AI"""
     
-    def __init__(self):
-        self.openai_client = None
-        if OPENAI_AVAILABLE and settings.OPENAI_API_KEY and settings.OPENAI_API_KEY != 'your_openai_api_key_here':
-            try:
-                self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            except Exception as e:
-                print(f"Failed to initialize OpenAI client: {e}")
-                self.openai_client = None
+    AI_MODEL = "gpt-3.5-turbo"
+    
+    SYSTEM_PROMPT = "You are a lead qualification expert that provides concise, actionable assessments."
+    
+    # Bump whenever the prompt or parsing changes so cached responses are not reused
+    PROMPT_VERSION = 2
+    
+    # Section header in batched responses, e.g. "PROSPECT 3"
+    PROSPECT_HEADER = re.compile(r'^[ \t*#]*PROSPECT\s+(\d+)[ \t:*#.)-]*', re.IGNORECASE | re.MULTILINE)
+    
+    # Leads per vectorized rule-scoring chunk and AI cache prefetch
+    RULE_CHUNK_SIZE = 1000
+    
+    # Fields produced by _compute_score_fields
+    SCORE_FIELDS = ['role_score', 'industry_score', 'completeness_score', 'ai_score', 'ai_intent', 'ai_reasoning']
+    
+    BULK_UPDATE_FIELDS = [
+        *SCORE_FIELDS, 'total_score', 'intent_label', 'reasoning',
+        'lead_name', 'lead_role', 'lead_company', 'lead_industry', 'lead_location', 'upload_batch',
+        'offer_version', 'lead_hash',
+    ]
+    
+    def __init__(self, ai_cache: Optional[AIResponseCache] = None):
+        self.ai_cache = ai_cache or ai_response_cache
+        # Shared by every service in the process so connections are reused
+        self.openai_client = get_openai_client()
+        # Set by the async entry points; one per event loop (see get_async_openai_client)
+        self.async_openai_client = None
+        # Leads left alone by the last incremental score_leads() call
+        self.skipped_leads = 0
     
     def score_lead(self, lead: Lead, offer: Offer) -> LeadScore:
         """Score a single lead against an offer"""
-        # Calculate rule-based scores
-        role_score = self._calculate_role_score(lead.role)
-        industry_score = self._calculate_industry_score(lead.industry, offer.ideal_use_cases)
-        completeness_score = self._calculate_completeness_score(lead)
+        self._prefetch_ai_cache([lead], offer)
+        fields = self._compute_score_fields(lead, offer)
+        self._flush_ai_cache()
+        with stage_timer('db_write'):
+            return self._save_score(lead, offer, fields)
+    
+    def score_leads(self, leads: Iterable[Lead], offer: Offer,
+                    concurrency: Optional[int] = None,
+                    on_progress: Optional[Callable[[int, int], None]] = None,
+                    incremental: bool = False) -> Tuple[List[LeadScore], List[str]]:
+        """Score many leads against an offer, running AI calls concurrently.
         
-        # Calculate AI score
-        ai_score, ai_intent, ai_reasoning = self._calculate_ai_score(lead, offer)
+        Scores are written in bulk every SCORE_WRITE_BATCH_SIZE leads.
+        Returns the saved scores and one error message per lead that failed.
+        ``on_progress(scored, failed)`` is called after each write. With
+        ``incremental``, leads whose score is still current are left alone
+        and counted in ``skipped_leads``.
+        """
+        return self.score_leads_for_offers(leads, [offer], concurrency, on_progress, incremental)
+    
+    def score_leads_for_offers(self, leads: Iterable[Lead], offers: List[Offer],
+                               concurrency: Optional[int] = None,
+                               on_progress: Optional[Callable[[int, int], None]] = None,
+                               incremental: bool = False) -> Tuple[List[LeadScore], List[str]]:
+        """Score every lead against every offer in one pass over the leads.
         
-        # Create or update lead score
-        lead_score, created = LeadScore.objects.update_or_create(
-            lead=lead,
-            defaults={
-                'offer': offer,
-                'role_score': role_score,
-                'industry_score': industry_score,
-                'completeness_score': completeness_score,
-                'ai_score': ai_score,
-                'ai_intent': ai_intent,
-                'ai_reasoning': ai_reasoning,
-            }
-        )
+        Works like score_leads(), but each chunk of leads is loaded once and
+        its offer-independent features (role and completeness scores, prompt
+        context) are computed once for all offers. AI calls for every
+        (lead, offer) pair share one pool of ``concurrency`` workers.
+        ``skipped_leads`` counts skipped (lead, offer) pairs.
+        """
+        scored_leads = []
+        errors = []
+        for batch in self.iter_score_batches(leads, offers, concurrency, incremental):
+            if batch is None:
+                continue
+            saved, failed = batch
+            scored_leads.extend(saved)
+            errors.extend(failed)
+            if on_progress:
+                on_progress(len(scored_leads), len(errors))
         
-        return lead_score
+        return scored_leads, errors
     
-    def _calculate_role_score(self, role: str) -> int:
-        """Calculate score based on role relevance (max 20 points)"""
-        if not role:
-            return 0
+    def iter_score_batches(self, leads: Iterable[Lead], offers: List[Offer],
+                           concurrency: Optional[int] = None,
+                           incremental: bool = False,
+                           flush_seconds: Optional[float] = None,
+                           heartbeat_seconds: Optional[float] = None
+                           ) -> Iterator[Optional[Tuple[List[LeadScore], List[str]]]]:
+        """Score like score_leads_for_offers(), yielding results as they are written.
         
-        role_lower = role.lower()
+        Yields (saved scores, error messages) after every bulk write: every
+        SCORE_WRITE_BATCH_SIZE leads or, with ``flush_seconds``, once that
+        long has passed since the previous write. With ``heartbeat_seconds``,
+        None is yielded whenever that long passes with no AI request
+        finishing, so a streaming response can keep its connection alive.
+        """
+        writer = _ScoreWriter(self, offers, flush_seconds)
+        self.skipped_leads = 0
+        for item in self._iter_score_fields(leads, offers, concurrency, incremental, heartbeat_seconds):
+            if item is not None:
+                writer.add(item)
+            if writer.due():
+                yield writer.flush()
+            elif item is None:
+                yield None
         
-        # Decision maker roles (20 points)
-        decision_maker_keywords = [
-            'ceo', 'cto', 'cfo', 'cmo', 'vp', 'vice president', 'president',
-            'director', 'head of', 'chief', 'founder', 'owner', 'manager',
-            'lead', 'principal', 'senior manager'
-        ]
+        if writer.pending or writer.errors:
+            yield writer.flush()
+        self._flush_ai_cache()
+    
+    async def ascore_leads_for_offers(self, leads: Iterable[Lead], offers: List[Offer],
+                                      concurrency: Optional[int] = None,
+                                      incremental: bool = False) -> Tuple[List[LeadScore], List[str]]:
+        """score_leads_for_offers() for async views"""
+        scored_leads = []
+        errors = []
+        async for batch in self.aiter_score_batches(leads, offers, concurrency, incremental):
+            if batch is None:
+                continue
+            saved, failed = batch
+            scored_leads.extend(saved)
+            errors.extend(failed)
         
-        # Influencer roles (10 points)
-        influencer_keywords = [
-            'senior', 'specialist', 'analyst', 'coordinator', 'supervisor',
-            'team lead', 'project manager', 'product manager', 'marketing manager'
-        ]
+        return scored_leads, errors
+    
+    async def aiter_score_batches(self, leads: Iterable[Lead], offers: List[Offer],
+                                  concurrency: Optional[int] = None,
+                                  incremental: bool = False,
+                                  flush_seconds: Optional[float] = None,
+                                  heartbeat_seconds: Optional[float] = None
+                                  ) -> AsyncIterator[Optional[Tuple[List[LeadScore], List[str]]]]:
+        """iter_score_batches() for async views.
         
-        for keyword in decision_maker_keywords:
-            if keyword in role_lower:
-                return 20
+        AI requests are awaited on the event loop with the async OpenAI
+        client, so a scoring request holds no thread while it waits on the
+        provider. Loading leads and writing scores go through sync_to_async.
+        """
+        if self.openai_client and self.async_openai_client is None:
+            self.async_openai_client = get_async_openai_client()
+        writer = _ScoreWriter(self, offers, flush_seconds)
+        flush = sync_to_async(writer.flush)
+        self.skipped_leads = 0
+        async for item in self._aiter_score_fields(leads, offers, concurrency, incremental, heartbeat_seconds):
+            if item is not None:
+                writer.add(item)
+            if writer.due():
+                yield await flush()
+            elif item is None:
+                yield None
         
-        for keyword in influencer_keywords:
-            if keyword in role_lower:
-                return 10
+        if writer.pending or writer.errors:
+            yield await flush()
+        await sync_to_async(self._flush_ai_cache)()
+    
+    def _iter_score_fields(self, leads: Iterable[Lead], offers: List[Offer], concurrency: Optional[int] = None,
+                           incremental: bool = False, heartbeat_seconds: Optional[float] = None
+                           ) -> Iterator[Optional[Tuple[Lead, Offer, Optional[Dict], Optional[Exception]]]]:
+        """Yield (lead, offer, score fields, error) for every pair, in the order scoring finishes.
         
-        return 0
+        AI calls are I/O bound, so they run on a thread pool with at most
+        ``concurrency`` requests in flight. Only the network call happens off
+        the calling thread; database writes stay with the caller. With
+        AI_PROMPT_BATCH_SIZE above 1, each request assesses that many leads.
+        With ``heartbeat_seconds``, None is yielded for every that many
+        seconds spent waiting on a request.
+        """
+        if concurrency is None:
+            concurrency = settings.AI_SCORING_CONCURRENCY
+        group_size = max(1, settings.AI_PROMPT_BATCH_SIZE) if self.openai_client else 1
+        
+        groups = self._iter_groups(self._iter_prepared_leads(leads, offers, incremental), group_size)
+        
+        if not self.openai_client or concurrency <= 1:
+            for group in groups:
+                start = time.monotonic()
+                results = self._score_group(group)
+                if heartbeat_seconds and time.monotonic() - start >= heartbeat_seconds:
+                    yield None
+                yield from results
+            return
+        
+        # Keep a bounded window of pending futures so huge batches don't
+        # queue every lead up front; results come out in completion order
+        pending = {}
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for group in groups:
+                pending[executor.submit(self._score_group, group)] = group
+                if len(pending) >= concurrency * 2:
+                    yield from self._wait(pending, heartbeat_seconds)
+            while pending:
+                yield from self._wait(pending, heartbeat_seconds)
     
-    def _calculate_industry_score(self, industry: str, ideal_use_cases: List[str]) -> int:
-        """Calculate score based on industry match (max 20 points)"""
-        if not industry or not ideal_use_cases:
-            return 0
-        
-        industry_lower = industry.lower()
-        
-        # Check for exact matches (20 points)
-        for use_case in ideal_use_cases:
-            if use_case.lower() in industry_lower or industry_lower in use_case.lower():
-                return 20
-        
-        # Check for adjacent/related industries (10 points)
-        adjacent_mappings = {
-            'saas': ['software', 'technology', 'tech', 'b2b', 'enterprise'],
-            'software': ['saas', 'technology', 'tech', 'it', 'digital'],
-            'technology': ['software', 'saas', 'tech', 'it', 'digital'],
-            'b2b': ['saas', 'enterprise', 'business', 'corporate'],
-            'enterprise': ['b2b', 'corporate', 'business', 'large'],
-            'mid-market': ['medium', 'middle', 'smb', 'small business'],
-            'fintech': ['finance', 'financial', 'banking', 'payments'],
-            'healthcare': ['medical', 'health', 'pharma', 'biotech'],
-            'ecommerce': ['retail', 'commerce', 'online', 'marketplace'],
+    async def _aiter_score_fields(self, leads: Iterable[Lead], offers: List[Offer],
+                                  concurrency: Optional[int] = None, incremental: bool = False,
+                                  heartbeat_seconds: Optional[float] = None
+                                  ) -> AsyncIterator[Optional[Tuple[Lead, Offer, Optional[Dict], Optional[Exception]]]]:
+        """_iter_score_fields() with AI requests as tasks on the running event loop.
+        
+        At most ``concurrency`` groups are being scored at once. Groups are
+        prepared (leads loaded, rules scored, cache prefetched) on Django's
+        sync thread, ``concurrency`` at a time.
+        """
+        if concurrency is None:
+            concurrency = settings.AI_SCORING_CONCURRENCY
+        concurrency = max(1, concurrency)
+        group_size = max(1, settings.AI_PROMPT_BATCH_SIZE) if self.async_openai_client else 1
+        
+        groups = self._iter_groups(self._iter_prepared_leads(leads, offers, incremental), group_size)
+        next_groups = sync_to_async(lambda: list(islice(groups, concurrency)))
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        pending = {}
+        exhausted = False
+        try:
+            while pending or not exhausted:
+                if not exhausted and len(pending) < concurrency * 2:
+                    batch = await next_groups()
+                    exhausted = not batch
+                    for group in batch:
+                        pending[asyncio.ensure_future(self._ascore_group(group, semaphore))] = group
+                    continue
+                # Whichever groups finish first, so one slow request holds nothing back
+                done, _ = await asyncio.wait(pending, timeout=heartbeat_seconds or None,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    yield None
+                    continue
+                for task in done:
+                    for item in await self._aresolve(pending.pop(task), task):
+                        yield item
+        finally:
+            # The client went away or the caller stopped early
+            for task in pending:
+                task.cancel()
+    
+    @staticmethod
+    def _iter_groups(prepared: Iterator[Tuple], group_size: int) -> Iterator[List[Tuple]]:
+        """Group prepared leads of one offer for AI requests; reused scores pass through alone"""
+        group = []
+        for item in prepared:
+            if item[3] is not None:
+                yield [item]
+                continue
+            if group and group[0][1] is not item[1]:
+                yield group
+                group = []
+            group.append(item)
+            if len(group) >= group_size:
+                yield group
+                group = []
+        if group:
+            yield group
+    
+    def _score_group(self, group: List[Tuple[Lead, Offer, Optional[Tuple[int, int, int]], Optional[Dict]]]
+                     ) -> List[Tuple[Lead, Offer, Optional[Dict], Optional[Exception]]]:
+        """Score a group of (lead, offer, rule scores, reused fields) sharing one offer.
+        
+        Groups of several leads share one AI request.
+        """
+        offer = group[0][1]
+        if len(group) > 1:
+            assessments, ai_error = self._request_batch_assessments([lead for lead, _, _, _ in group], offer)
+        else:
+            assessments, ai_error = [None], None
+        
+        results = []
+        for (lead, _, rule_scores, reused), assessment in zip(group, assessments):
+            if reused is not None:
+                results.append((lead, offer, reused, None))
+                continue
+            try:
+                fields = self._compute_score_fields(lead, offer, rule_scores, assessment, ai_error)
+                results.append((lead, offer, fields, None))
+            except Exception as e:
+                results.append((lead, offer, None, e))
+        return results
+    
+    async def _ascore_group(self, group: List[Tuple[Lead, Offer, Optional[Tuple[int, int, int]], Optional[Dict]]],
+                            semaphore: asyncio.Semaphore
+                            ) -> List[Tuple[Lead, Offer, Optional[Dict], Optional[Exception]]]:
+        """_score_group() on the async client, holding ``semaphore`` while scoring"""
+        offer = group[0][1]
+        async with semaphore:
+            if len(group) > 1:
+                assessments, ai_error = await self._arequest_batch_assessments([lead for lead, _, _, _ in group], offer)
+            else:
+                assessments, ai_error = [None], None
+            
+            results = []
+            for (lead, _, rule_scores, reused), assessment in zip(group, assessments):
+                if reused is not None:
+                    results.append((lead, offer, reused, None))
+                    continue
+                try:
+                    fields = await self._acompute_score_fields(lead, offer, rule_scores, assessment, ai_error)
+                    results.append((lead, offer, fields, None))
+                except Exception as e:
+                    results.append((lead, offer, None, e))
+            return results
+    
+    def _iter_prepared_leads(self, leads: Iterable[Lead], offers: List[Offer], incremental: bool = False
+                             ) -> Iterator[Tuple[Lead, Offer, Optional[Tuple[int, int, int]], Optional[Dict]]]:
+        """Pair leads with each offer and their (role, industry, completeness) scores, a chunk at a time.
+        
+        With NumPy installed the scores come from the vectorized batch engine,
+        with role and completeness computed once per chunk for all offers;
+        otherwise they are left to be computed per lead. Cached AI responses
+        for the chunk are loaded in one query per offer before any AI call is
+        made. Duplicates whose original lead is already scored for the offer
+        from identical lead fields carry that score's fields instead and skip
+        rule and AI scoring. With
+        ``incremental``, pairs with a current score are dropped entirely.
+        """
+        leads = iter(leads)
+        while True:
+            chunk = list(islice(leads, self.RULE_CHUNK_SIZE))
+            if not chunk:
+                return
+            with stage_timer('rules'):
+                features = lead_features_for_leads(chunk) if NUMPY_AVAILABLE else None
+            
+            for offer in offers:
+                candidates = chunk
+                if incremental:
+                    with stage_timer('incremental_check'):
+                        current = self._current_score_ids(chunk, offer)
+                    self.skipped_leads += len(current)
+                    SCORED_LEADS.labels('skipped').inc(len(current))
+                    candidates = [lead for lead in chunk if lead.id not in current]
+                reused = self._reusable_scores(candidates, offer)
+                to_score = [lead for lead in candidates if lead.id not in reused]
+                for lead in candidates:
+                    if lead.id in reused:
+                        yield lead, offer, None, reused[lead.id]
+                
+                with stage_timer('cache_prefetch'):
+                    self._prefetch_ai_cache(to_score, offer)
+                with stage_timer('rules'):
+                    rule_scores = features.for_offer(offer).as_dict() if features is not None else {}
+                for lead in to_score:
+                    yield lead, offer, rule_scores.get(lead.id), None
+    
+    def lead_hash(self, lead: Lead) -> str:
+        """Hash of everything a lead's score depends on besides the offer.
+        
+        Covers the lead fields used by the rules and the prompt, the prompt
+        version, and whether AI scoring is configured at all.
+        """
+        payload = json.dumps([
+            self.AI_MODEL if self.openai_client else None, self.PROMPT_VERSION,
+            lead.name, lead.role, lead.company, lead.industry, lead.location, lead.linkedin_bio,
+        ])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+    
+    def _current_score_ids(self, leads: List[Lead], offer: Offer) -> set:
+        """Ids of leads already scored against this version of the offer and of the lead"""
+        hashes = dict(
+            LeadScore.objects.filter(lead_id__in=[lead.id for lead in leads], offer=offer,
+                                     offer_version=offer.updated_at)
+            # Scores that fell back after an AI error are retried
+            .exclude(ai_reasoning__startswith='AI unavailable')
+            .values_list('lead_id', 'lead_hash')
+        )
+        return {lead.id for lead in leads if hashes.get(lead.id) == self.lead_hash(lead)}
+    
+    def _reusable_scores(self, leads: List[Lead], offer: Offer) -> Dict[int, Dict]:
+        """Score fields of the original lead for duplicates, keyed by duplicate id.
+        
+        The fingerprint only covers name, company and role, so a score is
+        reused only when the original was scored from the same lead fields
+        (equal lead_hash) and, like _current_score_ids(), against the current
+        offer version without an AI error; other duplicates are scored
+        themselves. The copy is stamped as current, so reusing anything less
+        would hide a stale score from incremental runs.
+        """
+        original_ids = {lead.duplicate_of_id for lead in leads if lead.duplicate_of_id}
+        if not original_ids:
+            return {}
+        scores = {
+            row.pop('lead_id'): row
+            for row in LeadScore.objects.filter(lead_id__in=original_ids, offer=offer, offer_version=offer.updated_at)
+            .exclude(ai_reasoning__startswith='AI unavailable')
+            .values('lead_id', 'lead_hash', *self.SCORE_FIELDS)
         }
+        reused = {}
+        for lead in leads:
+            score = scores.get(lead.duplicate_of_id)
+            if score is not None and score['lead_hash'] == self.lead_hash(lead):
+                reused[lead.id] = {field: score[field] for field in self.SCORE_FIELDS}
+        return reused
+    
+    def _ai_cache_key(self, lead_context: str, offer_context: str) -> str:
+        return self.ai_cache.make_key(self.AI_MODEL, self.PROMPT_VERSION, lead_context, offer_context)
+    
+    def _prefetch_ai_cache(self, leads: List[Lead], offer: Offer):
+        if not (self.openai_client and self.ai_cache.enabled):
+            return
+        offer_context = self._offer_context(offer)
+        self.ai_cache.prefetch(
+            self._ai_cache_key(self._lead_context(lead), offer_context) for lead in leads
+        )
+    
+    def _flush_ai_cache(self):
+        if self.ai_cache.enabled:
+            self.ai_cache.flush()
+    
+    @classmethod
+    def _wait(cls, pending: Dict, heartbeat_seconds: Optional[float] = None):
+        """Yield the results of the first futures in ``pending`` (future -> group) to finish, removing them"""
+        while True:
+            done, _ = wait(pending, timeout=heartbeat_seconds or None, return_when=FIRST_COMPLETED)
+            if done:
+                break
+            yield None
+        for future in done:
+            yield from cls._resolve(pending.pop(future), future)
+    
+    @staticmethod
+    def _resolve(group, future) -> List[Tuple[Lead, Offer, Optional[Dict], Optional[Exception]]]:
+        try:
+            return future.result()
+        except Exception as e:
+            return [(lead, offer, None, e) for lead, offer, _, _ in group]
+    
+    @staticmethod
+    async def _aresolve(group, task) -> List[Tuple[Lead, Offer, Optional[Dict], Optional[Exception]]]:
+        try:
+            return await task
+        except Exception as e:
+            return [(lead, offer, None, e) for lead, offer, _, _ in group]
+    
+    def _compute_score_fields(self, lead: Lead, offer: Offer,
+                              rule_scores: Optional[Tuple[int, int, int]] = None,
+                              ai_assessment: Optional[Tuple[str, str]] = None,
+                              ai_error: Optional[Exception] = None) -> Dict:
+        """Compute every LeadScore field for a lead without touching the database.
         
-        for use_case in ideal_use_cases:
-            use_case_lower = use_case.lower()
-            for key, adjacents in adjacent_mappings.items():
-                if key in use_case_lower:
-                    for adjacent in adjacents:
-                        if adjacent in industry_lower:
-                            return 10
-                elif key in industry_lower:
-                    for adjacent in adjacents:
-                        if adjacent in use_case_lower:
-                            return 10
+        ``ai_assessment`` is an (intent, reasoning) pair already obtained from
+        a batched request; without it the lead gets its own AI request, unless
+        ``ai_error`` says the batched request failed and rules score it instead.
+        """
+        rule_scores = self._rule_scores(lead, offer, rule_scores)
         
-        return 0
+        # Calculate AI score
+        if ai_assessment is not None:
+            ai_intent, ai_reasoning = ai_assessment
+            ai_result = self._ai_score_for_intent(ai_intent), ai_intent, ai_reasoning
+        elif ai_error is not None:
+            ai_result = self._ai_error_score(lead, offer, sum(rule_scores), ai_error)
+        else:
+            ai_result = self._calculate_ai_score(lead, offer, sum(rule_scores))
+        
+        return self._score_fields(rule_scores, ai_result)
+    
+    async def _acompute_score_fields(self, lead: Lead, offer: Offer,
+                                     rule_scores: Optional[Tuple[int, int, int]] = None,
+                                     ai_assessment: Optional[Tuple[str, str]] = None,
+                                     ai_error: Optional[Exception] = None) -> Dict:
+        """_compute_score_fields() with the lead's own AI request awaited"""
+        rule_scores = self._rule_scores(lead, offer, rule_scores)
+        if ai_assessment is not None:
+            ai_intent, ai_reasoning = ai_assessment
+            ai_result = self._ai_score_for_intent(ai_intent), ai_intent, ai_reasoning
+        elif ai_error is not None:
+            ai_result = self._ai_error_score(lead, offer, sum(rule_scores), ai_error)
+        else:
+            ai_result = await self._acalculate_ai_score(lead, offer, sum(rule_scores))
+        
+        return self._score_fields(rule_scores, ai_result)
+    
+    def _rule_scores(self, lead: Lead, offer: Offer,
+                     rule_scores: Optional[Tuple[int, int, int]] = None) -> Tuple[int, int, int]:
+        # Calculate rule-based scores unless the batch engine already did
+        if rule_scores is None:
+            rule_scores = (
+                self._calculate_role_score(lead.role),
+                self._calculate_industry_score(lead.industry, offer),
+                self._calculate_completeness_score(lead),
+            )
+        return rule_scores
+    
+    @staticmethod
+    def _score_fields(rule_scores: Tuple[int, int, int], ai_result: Tuple[int, str, str]) -> Dict:
+        role_score, industry_score, completeness_score = rule_scores
+        ai_score, ai_intent, ai_reasoning = ai_result
+        return {
+            'role_score': role_score,
+            'industry_score': industry_score,
+            'completeness_score': completeness_score,
+            'ai_score': ai_score,
+            'ai_intent': ai_intent,
+            'ai_reasoning': ai_reasoning,
+        }
+    
+    def _save_score(self, lead: Lead, offer: Offer, fields: Dict) -> LeadScore:
+        # Create or update lead score
+        lead_score, created = LeadScore.objects.update_or_create(
+            lead=lead,
+            offer=offer,
+            defaults={'offer_version': offer.updated_at, 'lead_hash': self.lead_hash(lead), **fields}
+        )
+        
+        return lead_score
+    
+    def _bulk_save_scores(self, items: List[Tuple[Lead, Offer, Dict]]) -> List[LeadScore]:
+        """Write (lead, offer) scores with a handful of bulk statements.
+        
+        Every row goes through one upsert keyed on (lead, offer), so a row
+        inserted concurrently by another scoring run (a background job and
+        an inline /score on the same batch) is updated rather than failing
+        the chunk on the unique constraint.
+        """
+        with transaction.atomic():
+            existing = {
+                (score.lead_id, score.offer_id): score
+                for score in LeadScore.objects.filter(lead_id__in={lead.id for lead, _, _ in items},
+                                                      offer_id__in={offer.id for _, offer, _ in items})
+            }
+            saved = []
+            
+            for lead, offer, fields in items:
+                lead_score = existing.get((lead.id, offer.id))
+                if lead_score is None:
+                    lead_score = LeadScore(lead=lead, offer=offer, **fields)
+                else:
+                    lead_score.lead = lead
+                    lead_score.offer = offer
+                    for name, value in fields.items():
+                        setattr(lead_score, name, value)
+                
+                # What the score was computed from, for incremental re-scoring
+                lead_score.offer_version = offer.updated_at
+                lead_score.lead_hash = self.lead_hash(lead)
+                
+                # Bulk writes skip save(), so derive totals and the read model here
+                lead_score.calculate_derived_fields()
+                saved.append(lead_score)
+            
+            # An upsert keyed on (lead, offer) is far cheaper than bulk_update's
+            # CASE expressions; existing rows keep their id and created_at
+            rows = [LeadScore(lead_id=score.lead_id, offer_id=score.offer_id,
+                              **{name: getattr(score, name) for name in self.BULK_UPDATE_FIELDS})
+                    for score in saved]
+            LeadScore.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['lead', 'offer'],
+                update_fields=self.BULK_UPDATE_FIELDS,
+            )
+            
+            # Upserts don't return primary keys; look up the rows that were new to us
+            new = {(score.lead_id, score.offer_id): score for score in saved if score.pk is None}
+            if new:
+                for lead_id, offer_id, pk, created_at in LeadScore.objects.filter(
+                    lead_id__in={key[0] for key in new}, offer_id__in={key[1] for key in new}
+                ).values_list('lead_id', 'offer_id', 'id', 'created_at'):
+                    score = new.get((lead_id, offer_id))
+                    if score is not None:
+                        score.pk, score.created_at = pk, created_at
+        
+        return saved
+    
+    def _calculate_role_score(self, role: str) -> int:
+        """Calculate score based on role relevance (max 20 points)"""
+        return score_role(role)
+    
+    def _calculate_industry_score(self, industry: str, offer: Offer) -> int:
+        """Calculate score based on industry match (max 20 points)"""
+        return industry_matcher_for_offer(offer).score(industry)
     
     def _calculate_completeness_score(self, lead: Lead) -> int:
         """Calculate score based on data completeness (max 10 points)"""
@@ -133,38 +610,110 @@ class ScoringService:
         
         return 0
     
-    def _calculate_ai_score(self, lead: Lead, offer: Offer) -> Tuple[int, str, str]:
-        """Calculate AI-based score (max 50 points)"""
+    def _calculate_rule_score(self, lead: Lead, offer: Offer) -> int:
+        """Total rule-based score (max 50 points)"""
+        return (self._calculate_role_score(lead.role)
+                + self._calculate_industry_score(lead.industry, offer)
+                + self._calculate_completeness_score(lead))
+    
+    def _calculate_ai_score(self, lead: Lead, offer: Offer, rule_score: Optional[int] = None) -> Tuple[int, str, str]:
+        """Calculate AI-based score (max 50 points)
+        
+        ``rule_score`` is the lead's rule total when the caller already has it;
+        the fallback paths compute it otherwise.
+        """
         if not self.openai_client:
-            # Enhanced fallback scoring based on rule-based analysis
-            role_score = self._calculate_role_score(lead.role)
-            industry_score = self._calculate_industry_score(lead.industry, offer.ideal_use_cases)
-            completeness_score = self._calculate_completeness_score(lead)
-            
-            # Calculate fallback AI score based on rule scores
-            total_rule_score = role_score + industry_score + completeness_score
-            
-            if total_rule_score >= 40:  # Strong rule-based fit
-                ai_score = 45
-                intent = 'High'
-                reasoning = 'Strong profile match with decision-making role and industry alignment'
-            elif total_rule_score >= 25:  # Moderate fit
-                ai_score = 30
-                intent = 'Medium' 
-                reasoning = 'Good profile with some relevant qualifications'
-            else:  # Weak fit
-                ai_score = 15
-                intent = 'Low'
-                reasoning = 'Limited alignment with target profile'
-                
-            return ai_score, intent, f'{reasoning} (AI fallback scoring)'
+            return self._fallback_ai_score(lead, offer, rule_score)
         
         try:
-            # Prepare context for AI
-            lead_context = self._prepare_lead_context(lead)
-            offer_context = self._prepare_offer_context(offer)
-            
-            prompt = f"""
+            cached, cache_key, prompt = self._prepare_ai_request(lead, offer)
+            if cached is not None:
+                return cached
+            return self._finish_ai_request(cache_key, self._request_completion(prompt))
+        except Exception as e:
+            return self._ai_error_score(lead, offer, rule_score, e)
+    
+    async def _acalculate_ai_score(self, lead: Lead, offer: Offer,
+                                   rule_score: Optional[int] = None) -> Tuple[int, str, str]:
+        """_calculate_ai_score() with the request awaited on the async client"""
+        if not self.async_openai_client:
+            return self._fallback_ai_score(lead, offer, rule_score)
+        
+        try:
+            cached, cache_key, prompt = self._prepare_ai_request(lead, offer)
+            if cached is not None:
+                return cached
+            return self._finish_ai_request(cache_key, await self._arequest_completion(prompt))
+        except Exception as e:
+            return self._ai_error_score(lead, offer, rule_score, e)
+    
+    def _fallback_ai_score(self, lead: Lead, offer: Offer, rule_score: Optional[int] = None) -> Tuple[int, str, str]:
+        # Enhanced fallback scoring based on rule-based analysis
+        AI_FALLBACKS.labels('disabled').inc()
+        total_rule_score = rule_score if rule_score is not None else self._calculate_rule_score(lead, offer)
+        
+        if total_rule_score >= 40:  # Strong rule-based fit
+            ai_score = 45
+            intent = 'High'
+            reasoning = 'Strong profile match with decision-making role and industry alignment'
+        elif total_rule_score >= 25:  # Moderate fit
+            ai_score = 30
+            intent = 'Medium' 
+            reasoning = 'Good profile with some relevant qualifications'
+        else:  # Weak fit
+            ai_score = 15
+            intent = 'Low'
+            reasoning = 'Limited alignment with target profile'
+        
+        return ai_score, intent, f'{reasoning} (AI fallback scoring)'
+    
+    def _prepare_ai_request(self, lead: Lead, offer: Offer
+                            ) -> Tuple[Optional[Tuple[int, str, str]], Optional[str], Optional[str]]:
+        """(cached AI result, cache key, prompt) for a lead's own request; no prompt on a cache hit"""
+        # Prepare context for AI
+        lead_context = self._lead_context(lead)
+        offer_context = self._offer_context(offer)
+        
+        # Identical prompts get identical answers; reuse them
+        cache_key = None
+        if self.ai_cache.enabled:
+            cache_key = self._ai_cache_key(lead_context, offer_context)
+            cached = self.ai_cache.get(cache_key)
+            if cached is not None:
+                intent, reasoning = cached
+                return (self._ai_score_for_intent(intent), intent, reasoning), cache_key, None
+        
+        with stage_timer('prompt'):
+            prompt = self._build_prompt(lead_context, offer_context)
+        return None, cache_key, prompt
+    
+    def _finish_ai_request(self, cache_key: Optional[str], response_text: str) -> Tuple[int, str, str]:
+        # Parse response
+        with stage_timer('parse'):
+            intent, reasoning = self._parse_ai_response(response_text)
+        
+        if cache_key:
+            self.ai_cache.set(cache_key, self.AI_MODEL, intent, reasoning)
+        
+        return self._ai_score_for_intent(intent), intent, reasoning
+    
+    def _ai_error_score(self, lead: Lead, offer: Offer, rule_score: Optional[int],
+                        error: Exception) -> Tuple[int, str, str]:
+        # Enhanced fallback with error details
+        logger.warning("AI scoring error: %s", error)
+        AI_FALLBACKS.labels('error').inc()
+        # Use the same enhanced fallback logic
+        total_rule_score = rule_score if rule_score is not None else self._calculate_rule_score(lead, offer)
+        
+        if total_rule_score >= 40:
+            return 40, 'High', f'AI unavailable - rule-based high score ({total_rule_score}/50)'
+        elif total_rule_score >= 25:
+            return 25, 'Medium', f'AI unavailable - rule-based medium score ({total_rule_score}/50)'
+        else:
+            return 15, 'Low', f'AI unavailable - rule-based low score ({total_rule_score}/50)'
+    
+    def _build_prompt(self, lead_context: str, offer_context: str) -> str:
+        return f"""
 You are a lead qualification expert. Analyze this prospect against the product/offer and classify their buying intent.
 
 PRODUCT/OFFER:
@@ -183,43 +732,218 @@ Respond with exactly this format:
 INTENT: [High/Medium/Low]
 REASONING: [1-2 sentences explaining your classification]
 """
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a lead qualification expert that provides concise, actionable assessments."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.3
-            )
-            
-            response_text = response.choices[0].message.content.strip()
-            
-            # Parse response
-            intent, reasoning = self._parse_ai_response(response_text)
-            
-            # Map intent to score
-            score_mapping = {'High': 50, 'Medium': 30, 'Low': 10}
-            ai_score = score_mapping.get(intent, 25)
-            
-            return ai_score, intent, reasoning
-            
+    
+    def _build_batch_prompt(self, lead_contexts: List[str], offer_context: str) -> str:
+        prospects = "\n\n".join(
+            f"PROSPECT {number}:\n{lead_context}" for number, lead_context in enumerate(lead_contexts, start=1)
+        )
+        return f"""
+You are a lead qualification expert. Analyze each prospect below against the product/offer and classify their buying intent.
+
+PRODUCT/OFFER:
+{offer_context}
+
+{prospects}
+
+Classify each prospect's intent as High, Medium, or Low based on:
+1. Role fit (decision-making authority)
+2. Industry/use case alignment
+3. Profile completeness and quality
+4. Likelihood to benefit from the offer
+
+Respond with exactly this format for every prospect, in order:
+PROSPECT [number]
+INTENT: [High/Medium/Low]
+REASONING: [1-2 sentences explaining your classification]
+"""
+    
+    def _request_completion(self, prompt: str, max_tokens: int = 150) -> str:
+        """Send one chat completion and return the response text.
+        
+        Requests are paced by the process-wide limiter. Transient failures
+        (429, 5xx, timeouts) are retried up to AI_MAX_RETRIES times with
+        backoff; only then does the error reach the caller's fallback.
+        While the provider circuit is open, CircuitOpenError is raised
+        without sending anything.
+        """
+        estimated_tokens = estimate_tokens(self.SYSTEM_PROMPT + prompt) + max_tokens
+        
+        for attempt in range(settings.AI_MAX_RETRIES + 1):
+            probe = self._before_ai_request()
+            try:
+                with openai_limiter.slot() as slot:
+                    time.sleep(openai_limiter.reserve(estimated_tokens))
+                    try:
+                        with stage_timer('ai_request'):
+                            response = self.openai_client.chat.completions.create(
+                                **self._completion_kwargs(prompt, max_tokens)
+                            )
+                    except Exception as e:
+                        delay = self._ai_request_failed(e, attempt, slot)
+                    else:
+                        return self._ai_request_succeeded(response, estimated_tokens)
+            except BaseException:
+                if probe:
+                    openai_breaker.release_probe()
+                raise
+            # Back off without holding a concurrency slot
+            time.sleep(delay)
+    
+    async def _arequest_completion(self, prompt: str, max_tokens: int = 150) -> str:
+        """_request_completion() on the async client; waits are awaited, not slept"""
+        estimated_tokens = estimate_tokens(self.SYSTEM_PROMPT + prompt) + max_tokens
+        
+        for attempt in range(settings.AI_MAX_RETRIES + 1):
+            probe = self._before_ai_request()
+            try:
+                async with openai_limiter.aslot() as slot:
+                    await asyncio.sleep(openai_limiter.reserve(estimated_tokens))
+                    try:
+                        with stage_timer('ai_request'):
+                            response = await self.async_openai_client.chat.completions.create(
+                                **self._completion_kwargs(prompt, max_tokens)
+                            )
+                    except Exception as e:
+                        delay = self._ai_request_failed(e, attempt, slot)
+                    else:
+                        return self._ai_request_succeeded(response, estimated_tokens)
+            except BaseException:
+                # Cancelled (the client went away) before the probe's outcome was recorded;
+                # after a recorded outcome the circuit has left half-open and this is a no-op
+                if probe:
+                    openai_breaker.release_probe()
+                raise
+            await asyncio.sleep(delay)
+    
+    def _before_ai_request(self) -> bool:
+        """Check the circuit; True if this request is the half-open probe"""
+        try:
+            return openai_breaker.before_request()
+        except CircuitOpenError:
+            AI_REQUESTS.labels('circuit_open').inc()
+            raise
+    
+    def _completion_kwargs(self, prompt: str, max_tokens: int) -> Dict:
+        return {
+            'model': self.AI_MODEL,
+            'messages': [
+                {"role": "system", "content": self.SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            'max_tokens': max_tokens,
+            'temperature': 0.3,
+        }
+    
+    def _ai_request_failed(self, error: Exception, attempt: int, slot) -> float:
+        """Record a failed attempt; return the backoff before the next one, or re-raise"""
+        throttled = status_code_of(error) == 429
+        AI_REQUESTS.labels('throttled' if throttled else 'error').inc()
+        # 429s and client errors still prove the provider is up
+        if is_retryable(error) and not throttled:
+            openai_breaker.record_failure()
+        else:
+            openai_breaker.record_success()
+        if attempt >= settings.AI_MAX_RETRIES or not is_retryable(error):
+            raise error
+        if throttled:
+            slot.throttled()
+        openai_limiter.record_retry(throttled)
+        return retry_delay(attempt, retry_after_seconds(error))
+    
+    def _ai_request_succeeded(self, response, estimated_tokens: int) -> str:
+        AI_REQUESTS.labels('success').inc()
+        openai_breaker.record_success()
+        usage = getattr(response, 'usage', None)
+        openai_limiter.settle(estimated_tokens, getattr(usage, 'total_tokens', None))
+        return response.choices[0].message.content.strip()
+    
+    def _request_batch_assessments(self, leads: List[Lead], offer: Offer
+                                   ) -> Tuple[List[Optional[Tuple[str, str]]], Optional[Exception]]:
+        """Assess several leads with a single chat completion.
+        
+        Returns (intent, reasoning) per lead, or None where the lead's part of
+        the answer could not be parsed; those leads get their own request.
+        If the request itself fails after its retries, the error is returned
+        too and the unassessed leads fall back to rules: sending each of them
+        on its own would multiply the load on a provider that is already
+        throttling or failing.
+        """
+        assessments, keys, missing, prompt = self._prepare_batch_request(leads, offer)
+        if not missing:
+            return assessments, None
+        
+        try:
+            response_text = self._request_completion(prompt, max_tokens=150 * len(missing))
         except Exception as e:
-            # Enhanced fallback with error details
-            print(f"AI scoring error: {e}")
-            # Use the same enhanced fallback logic
-            role_score = self._calculate_role_score(lead.role)
-            industry_score = self._calculate_industry_score(lead.industry, offer.ideal_use_cases)
-            completeness_score = self._calculate_completeness_score(lead)
-            total_rule_score = role_score + industry_score + completeness_score
-            
-            if total_rule_score >= 40:
-                return 40, 'High', f'AI unavailable - rule-based high score ({total_rule_score}/50)'
-            elif total_rule_score >= 25:
-                return 25, 'Medium', f'AI unavailable - rule-based medium score ({total_rule_score}/50)'
-            else:
-                return 15, 'Low', f'AI unavailable - rule-based low score ({total_rule_score}/50)'
+            return assessments, e
+        
+        return self._finish_batch_request(response_text, assessments, keys, missing), None
+    
+    async def _arequest_batch_assessments(self, leads: List[Lead], offer: Offer
+                                          ) -> Tuple[List[Optional[Tuple[str, str]]], Optional[Exception]]:
+        """_request_batch_assessments() on the async client"""
+        assessments, keys, missing, prompt = self._prepare_batch_request(leads, offer)
+        if not missing:
+            return assessments, None
+        
+        try:
+            response_text = await self._arequest_completion(prompt, max_tokens=150 * len(missing))
+        except Exception as e:
+            return assessments, e
+        
+        return self._finish_batch_request(response_text, assessments, keys, missing), None
+    
+    def _prepare_batch_request(self, leads: List[Lead], offer: Offer) -> Tuple[List, List, List[int], Optional[str]]:
+        """(cached assessments, cache keys, indexes still to assess, prompt for those)"""
+        with stage_timer('prompt'):
+            offer_context = self._offer_context(offer)
+            lead_contexts = [self._lead_context(lead) for lead in leads]
+        
+        keys = [None] * len(leads)
+        assessments = [None] * len(leads)
+        if self.ai_cache.enabled:
+            keys = [self._ai_cache_key(lead_context, offer_context) for lead_context in lead_contexts]
+            assessments = [self.ai_cache.get(key) for key in keys]
+        
+        missing = [index for index, assessment in enumerate(assessments) if assessment is None]
+        if not missing:
+            return assessments, keys, missing, None
+        
+        with stage_timer('prompt'):
+            prompt = self._build_batch_prompt([lead_contexts[index] for index in missing], offer_context)
+        return assessments, keys, missing, prompt
+    
+    def _finish_batch_request(self, response_text: str, assessments: List, keys: List,
+                              missing: List[int]) -> List[Optional[Tuple[str, str]]]:
+        with stage_timer('parse'):
+            parsed = self._parse_batch_ai_response(response_text)
+        for number, index in enumerate(missing, start=1):
+            if number in parsed:
+                assessments[index] = parsed[number]
+                if keys[index]:
+                    self.ai_cache.set(keys[index], self.AI_MODEL, *parsed[number])
+        
+        return assessments
+    
+    @staticmethod
+    def _ai_score_for_intent(intent: str) -> int:
+        # Map intent to score
+        score_mapping = {'High': 50, 'Medium': 30, 'Low': 10}
+        return score_mapping.get(intent, 25)
+    
+    def _lead_context(self, lead: Lead) -> str:
+        """Prompt context for a lead, built once per instance however many offers it is scored against"""
+        context = getattr(lead, '_prompt_context', None)
+        if context is None:
+            context = lead._prompt_context = self._prepare_lead_context(lead)
+        return context
+    
+    def _offer_context(self, offer: Offer) -> str:
+        """Prompt context for an offer, built once per instance"""
+        context = getattr(offer, '_prompt_context', None)
+        if context is None:
+            context = offer._prompt_context = self._prepare_offer_context(offer)
+        return context
     
     def _prepare_lead_context(self, lead: Lead) -> str:
         """Prepare lead information for AI analysis"""
@@ -256,32 +980,231 @@ REASONING: [1-2 sentences explaining your classification]
         
         return "\n".join(context_parts)
     
-    def _parse_ai_response(self, response_text: str) -> Tuple[str, str]:
-        """Parse AI response to extract intent and reasoning"""  # type: ignore
-        intent_match = re.search(r'INTENT:\\s*(High|Medium|Low)', response_text, re.IGNORECASE)
-        reasoning_match = re.search(r'REASONING:\\s*(.+)', response_text, re.IGNORECASE | re.DOTALL)
+    def _match_ai_response(self, response_text: str) -> Tuple[Optional[str], Optional[str]]:
+        """Extract intent and reasoning, or None for whichever is missing"""
+        intent_match = re.search(r'INTENT:\s*(High|Medium|Low)', response_text, re.IGNORECASE)
+        reasoning_match = re.search(r'REASONING:\s*(.+)', response_text, re.IGNORECASE | re.DOTALL)
         
-        intent = intent_match.group(1).title() if intent_match else 'Medium'
-        reasoning = reasoning_match.group(1).strip() if reasoning_match else 'AI analysis completed'
-        
-        # Clean up reasoning
-        reasoning = re.sub(r'\s+', ' ', reasoning)  # Clean whitespace
-        reasoning = reasoning[:200]  # Limit length
+        intent = intent_match.group(1).title() if intent_match else None
+        reasoning = None
+        if reasoning_match:
+            # Clean up reasoning
+            reasoning = re.sub(r'\s+', ' ', reasoning_match.group(1).strip())  # Clean whitespace
+            reasoning = reasoning[:200]  # Limit length
         
         return intent, reasoning
     
+    def _parse_ai_response(self, response_text: str) -> Tuple[str, str]:
+        """Parse AI response to extract intent and reasoning"""
+        intent, reasoning = self._match_ai_response(response_text)
+        return intent or 'Medium', reasoning or 'AI analysis completed'
+    
+    def _parse_batch_ai_response(self, response_text: str) -> Dict[int, Tuple[str, str]]:
+        """Split a batched answer into {prospect number: (intent, reasoning)}.
+        
+        Prospects whose section lacks an INTENT or REASONING line are left out.
+        """
+        headers = list(self.PROSPECT_HEADER.finditer(response_text))
+        parsed = {}
+        for header, next_header in zip(headers, headers[1:] + [None]):
+            end = next_header.start() if next_header else len(response_text)
+            intent, reasoning = self._match_ai_response(response_text[header.end():end])
+            if intent and reasoning:
+                parsed.setdefault(int(header.group(1)), (intent, reasoning))
+        return parsed
+    
     def score_batch(self, batch_id: str, offer: Offer) -> List[LeadScore]:
         """Score all leads in a batch"""
         leads = Lead.objects.filter(upload_batch=batch_id)
-        scored_leads = []
+        scored_leads, errors = self.score_leads(leads, offer)
         
-        for lead in leads:
+        # Log errors but keep the leads that scored
+        for error in errors:
+            logger.warning("Error scoring %s", error)
+        
+        return scored_leads
+
+
+class _ScoreWriter:
+    """Buffers (lead, offer, fields) for ScoringService.iter_score_batches() and its async twin"""
+    
+    def __init__(self, service: ScoringService, offers: List[Offer], flush_seconds: Optional[float] = None):
+        self.service = service
+        self.several_offers = len(offers) > 1
+        self.batch_size = settings.SCORE_WRITE_BATCH_SIZE
+        self.flush_seconds = flush_seconds
+        self.pending = []
+        self.errors = []
+        self.last_flush = time.monotonic()
+    
+    def describe(self, lead: Lead, offer: Offer) -> str:
+        if self.several_offers:
+            return f"Lead {lead.id} ({lead.name}), offer {offer.id}"
+        return f"Lead {lead.id} ({lead.name})"
+    
+    def add(self, item: Tuple[Lead, Offer, Optional[Dict], Optional[Exception]]):
+        lead, offer, fields, error = item
+        if error is not None:
+            self.errors.append(f"{self.describe(lead, offer)}: {str(error)}")
+            SCORED_LEADS.labels('failed').inc()
+        else:
+            self.pending.append((lead, offer, fields))
+    
+    def due(self) -> bool:
+        if len(self.pending) >= self.batch_size:
+            return True
+        return bool((self.pending or self.errors) and self.flush_seconds is not None
+                    and time.monotonic() - self.last_flush >= self.flush_seconds)
+    
+    def flush(self) -> Tuple[List[LeadScore], List[str]]:
+        """Write pending scores; return (saved scores, error messages) since the last flush"""
+        self.service._flush_ai_cache()
+        saved = []
+        if self.pending:
             try:
-                score = self.score_lead(lead, offer)
-                scored_leads.append(score)
+                with stage_timer('db_write'):
+                    saved = self.service._bulk_save_scores(self.pending)
             except Exception as e:
-                # Log error but continue with other leads
-                print(f"Error scoring lead {lead.id}: {str(e)}")
-                continue
+                self.errors.extend(f"{self.describe(lead, offer)}: {str(e)}" for lead, offer, _ in self.pending)
+                SCORED_LEADS.labels('failed').inc(len(self.pending))
+            else:
+                SCORED_LEADS.labels('scored').inc(len(saved))
+        batch = (saved, self.errors)
+        self.pending = []
+        self.errors = []
+        self.last_flush = time.monotonic()
+        return batch
+
+
+class CSVFormatError(ValueError):
+    """Raised when an uploaded CSV can't be imported at all"""
+
+
+class LeadImportService:
+    """Import leads from an uploaded CSV file.
+    
+    The upload is decoded line by line into ``csv.DictReader`` rather than
+    read into memory, and valid rows are inserted in chunks with
+    ``bulk_create`` inside a single transaction.
+    
+    Rows matching an existing lead's fingerprint are handled according to
+    ``dedup_policy`` (see ``qualification.dedup``); existing leads are looked
+    up with one query per chunk.
+    """
+    
+    REQUIRED_COLUMNS = ['name', 'role', 'company', 'industry', 'location', 'linkedin_bio']
+    
+    def __init__(self, batch_id: str, max_leads: Optional[int] = None, chunk_size: Optional[int] = None,
+                 dedup_policy: Optional[str] = None):
+        self.batch_id = batch_id
+        self.max_leads = max_leads if max_leads is not None else settings.MAX_LEADS_PER_UPLOAD
+        self.chunk_size = chunk_size or settings.LEAD_UPLOAD_CHUNK_SIZE
+        self.dedup_policy = dedup_policy or settings.LEAD_DEDUP_POLICY
+        self.max_lengths = {
+            field: Lead._meta.get_field(field).max_length for field in self.REQUIRED_COLUMNS
+        }
+        self.duplicates_skipped = 0
+        self.duplicates_linked = 0
+    
+    def import_csv(self, csv_file) -> Tuple[int, List[str]]:
+        """Create leads from ``csv_file``; returns (leads created, per-row errors)"""
+        csv_reader = csv.DictReader(codecs.iterdecode(csv_file, 'utf-8'))
+        
+        # Validate CSV headers
+        missing_headers = set(self.REQUIRED_COLUMNS) - set(csv_reader.fieldnames or [])
+        if missing_headers:
+            raise CSVFormatError(f'Missing required CSV columns: {", ".join(missing_headers)}')
+        
+        leads_created = 0
+        rows_read = 0
+        errors = []
+        chunk = []
+        start = time.perf_counter()
+        
+        with transaction.atomic():
+            for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 for header
+                rows_read += 1
+                lead, error = self._build_lead(row, row_num)
+                if error:
+                    errors.append(error)
+                if lead is None:
+                    continue
+                
+                chunk.append(lead)
+                # Save early when the chunk could reach the upload limit: only
+                # rows actually created count, and skipped duplicates are not
+                if len(chunk) >= self.chunk_size or leads_created + len(chunk) >= self.max_leads:
+                    leads_created += self._save_chunk(chunk)
+                    chunk = []
+                
+                # Check upload limit
+                if leads_created >= self.max_leads:
+                    break
+            
+            if chunk:
+                leads_created += self._save_chunk(chunk)
+        
+        elapsed = time.perf_counter() - start
+        UPLOAD_ROWS.labels('created').inc(leads_created)
+        UPLOAD_ROWS.labels('rejected').inc(rows_read - leads_created - self.duplicates_skipped)
+        UPLOAD_ROWS.labels('duplicate_skipped').inc(self.duplicates_skipped)
+        if rows_read and elapsed > 0:
+            UPLOAD_ROWS_PER_SECOND.observe(rows_read / elapsed)
+        
+        return leads_created, errors
+    
+    def _save_chunk(self, chunk: List[Lead]) -> int:
+        """Insert a chunk of leads, applying the dedup policy; returns rows created"""
+        if self.dedup_policy == DEDUP_ALLOW:
+            Lead.objects.bulk_create(chunk)
+            return len(chunk)
+        
+        # Earlier chunks of this upload are already inserted, so one query
+        # finds their duplicates too. Newest first so the oldest lead wins.
+        canonical_ids = dict(
+            Lead.objects.filter(fingerprint__in={lead.fingerprint for lead in chunk}, duplicate_of__isnull=True)
+            .order_by('-id').values_list('fingerprint', 'id')
+        )
+        
+        new_leads = []
+        duplicates = []
+        for lead in chunk:
+            if lead.fingerprint in canonical_ids:
+                duplicates.append(lead)
+            else:
+                canonical_ids[lead.fingerprint] = None  # filled in once inserted
+                new_leads.append(lead)
+        
+        Lead.objects.bulk_create(new_leads)
+        for lead in new_leads:
+            canonical_ids[lead.fingerprint] = lead.pk
+        
+        if self.dedup_policy == DEDUP_SKIP:
+            self.duplicates_skipped += len(duplicates)
+            return len(new_leads)
+        
+        for lead in duplicates:
+            lead.duplicate_of_id = canonical_ids[lead.fingerprint]
+        Lead.objects.bulk_create(duplicates)
+        self.duplicates_linked += len(duplicates)
+        return len(new_leads) + len(duplicates)
+    
+    def _build_lead(self, row: Dict, row_num: int) -> Tuple[Optional[Lead], Optional[str]]:
+        """Clean and validate one CSV row"""
+        # Short rows leave missing columns as None
+        lead_data = {field: (row.get(field) or '').strip() for field in self.REQUIRED_COLUMNS}
+        
+        # Skip empty rows
+        if not any(lead_data[field] for field in ['name', 'company']):
+            return None, None
+        
+        # Validate required fields
+        if not lead_data['name']:
+            return None, f"Row {row_num}: Name is required"
+        
+        for field, max_length in self.max_lengths.items():
+            if max_length and len(lead_data[field]) > max_length:
+                return None, f"Row {row_num}: {field} exceeds {max_length} characters"
         
-        return scored_leads
\ No newline at end of file
+        fingerprint = lead_fingerprint(lead_data['name'], lead_data['company'], lead_data['role'])
+        return Lead(upload_batch=self.batch_id, fingerprint=fingerprint, **lead_data), None
@@ -1,3 +1,994 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import random
+import threading
+import time
+import unittest
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .ai_cache import ai_response_cache
+from .ai_stub import OpenAIStubServer, canned_intent
+from .async_views import AsyncExportResultsView, AsyncLeadsUploadView, AsyncResultsListView, AsyncScoreLeadsView
+from .batch_scoring import NUMPY_AVAILABLE, score_rules_for_queryset
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, openai_breaker
+from .jobs import claim_next_job, run_job
+from .matchers import IndustryMatcher, industry_matcher_for_offer, score_role
+from .metrics import PROMETHEUS_AVAILABLE
+from .models import Lead, Offer, LeadScore, ScoringJob
+from .openai_client import OPENAI_AVAILABLE, close_openai_client
+from .rate_limit import AdaptiveConcurrency, TokenBucket, openai_limiter
+from .services import ScoringService
+
+
+class FakeAPIError(Exception):
+    """Shaped like ``openai.APIStatusError``"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f'HTTP {status_code}')
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class FakeCompletions:
+    """Minimal stand-in for ``client.chat.completions``"""
+
+    def __init__(self, content='INTENT: High\nREASONING: Strong fit.', fail_for=(), batch_content=None, errors=(),
+                 delay=0, slow_for=()):
+        self.content = content
+        self.delay = delay
+        self.slow_for = slow_for  # only prompts naming these wait ``delay``, when given
+        self.fail_for = fail_for
+        self.batch_content = batch_content
+        self.errors = list(errors)  # raised by the first calls, in order
+        self.calls = 0
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay_for(messages))
+        return self.respond(messages)
+
+    def delay_for(self, messages):
+        if self.slow_for and not any(name in messages[-1]['content'] for name in self.slow_for):
+            return 0
+        return self.delay
+
+    def respond(self, messages):
+        prompt = messages[-1]['content']
+        if self.errors:
+            raise self.errors.pop(0)
+        if any(name in prompt for name in self.fail_for):
+            raise RuntimeError('boom')
+        content = self.batch_content if 'PROSPECT 1:' in prompt else self.content
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    """``FakeCompletions`` for ``AsyncOpenAI``; ``delay`` is awaited"""
+
+    async def create(self, model, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay_for(messages))
+        return self.respond(messages)
+
+
+def make_service(**kwargs):
+    service = ScoringService()
+    service.openai_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(**kwargs)))
+    return service
+
+
+@override_settings(AI_REQUESTS_PER_MINUTE=0, AI_TOKENS_PER_MINUTE=0)
+class ScoringTestCase(TestCase):
+
+    def setUp(self):
+        ai_response_cache.clear()
+        openai_limiter.reset()
+        openai_breaker.reset()
+        self.offer = Offer.objects.create(
+            name='AI Outreach Automation',
+            value_props=['24/7 outreach'],
+            ideal_use_cases=['B2B SaaS', 'mid-market'],
+        )
+
+    def create_leads(self, count, batch='batch_test', **overrides):
+        fields = {
+            'role': 'Head of Growth', 'company': 'FlowMetrics', 'industry': 'SaaS',
+            'location': 'Remote', 'linkedin_bio': 'Scaling B2B SaaS teams',
+        }
+        fields.update(overrides)
+        return [Lead.objects.create(name=f'Lead {i}', upload_batch=batch, **fields) for i in range(count)]
+
+
+class RoleMatcherTests(TestCase):
+
+    def test_role_scores(self):
+        cases = {
+            '': 0, 'Engineer': 0, 'Intern': 0,
+            'CEO': 20, 'Director of Sales': 20, 'Team Lead': 20, 'Senior Manager': 20,
+            'Vice President, EMEA': 20, 'Senior Analyst & Founder': 20,
+            'Senior Engineer': 10, 'Data ANALYST': 10, 'Support Specialist': 10,
+        }
+        for role, expected in cases.items():
+            with self.subTest(role=role):
+                self.assertEqual(score_role(role), expected)
+
+
+class IndustryMatcherTests(TestCase):
+
+    def test_industry_scores(self):
+        matcher = IndustryMatcher(['B2B SaaS', 'Healthcare'])
+        cases = {
+            '': 0, 'Manufacturing': 0,
+            'SaaS': 20, 'b2b saas platforms': 20, 'healthcare': 20,
+            'Software': 10, 'Medical Devices': 10, 'Corporate Services': 10, 'Finance': 0,
+        }
+        for industry, expected in cases.items():
+            with self.subTest(industry=industry):
+                self.assertEqual(matcher.score(industry), expected)
+
+    def test_key_in_industry_with_adjacent_in_use_case(self):
+        self.assertEqual(IndustryMatcher(['Online marketplaces']).score('Ecommerce'), 10)
+        self.assertEqual(IndustryMatcher(['']).score('Anything'), 20)
+
+    def test_matcher_is_cached_per_offer_version(self):
+        offer = Offer.objects.create(name='Offer', value_props=[], ideal_use_cases=['SaaS'])
+        matcher = industry_matcher_for_offer(offer)
+        self.assertIs(industry_matcher_for_offer(Offer.objects.get(pk=offer.pk)), matcher)
+
+        offer.ideal_use_cases = ['Retail']
+        offer.save()
+        self.assertEqual(industry_matcher_for_offer(offer).score('Retail'), 20)
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, 'NumPy is not installed')
+class BatchRuleScoringTests(ScoringTestCase):
+
+    def test_matches_per_lead_scoring_on_random_leads(self):
+        rng = random.Random(3)
+        values = {
+            'role': ['', 'CEO', 'Senior Engineer', 'Analyst', 'Intern', 'Team Lead', ' '],
+            'industry': ['', 'SaaS', 'Software', 'Healthcare', 'Retail', 'Fintech', 'mid-market SMB'],
+            'company': ['', 'Acme', '  '],
+            'location': ['', 'NYC'],
+            'linkedin_bio': ['', 'Bio', '\t'],
+        }
+        Lead.objects.bulk_create(
+            Lead(name=rng.choice(['', 'Ava']), upload_batch='random',
+                 **{field: rng.choice(choices) for field, choices in values.items()})
+            for _ in range(300)
+        )
+        service = ScoringService()
+
+        batch = score_rules_for_queryset(Lead.objects.filter(upload_batch='random'), self.offer).as_dict()
+
+        for lead in Lead.objects.filter(upload_batch='random'):
+            expected = (
+                service._calculate_role_score(lead.role),
+                service._calculate_industry_score(lead.industry, self.offer),
+                service._calculate_completeness_score(lead),
+            )
+            self.assertEqual(batch[lead.id], expected)
+
+
+class LeadsUploadTests(TestCase):
+
+    def upload(self, content):
+        return APIClient().post('/leads/upload/', {'file': SimpleUploadedFile('leads.csv', content.encode())},
+                                format='multipart')
+
+    def test_upload_keeps_row_warnings_and_cap(self):
+        content = (
+            'name,role,company,industry,location,linkedin_bio\n'
+            'Ava Patel,Head of Growth,FlowMetrics,SaaS,San Francisco,"Scaling\nB2B SaaS"\n'
+            ',CTO,NoName Inc,Tech,NYC,\n'
+            ',,,,,\n'
+            + ''.join(f'Lead {i},CTO,Co {i},Tech,NYC,Bio\n' for i in range(5))
+        )
+
+        with self.settings(MAX_LEADS_PER_UPLOAD=4, LEAD_UPLOAD_CHUNK_SIZE=2):
+            response = self.upload(content)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['leads_created'], 4)
+        self.assertEqual(response.data['warnings'], ['Row 3: Name is required'])
+        self.assertEqual(Lead.objects.get(name='Ava Patel').linkedin_bio, 'Scaling\nB2B SaaS')
+
+    def test_upload_rejects_missing_columns(self):
+        response = self.upload('name,role\nAva Patel,CTO\n')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Missing required CSV columns', response.data['error'])
+
+
+class LeadDedupTests(ScoringTestCase):
+    
+    CSV = ('name,role,company,industry,location,linkedin_bio\n'
+           'Ava Patel,Head of Growth,FlowMetrics,SaaS,NYC,Bio\n'
+           'Ben Ode,CTO,Acme,SaaS,NYC,Bio\n')
+
+    def upload(self, content, **data):
+        data['file'] = SimpleUploadedFile('leads.csv', content.encode())
+        return APIClient().post('/leads/upload/', data, format='multipart')
+
+    def test_fingerprint_ignores_case_punctuation_and_spacing(self):
+        lead = Lead.objects.create(name='Ava Patel', company='FlowMetrics', role='Head of Growth')
+        same = Lead.objects.create(name=' ava  patel', company='Flowmetrics.', role='head of growth')
+        self.assertEqual(lead.fingerprint, same.fingerprint)
+
+    def test_skip_policy(self):
+        self.upload(self.CSV)
+        response = self.upload(self.CSV + 'Cy Lee,CEO,Acme,SaaS,NYC,Bio\nAva Patel,Head of Growth,FlowMetrics,,,\n',
+                               dedup='skip')
+
+        self.assertEqual((response.data['leads_created'], response.data['duplicates_skipped']), (1, 3))
+        self.assertEqual(Lead.objects.count(), 3)
+
+    def test_skipped_duplicates_do_not_count_towards_the_cap(self):
+        self.upload(self.CSV)
+        content = self.CSV + ''.join(f'Lead {i},CTO,Co {i},SaaS,NYC,Bio\n' for i in range(4))
+
+        with self.settings(MAX_LEADS_PER_UPLOAD=3, LEAD_UPLOAD_CHUNK_SIZE=10):
+            response = self.upload(content, dedup='skip')
+
+        self.assertEqual((response.data['leads_created'], response.data['duplicates_skipped']), (3, 2))
+        self.assertEqual(Lead.objects.filter(upload_batch=response.data['batch_id']).count(), 3)
+
+    def test_linked_duplicates_reuse_scores(self):
+        first = self.upload(self.CSV).data['batch_id']
+        second = self.upload(self.CSV, dedup='link').data
+        self.assertEqual(second['duplicates_linked'], 2)
+
+        service = make_service()
+        with self.settings(AI_CACHE_ENABLED=False):
+            service.score_leads(Lead.objects.filter(upload_batch=first), self.offer)
+            calls = service.openai_client.chat.completions.calls
+            service.score_leads(Lead.objects.filter(upload_batch=second['batch_id']), self.offer)
+
+        self.assertEqual(service.openai_client.chat.completions.calls, calls)
+        for duplicate in Lead.objects.filter(upload_batch=second['batch_id']):
+            original = duplicate.duplicate_of.scores.get()
+            score = duplicate.scores.get()
+            self.assertEqual((score.total_score, score.ai_reasoning),
+                             (original.total_score, original.ai_reasoning))
+
+    def test_duplicate_with_different_profile_is_scored_itself(self):
+        first = self.upload(self.CSV).data['batch_id']
+        second = self.upload('name,role,company,industry,location,linkedin_bio\nAva Patel,Head of Growth,FlowMetrics,,,\n',
+                             dedup='link').data['batch_id']
+
+        service = make_service()
+        service.score_leads(Lead.objects.filter(upload_batch=first), self.offer)
+        service.score_leads(Lead.objects.filter(upload_batch=second), self.offer)
+
+        score = Lead.objects.get(upload_batch=second).scores.get()
+        self.assertEqual((score.industry_score, score.completeness_score), (0, 0))
+        self.assertNotIn('exact ICP match', score.reasoning)
+
+    def test_duplicate_does_not_copy_a_score_from_an_older_offer_version(self):
+        first = self.upload(self.CSV).data['batch_id']
+        second = self.upload(self.CSV, dedup='link').data['batch_id']
+        service = make_service(content='INTENT: Low\nREASONING: Before the edit.')
+        service.score_leads(Lead.objects.filter(upload_batch=first), self.offer)
+
+        self.offer.value_props = ['New pitch']
+        self.offer.save()
+        service.openai_client.chat.completions.content = 'INTENT: High\nREASONING: After the edit.'
+        with self.settings(AI_CACHE_ENABLED=False):
+            # Duplicates first, so the originals' scores are still from the old version
+            service.score_leads(Lead.objects.filter(upload_batch=second), self.offer)
+
+        reasoning = set(LeadScore.objects.filter(upload_batch=second).values_list('ai_reasoning', flat=True))
+        self.assertEqual(reasoning, {'After the edit.'})
+
+
+class ScoreLeadsTests(ScoringTestCase):
+
+    def test_concurrent_scoring_matches_sequential(self):
+        leads = self.create_leads(12)
+        service = make_service()
+
+        sequential, _ = service.score_leads(leads, self.offer, concurrency=1)
+        sequential = {s.lead_id: (s.total_score, s.intent_label) for s in sequential}
+        concurrent, errors = service.score_leads(leads, self.offer, concurrency=4)
+
+        self.assertEqual(errors, [])
+        self.assertEqual({s.lead_id: (s.total_score, s.intent_label) for s in concurrent}, sequential)
+        self.assertEqual(LeadScore.objects.count(), 12)
+
+    def test_failed_ai_call_falls_back_per_lead(self):
+        leads = self.create_leads(3)
+        service = make_service(fail_for=('Lead 1',))
+
+        scored, errors = service.score_leads(leads, self.offer, concurrency=4)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(scored), 3)
+        fallback = LeadScore.objects.get(lead__name='Lead 1')
+        self.assertIn('AI unavailable', fallback.ai_reasoning)
+
+
+class StreamingScoreTests(ScoringTestCase):
+
+    def stream(self, leads, fmt, **completions):
+        client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(**completions)))
+        with mock.patch('qualification.services.get_openai_client', return_value=client):
+            response = APIClient().post('/score/', {'offer_id': self.offer.id, 'batch_id': 'batch_test',
+                                                    'stream': fmt}, format='json')
+            body = b''.join(response.streaming_content).decode()
+        return response, body
+
+    def test_ndjson_streams_each_score_then_a_summary(self):
+        leads = self.create_leads(5)
+
+        with self.settings(SCORE_STREAM_FLUSH_SECONDS=0):
+            response, body = self.stream(leads, 'ndjson', fail_for=('Lead 3',))
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(records[0], {'type': 'start', 'total_leads': 5, 'offer_ids': [self.offer.id]})
+        scores = [record for record in records if record['type'] == 'score']
+        self.assertEqual(sorted(record['lead_id'] for record in scores), sorted(lead.id for lead in leads))
+        self.assertEqual(scores[0]['offer_id'], self.offer.id)
+        self.assertEqual(records[-1]['type'], 'summary')
+        self.assertEqual((records[-1]['scored_leads'], records[-1]['skipped_leads']), (5, 0))
+        self.assertEqual(LeadScore.objects.count(), 5)
+
+    def test_sse_sends_heartbeats_while_ai_calls_are_slow(self):
+        leads = self.create_leads(2)
+
+        with self.settings(SCORE_STREAM_HEARTBEAT_SECONDS=0.01, AI_SCORING_CONCURRENCY=2):
+            response, body = self.stream(leads, 'sse', delay=0.1)
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertTrue(body.startswith('event: start\n'))
+        self.assertIn(': heartbeat\n\n', body)
+        self.assertEqual(body.count('event: score\n'), 2)
+        self.assertTrue(body.rstrip().split('\n\n')[-1].startswith('event: summary\n'))
+
+    @override_settings(AI_CACHE_ENABLED=False)
+    def test_scores_are_yielded_in_completion_order(self):
+        leads = self.create_leads(4)
+        service = make_service(delay=0.3, slow_for=('Lead 0',))
+
+        names = [item[0].name for item in service._iter_score_fields(leads, [self.offer], concurrency=4)]
+
+        self.assertEqual(names[-1], 'Lead 0')
+
+        service.async_openai_client = SimpleNamespace(
+            chat=SimpleNamespace(completions=FakeAsyncCompletions(delay=0.3, slow_for=('Lead 0',)))
+        )
+
+        async def collect():
+            return [item[0].name async for item in service._aiter_score_fields(leads, [self.offer], concurrency=4)]
+
+        self.assertEqual(async_to_sync(collect)()[-1], 'Lead 0')
+
+    def test_stream_cannot_be_combined_with_background(self):
+        self.create_leads(1)
+        response = APIClient().post('/score/', {'offer_id': self.offer.id, 'stream': 'ndjson', 'background': True},
+                                    format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class AsyncViewTests(ScoringTestCase):
+
+    def call(self, view, request, **completions):
+        completions = FakeAsyncCompletions(**completions)
+        self.completions = completions
+        sync_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+        async_client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+        with mock.patch('qualification.services.get_openai_client', return_value=sync_client), \
+                mock.patch('qualification.services.get_async_openai_client', return_value=async_client):
+            return async_to_sync(view.as_view())(request)
+
+    def score(self, data, **completions):
+        request = AsyncRequestFactory().post('/score/', data, content_type='application/json')
+        return self.call(AsyncScoreLeadsView, request, **completions)
+
+    def test_score_awaits_ai_requests_concurrently(self):
+        self.create_leads(6)
+
+        start = time.monotonic()
+        with self.settings(AI_SCORING_CONCURRENCY=6, AI_CACHE_ENABLED=False):
+            response = self.score({'offer_id': self.offer.id, 'batch_id': 'batch_test'}, delay=0.2,
+                                  fail_for=('Lead 2',))
+        elapsed = time.monotonic() - start
+
+        data = json.loads(response.content)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((data['total_leads'], data['scored_leads'], data['offer_id']), (6, 6, self.offer.id))
+        self.assertEqual(self.completions.calls, 6)
+        self.assertLess(elapsed, 0.2 * 6 / 2)
+        self.assertIn('AI unavailable', LeadScore.objects.get(lead__name='Lead 2').ai_reasoning)
+        self.assertEqual(LeadScore.objects.get(lead__name='Lead 0').ai_reasoning, 'Strong fit.')
+
+    def test_score_errors_match_sync_view(self):
+        self.create_leads(1)
+        for data in ({'offer_id': self.offer.id, 'batch_id': 'missing'}, {'offer_id': 999}):
+            sync = APIClient().post('/score/', data, format='json')
+            response = self.score(data)
+            self.assertEqual((response.status_code, json.loads(response.content)), (sync.status_code, sync.json()))
+
+    def test_score_streams_ndjson(self):
+        leads = self.create_leads(3)
+
+        async def read(response):
+            return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+        with self.settings(SCORE_STREAM_FLUSH_SECONDS=0):
+            response = self.score({'offer_id': self.offer.id, 'batch_id': 'batch_test', 'stream': 'ndjson'})
+            records = [json.loads(line) for line in async_to_sync(read)(response).splitlines()]
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(records[0]['type'], 'start')
+        self.assertEqual(sorted(r['lead_id'] for r in records if r['type'] == 'score'), [lead.id for lead in leads])
+        self.assertEqual((records[-1]['type'], records[-1]['scored_leads']), ('summary', 3))
+
+    def test_results_match_sync_view(self):
+        make_service().score_leads(self.create_leads(5) + self.create_leads(2, batch='other'), self.offer)
+
+        for params in ({'batch_id': 'batch_test', 'limit': 2, 'offset': 2}, {'cursor': '', 'limit': 3},
+                       {'cursor': 'bm9wZQ=='}):
+            sync = APIClient().get('/results/', params)
+            response = self.call(AsyncResultsListView, AsyncRequestFactory().get('/results/', params))
+            self.assertEqual((response.status_code, json.loads(response.content)), (sync.status_code, sync.json()))
+
+    def test_export_streams_chunks_like_sync_view(self):
+        make_service().score_leads(self.create_leads(5) + self.create_leads(2, batch='other'), self.offer)
+        params = {'batch_id': 'batch_test'}
+
+        async def collect(response):
+            return [chunk async for chunk in response]
+
+        with self.settings(EXPORT_CHUNK_SIZE=2):
+            sync = b''.join(APIClient().get('/results/export/', params).streaming_content)
+            response = self.call(AsyncExportResultsView, AsyncRequestFactory().get('/results/export/', params))
+            # An async iterator, so ASGI sends each chunk as it is read
+            self.assertTrue(response.is_async)
+            chunks = async_to_sync(collect)(response)
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(b''.join(chunks), sync)
+
+    def test_upload(self):
+        content = 'name,role,company,industry,location,linkedin_bio\nAva Patel,CTO,Acme,SaaS,NYC,Bio\n'
+        request = AsyncRequestFactory().post('/leads/upload/', {'file': SimpleUploadedFile('leads.csv', content.encode())})
+
+        response = self.call(AsyncLeadsUploadView, request)
+
+        data = json.loads(response.content)
+        self.assertEqual((response.status_code, data['leads_created']), (201, 1))
+        self.assertEqual(Lead.objects.get(name='Ava Patel').upload_batch, data['batch_id'])
+
+
+@override_settings(AI_CACHE_ENABLED=False)
+class IncrementalScoringTests(ScoringTestCase):
+
+    def test_only_new_or_changed_leads_are_rescored(self):
+        leads = self.create_leads(4)
+        service = make_service(fail_for=('Lead 3',))
+        service.score_leads(leads, self.offer)
+        calls = service.openai_client.chat.completions.calls
+
+        # Lead 3 fell back after an AI error, Lead 0 changed
+        Lead.objects.filter(name='Lead 0').update(role='CTO')
+        service.openai_client.chat.completions.fail_for = ()
+        scored, errors = service.score_leads(Lead.objects.all(), self.offer, incremental=True)
+
+        self.assertEqual(sorted(score.lead.name for score in scored), ['Lead 0', 'Lead 3'])
+        self.assertEqual((service.skipped_leads, errors), (2, []))
+        self.assertEqual(service.openai_client.chat.completions.calls, calls + 2)
+
+        self.offer.save()  # a new offer version invalidates every score
+        scored, _ = service.score_leads(Lead.objects.all(), self.offer, incremental=True)
+        self.assertEqual((len(scored), service.skipped_leads), (4, 0))
+
+    def test_score_endpoint_skips_unless_forced(self):
+        self.create_leads(3)
+        client = APIClient()
+        request = {'offer_id': self.offer.id, 'batch_id': 'batch_test'}
+        client.post('/score/', request, format='json')
+
+        response = client.post('/score/', request, format='json')
+        self.assertEqual((response.data['scored_leads'], response.data['skipped_leads']), (0, 3))
+
+        response = client.post('/score/', {**request, 'force': True}, format='json')
+        self.assertEqual((response.data['scored_leads'], response.data['skipped_leads']), (3, 0))
+
+
+@override_settings(AI_CACHE_ENABLED=False)
+class LeadOfferMatrixTests(ScoringTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other_offer = Offer.objects.create(name='Retail Analytics', value_props=['Dashboards'],
+                                                ideal_use_cases=['Retail'])
+
+    def test_scores_are_kept_per_offer(self):
+        leads = self.create_leads(3)
+        service = make_service()
+
+        service.score_leads(leads, self.offer)
+        scored, errors = service.score_leads_for_offers(leads, [self.offer, self.other_offer])
+
+        self.assertEqual((len(scored), errors), (6, []))
+        self.assertEqual(service.openai_client.chat.completions.calls, 9)
+        self.assertEqual(LeadScore.objects.count(), 6)
+        self.assertEqual(LeadScore.objects.filter(offer=self.other_offer, industry_score=0).count(), 3)
+        self.assertEqual(LeadScore.objects.filter(offer=self.offer, industry_score=20).count(), 3)
+
+    def test_score_endpoint_accepts_offer_ids(self):
+        self.create_leads(2)
+        client = APIClient()
+        offer_ids = [self.offer.id, self.other_offer.id]
+
+        response = client.post('/score/', {'offer_ids': offer_ids, 'batch_id': 'batch_test'}, format='json')
+        self.assertEqual((response.data['scored_leads'], response.data['offer_ids']), (4, offer_ids))
+
+        results = client.get('/results/', {'offer_id': self.other_offer.id}).data['results']
+        self.assertEqual({result['offer_id'] for result in results}, {self.other_offer.id})
+        self.assertEqual(len(results), 2)
+
+        response = client.post('/score/', {'offer_id': self.offer.id, 'offer_ids': offer_ids}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class BatchedPromptTests(ScoringTestCase):
+
+    def test_parse_ai_response(self):
+        service = ScoringService()
+        self.assertEqual(service._parse_ai_response('INTENT: low\nREASONING:  Weak\n fit.'), ('Low', 'Weak fit.'))
+        self.assertEqual(service._parse_ai_response('no idea'), ('Medium', 'AI analysis completed'))
+
+    def test_unparsed_leads_fall_back_to_single_requests(self):
+        leads = self.create_leads(3)
+        service = make_service(
+            content='INTENT: Low\nREASONING: Single request.',
+            batch_content=('PROSPECT 1\nINTENT: High\nREASONING: First.\n\n'
+                           '**PROSPECT 2:**\nREASONING: Missing intent.\n\n'
+                           'PROSPECT 3\nINTENT: medium\nREASONING: Third.'),
+        )
+
+        with self.settings(AI_PROMPT_BATCH_SIZE=3):
+            service.score_leads(leads, self.offer, concurrency=1)
+
+        reasoning = dict(LeadScore.objects.values_list('lead__name', 'ai_reasoning'))
+        self.assertEqual(reasoning, {'Lead 0': 'First.', 'Lead 1': 'Single request.', 'Lead 2': 'Third.'})
+        self.assertEqual(service.openai_client.chat.completions.calls, 2)
+
+    def test_failed_batch_request_falls_back_to_rules(self):
+        leads = self.create_leads(3)
+        service = make_service(errors=[FakeAPIError(500)])
+
+        with self.settings(AI_PROMPT_BATCH_SIZE=3, AI_MAX_RETRIES=0):
+            scored, errors = service.score_leads(leads, self.offer, concurrency=1)
+
+        self.assertEqual((len(scored), errors), (3, []))
+        self.assertTrue(all(score.ai_reasoning.startswith('AI unavailable') for score in LeadScore.objects.all()))
+        self.assertEqual(service.openai_client.chat.completions.calls, 1)
+
+
+class RateLimitTests(ScoringTestCase):
+
+    def test_throttled_requests_are_retried_before_falling_back(self):
+        lead = self.create_leads(1)[0]
+        service = make_service(errors=[FakeAPIError(429, {'retry-after': '0'}), FakeAPIError(503)])
+
+        with self.settings(AI_RETRY_BASE_DELAY=0):
+            score = service.score_lead(lead, self.offer)
+
+        self.assertEqual(score.ai_reasoning, 'Strong fit.')
+        self.assertEqual(service.openai_client.chat.completions.calls, 3)
+
+    def test_client_errors_and_exhausted_retries_fall_back(self):
+        leads = self.create_leads(2)
+        for errors, calls in (([FakeAPIError(400)], 1), ([FakeAPIError(500)] * 3, 3)):
+            service = make_service(errors=errors)
+            with self.settings(AI_RETRY_BASE_DELAY=0, AI_MAX_RETRIES=2, AI_CACHE_ENABLED=False):
+                score = service.score_lead(leads[0], self.offer)
+            self.assertIn('AI unavailable', score.ai_reasoning)
+            self.assertEqual(service.openai_client.chat.completions.calls, calls)
+
+    def test_token_bucket_paces_reservations(self):
+        now = [0.0]
+        bucket = TokenBucket(lambda: 120, clock=lambda: now[0])  # two per second, burst of two
+
+        self.assertEqual([bucket.reserve(1), bucket.reserve(1)], [0.0, 0.0])
+        self.assertEqual(bucket.reserve(2), 1.0)
+        now[0] = 3.0
+        self.assertEqual(bucket.reserve(2), 0.0)
+
+    def test_async_slots_share_the_limit_with_threads(self):
+        async def wait_for_slot():
+            start = time.monotonic()
+            async with openai_limiter.aslot():
+                return time.monotonic() - start
+
+        waited = []
+        with self.settings(AI_SCORING_CONCURRENCY=1):
+            with openai_limiter.slot():
+                waiter = threading.Thread(target=lambda: waited.append(asyncio.run(wait_for_slot())))
+                waiter.start()
+                time.sleep(0.1)
+            waiter.join()
+
+        self.assertGreaterEqual(waited[0], 0.09)
+
+    def test_concurrency_halves_on_throttle_and_recovers(self):
+        concurrency = AdaptiveConcurrency(lambda: 8)
+        concurrency.acquire()
+        concurrency.release(throttled=True)
+        self.assertEqual(concurrency.limit, 4)
+
+        for _ in range(4):
+            concurrency.acquire()
+            concurrency.release()
+        self.assertEqual(concurrency.limit, 5)
+
+
+class CircuitBreakerTests(ScoringTestCase):
+
+    def test_open_circuit_skips_ai_calls(self):
+        leads = self.create_leads(5)
+        service = make_service(errors=[FakeAPIError(503)] * 5)
+
+        with self.settings(AI_CIRCUIT_FAILURE_THRESHOLD=2, AI_MAX_RETRIES=0):
+            scored, errors = service.score_leads(leads, self.offer, concurrency=1)
+
+        self.assertEqual((len(scored), errors), (5, []))
+        self.assertEqual(service.openai_client.chat.completions.calls, 2)
+        self.assertEqual(LeadScore.objects.filter(ai_reasoning__startswith='AI unavailable').count(), 5)
+        status = APIClient().get('/').data
+        self.assertEqual((status['status'], status['ai_circuit']['state']), ('degraded', 'open'))
+
+    def test_half_open_probe(self):
+        now = [0.0]
+        breaker = CircuitBreaker(clock=lambda: now[0])
+        with self.settings(AI_CIRCUIT_FAILURE_THRESHOLD=1, AI_CIRCUIT_RESET_SECONDS=10):
+            breaker.record_failure()
+            self.assertRaises(CircuitOpenError, breaker.before_request)
+
+            now[0] = 10.0
+            breaker.before_request()  # the probe
+            self.assertRaises(CircuitOpenError, breaker.before_request)
+            breaker.record_failure()
+            self.assertEqual(breaker.state, 'open')
+
+            now[0] = 20.0
+            breaker.before_request()
+            breaker.record_success()
+            self.assertEqual(breaker.state, 'closed')
+
+    def test_probe_is_released_or_expires(self):
+        now = [0.0]
+        breaker = CircuitBreaker(clock=lambda: now[0])
+        with self.settings(AI_CIRCUIT_FAILURE_THRESHOLD=1, AI_CIRCUIT_RESET_SECONDS=10):
+            breaker.record_failure()
+            now[0] = 10.0
+            self.assertTrue(breaker.before_request())
+            breaker.release_probe()
+            self.assertTrue(breaker.before_request())
+
+            now[0] = 19.0
+            self.assertRaises(CircuitOpenError, breaker.before_request)
+            now[0] = 20.0
+            self.assertTrue(breaker.before_request())  # the unanswered probe expired
+
+    def test_cancelled_async_probe_is_released(self):
+        now = [0.0]
+        breaker = CircuitBreaker(clock=lambda: now[0])
+        service = ScoringService()
+        service.async_openai_client = SimpleNamespace(chat=SimpleNamespace(completions=FakeAsyncCompletions(delay=5)))
+
+        async def cancel_probe():
+            task = asyncio.ensure_future(service._arequest_completion('prompt'))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        with self.settings(AI_CIRCUIT_FAILURE_THRESHOLD=1, AI_CIRCUIT_RESET_SECONDS=10), \
+                mock.patch('qualification.services.openai_breaker', breaker):
+            breaker.record_failure()
+            now[0] = 10.0
+            async_to_sync(cancel_probe)()
+            self.assertEqual(breaker.state, 'half_open')
+            self.assertTrue(breaker.before_request())
+
+
+@unittest.skipUnless(OPENAI_AVAILABLE, 'openai is not installed')
+class OpenAIClientTests(TestCase):
+
+    def tearDown(self):
+        close_openai_client()
+
+    def test_services_share_one_pooled_client(self):
+        with self.settings(OPENAI_API_KEY='sk-test', AI_REQUEST_TIMEOUT=7):
+            client = ScoringService().openai_client
+            self.assertIs(ScoringService().openai_client, client)
+            self.assertEqual(client.timeout.read, 7)
+
+            close_openai_client()
+            self.assertIsNot(ScoringService().openai_client, client)
+
+        with self.settings(OPENAI_API_KEY=''):
+            self.assertIsNone(ScoringService().openai_client)
+
+
+@unittest.skipUnless(OPENAI_AVAILABLE, 'openai is not installed')
+class OpenAIStubTests(ScoringTestCase):
+    """ScoringService against the local stub over real HTTP"""
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(close_openai_client)
+
+    def score_through_stub(self, leads, **server_options):
+        with OpenAIStubServer(**server_options) as server, self.settings(
+            OPENAI_API_KEY='stub', OPENAI_BASE_URL=server.base_url, AI_CACHE_ENABLED=False,
+        ):
+            scored, errors = ScoringService().score_leads(leads, self.offer)
+            return server.stats(), scored, errors
+
+    def test_single_and_batched_prompts_are_answered(self):
+        leads = self.create_leads(3) + self.create_leads(2, role='Intern', industry='Retail')
+        for batch_size in (1, 3):
+            with self.subTest(batch_size=batch_size), self.settings(AI_PROMPT_BATCH_SIZE=batch_size):
+                stats, scored, errors = self.score_through_stub(leads)
+                self.assertEqual((len(scored), errors), (5, []))
+                self.assertEqual(stats['completions'], 5 if batch_size == 1 else 2)
+                for score in LeadScore.objects.filter(lead__in=leads):
+                    self.assertIn(score.ai_intent, ('High', 'Medium', 'Low'))
+                    self.assertFalse(score.ai_reasoning.startswith('AI unavailable'))
+                LeadScore.objects.all().delete()
+
+        self.assertEqual(canned_intent('same prompt'), canned_intent('same prompt'))
+
+    def test_throttling_and_errors_fall_back_after_retries(self):
+        leads = self.create_leads(2)
+        with self.settings(AI_MAX_RETRIES=1, AI_RETRY_BASE_DELAY=0, AI_CIRCUIT_FAILURE_THRESHOLD=100):
+            stats, scored, errors = self.score_through_stub(leads, rate_limit_rate=1.0, retry_after=0)
+            self.assertEqual((len(scored), stats['throttled'], stats['completions']), (2, 4, 0))
+            self.assertTrue(all(score.ai_reasoning.startswith('AI unavailable') for score in LeadScore.objects.all()))
+
+            LeadScore.objects.all().delete()
+            stats, scored, errors = self.score_through_stub(leads, error_rate=1.0)
+            self.assertEqual((len(scored), stats['errors'], stats['completions']), (2, 4, 0))
+
+
+@unittest.skipUnless(PROMETHEUS_AVAILABLE, 'prometheus_client is not installed')
+class MetricsTests(ScoringTestCase):
+
+    def sample(self, name, **labels):
+        from prometheus_client import REGISTRY
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_scoring_records_stages_and_outcomes(self):
+        leads = self.create_leads(3)
+        before = {
+            'success': self.sample('leadscoring_ai_requests_total', outcome='success'),
+            'error': self.sample('leadscoring_ai_requests_total', outcome='error'),
+            'fallback': self.sample('leadscoring_ai_fallbacks_total', reason='error'),
+            'scored': self.sample('leadscoring_leads_total', result='scored'),
+            'ai_request': self.sample('leadscoring_stage_seconds_count', stage='ai_request'),
+            'db_write': self.sample('leadscoring_stage_seconds_count', stage='db_write'),
+        }
+
+        with self.settings(AI_MAX_RETRIES=0):
+            make_service(fail_for=['Lead 2']).score_leads(leads, self.offer, concurrency=1)
+
+        self.assertEqual(self.sample('leadscoring_ai_requests_total', outcome='success') - before['success'], 2)
+        self.assertEqual(self.sample('leadscoring_ai_requests_total', outcome='error') - before['error'], 1)
+        self.assertEqual(self.sample('leadscoring_ai_fallbacks_total', reason='error') - before['fallback'], 1)
+        self.assertEqual(self.sample('leadscoring_leads_total', result='scored') - before['scored'], 3)
+        self.assertEqual(self.sample('leadscoring_stage_seconds_count', stage='ai_request') - before['ai_request'], 3)
+        self.assertEqual(self.sample('leadscoring_stage_seconds_count', stage='db_write') - before['db_write'], 1)
+
+    def test_metrics_endpoint_reports_uploads_and_requests(self):
+        client = APIClient()
+        created = self.sample('leadscoring_upload_rows_total', result='created')
+        rejected = self.sample('leadscoring_upload_rows_total', result='rejected')
+        content = 'name,role,company,industry,location,linkedin_bio\nAva,CTO,Co,SaaS,NYC,Bio\n,,,,,\n'
+        client.post('/leads/upload/', {'file': SimpleUploadedFile('leads.csv', content.encode())}, format='multipart')
+
+        self.assertEqual(self.sample('leadscoring_upload_rows_total', result='created') - created, 1)
+        self.assertEqual(self.sample('leadscoring_upload_rows_total', result='rejected') - rejected, 1)
+
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('leadscoring_upload_rows_per_second_count', body)
+        self.assertIn('leadscoring_request_seconds_count{method="POST",status="201",view="leads_upload"}', body)
+
+
+class AIResponseCacheTests(ScoringTestCase):
+
+    def test_rescoring_unchanged_batch_makes_no_ai_calls(self):
+        leads = self.create_leads(4)
+        service = make_service()
+        service.score_leads(leads, self.offer)
+        calls = service.openai_client.chat.completions.calls
+
+        ai_response_cache.clear()  # force the database tier
+        service.score_leads(leads, self.offer)
+
+        self.assertEqual(service.openai_client.chat.completions.calls, calls)
+        self.assertEqual(ai_response_cache.stats()['hits'], 4)
+
+    def test_fallbacks_are_not_cached(self):
+        leads = self.create_leads(1)
+        service = make_service(fail_for=('Lead 0',))
+        service.score_leads(leads, self.offer)
+        service.score_leads(leads, self.offer)
+
+        self.assertEqual(service.openai_client.chat.completions.calls, 2)
+
+
+class BulkScoreWriteTests(ScoringTestCase):
+
+    def test_bulk_write_matches_save(self):
+        leads = self.create_leads(2) + self.create_leads(2, role='Engineer', industry='Retail', linkedin_bio='')
+        service = ScoringService()
+        service.score_leads(leads[:1], self.offer)  # one existing row to update
+
+        with self.settings(SCORE_WRITE_BATCH_SIZE=3):
+            scored, errors = service.score_leads(leads, self.offer)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(LeadScore.objects.count(), 4)
+        for lead_score in LeadScore.objects.all():
+            total = lead_score.rule_score + lead_score.ai_score
+            self.assertEqual(lead_score.total_score, total)
+            self.assertEqual(lead_score.intent_label, 'High' if total >= 70 else 'Medium' if total >= 40 else 'Low')
+            self.assertEqual((lead_score.lead_name, lead_score.upload_batch), (lead_score.lead.name, 'batch_test'))
+            self.assertTrue(lead_score.reasoning)
+        self.assertEqual({s.pk for s in scored}, set(LeadScore.objects.values_list('pk', flat=True)))
+
+    def test_row_inserted_by_another_run_is_updated(self):
+        leads = self.create_leads(2)
+        derive = LeadScore.calculate_derived_fields
+        inserted = []
+
+        def racing_insert(score):
+            # Another run writes the first pair after this one looked for existing rows
+            if not inserted:
+                inserted.extend(LeadScore.objects.bulk_create([
+                    LeadScore(lead=leads[0], offer=self.offer, ai_intent='Low', ai_reasoning='Other run.',
+                              total_score=0, intent_label='Low')
+                ]))
+            derive(score)
+
+        with mock.patch.object(LeadScore, 'calculate_derived_fields', autospec=True, side_effect=racing_insert):
+            scored, errors = make_service().score_leads(leads, self.offer)
+
+        self.assertEqual((len(scored), errors), (2, []))
+        row = LeadScore.objects.get(lead=leads[0])
+        self.assertEqual((row.pk, row.ai_reasoning), (inserted[0].pk, 'Strong fit.'))
+        self.assertEqual({s.pk for s in scored}, set(LeadScore.objects.values_list('pk', flat=True)))
+
+
+class ResultsPaginationTests(ScoringTestCase):
+
+    def test_keyset_pages_cover_results_in_order(self):
+        leads = self.create_leads(7)
+        LeadScore.objects.bulk_create(
+            LeadScore(lead=lead, offer=self.offer, role_score=10 * (i % 2), ai_score=20, ai_intent='Medium',
+                      ai_reasoning='', total_score=20 + 10 * (i % 2), intent_label='Low', lead_name=lead.name)
+            for i, lead in enumerate(leads)
+        )
+        LeadScore.objects.update(created_at=LeadScore.objects.first().created_at)  # force ties
+        client = APIClient()
+
+        response = client.get('/results/', {'cursor': '', 'limit': 3, 'count': 'true'})
+        self.assertEqual(response.data['count'], 7)
+        names = [row['name'] for row in response.data['results']]
+        while response.data['next']:
+            response = client.get(response.data['next'])
+            self.assertNotIn('count', response.data)
+            names += [row['name'] for row in response.data['results']]
+
+        expected = LeadScore.objects.order_by('-total_score', '-created_at', '-id').values_list('lead__name', flat=True)
+        self.assertEqual(names, list(expected))
+
+    def test_invalid_cursor(self):
+        self.assertEqual(APIClient().get('/results/', {'cursor': 'bm9wZQ=='}).status_code, 404)
+
+
+class ResultsSummaryTests(ScoringTestCase):
+
+    def test_summary_aggregates_filtered_results_in_one_query(self):
+        leads = self.create_leads(4) + self.create_leads(1, batch='other')
+        rows = [
+            (20, 20, 10, 40, 'Strong fit.'),
+            (20, 10, 10, 25, 'AI unavailable - rule-based medium score (40/50)'),
+            (0, 0, 10, 15, 'Weak profile. (AI fallback scoring)'),
+            (10, 0, 0, 0, 'Unrelated role.'),
+            (20, 20, 10, 50, 'Other batch.'),
+        ]
+        for lead, (role, industry, completeness, ai, reasoning) in zip(leads, rows):
+            LeadScore.objects.create(lead=lead, offer=self.offer, role_score=role, industry_score=industry,
+                                     completeness_score=completeness, ai_score=ai, ai_intent='Medium',
+                                     ai_reasoning=reasoning)
+
+        with self.assertNumQueries(1):
+            data = APIClient().get('/results/summary/', {'batch_id': 'batch_test'}).data
+
+        self.assertEqual(data['count'], 4)
+        self.assertEqual(data['intents'], {'High': 1, 'Medium': 1, 'Low': 2})
+        histogram = {bucket['min']: bucket['count'] for bucket in data['score_histogram']}
+        self.assertEqual(histogram, {0: 0, 10: 1, 20: 1, 30: 0, 40: 0, 50: 0, 60: 1, 70: 0, 80: 0, 90: 1})
+        self.assertEqual(data['score_histogram'][-1], {'min': 90, 'max': 100, 'count': 1})
+        self.assertEqual(data['averages']['role_score'], 12.5)
+        self.assertEqual(data['averages']['total_score'], 47.5)
+        self.assertEqual(data['ai'], {'ai_scored': 2, 'fallback': {'disabled': 1, 'error': 1}, 'fallback_ratio': 0.5})
+
+        data = APIClient().get('/results/summary/', {'intent': 'High', 'offer_id': self.offer.id + 1}).data
+        self.assertEqual(data['count'], 0)
+        self.assertIsNone(data['averages']['ai_score'])
+        self.assertIsNone(data['ai']['fallback_ratio'])
+
+
+class ResultsExportTests(ScoringTestCase):
+
+    def test_export_streams_filtered_rows(self):
+        make_service().score_leads(self.create_leads(3) + self.create_leads(2, batch='other'), self.offer)
+
+        with self.settings(EXPORT_CHUNK_SIZE=2):
+            response = APIClient().get('/results/export/', {'batch_id': 'batch_test'})
+
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][0], 'Name')
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1][-1], 'Fits decision maker role, exact ICP match, complete data profile. Strong fit.')
+
+
+class ScoringJobTests(ScoringTestCase):
+
+    def test_background_score_is_run_by_worker(self):
+        self.create_leads(3)
+        client = APIClient()
+
+        response = client.post('/score/', {'offer_id': self.offer.id, 'batch_id': 'batch_test', 'background': True},
+                               format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(LeadScore.objects.count(), 0)
+
+        call_command('run_scoring_worker', '--once', stdout=StringIO())
+
+        job = client.get(f"/score/jobs/{response.data['job_id']}/").data
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual((job['scored_leads'], job['total_leads'], job['progress']), (3, 3, 100))
+        self.assertEqual(LeadScore.objects.count(), 3)
+
+    def test_job_is_claimed_once(self):
+        ScoringJob.objects.create(offer=self.offer)
+
+        self.assertIsNotNone(claim_next_job())
+        self.assertIsNone(claim_next_job())
+
+    def test_heartbeat_while_ai_requests_are_slow(self):
+        self.create_leads(2)
+        ScoringJob.objects.create(offer=self.offer, batch_id='batch_test')
+
+        # One write batch for the whole job, so only the heartbeat can update progress before the end
+        with self.settings(SCORE_WRITE_BATCH_SIZE=100), mock.patch('qualification.jobs.PROGRESS_INTERVAL_SECONDS', 0.02), \
+                CaptureQueriesContext(connection) as queries:
+            job = run_job(claim_next_job(), make_service(delay=0.15))
+
+        self.assertEqual(job.status, ScoringJob.STATUS_COMPLETED)
+        heartbeats = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "qualification_scoringjob"')
+                      and '"scored_leads"' in q['sql'] and '"status"' not in q['sql']]
+        self.assertGreaterEqual(len(heartbeats), 2)
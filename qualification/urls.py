@@ -1,13 +1,29 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'qualification'
 
+if settings.ASYNC_VIEWS:
+    from . import async_views
+    upload_view = async_views.AsyncLeadsUploadView.as_view()
+    score_view = async_views.AsyncScoreLeadsView.as_view()
+    results_view = async_views.AsyncResultsListView.as_view()
+    export_view = async_views.AsyncExportResultsView.as_view()
+else:
+    upload_view = views.LeadsUploadView.as_view()
+    score_view = views.ScoreLeadsView.as_view()
+    results_view = views.ResultsListView.as_view()
+    export_view = views.ExportResultsView.as_view()
+
 urlpatterns = [
     path('', views.api_status, name='api_status'),
     path('offer/', views.OfferCreateView.as_view(), name='offer_create'),
-    path('leads/upload/', views.LeadsUploadView.as_view(), name='leads_upload'),
-    path('score/', views.ScoreLeadsView.as_view(), name='score_leads'),
-    path('results/', views.ResultsListView.as_view(), name='results_list'),
-    path('results/export/', views.ExportResultsView.as_view(), name='results_export'),
-]
\ No newline at end of file
+    path('leads/upload/', upload_view, name='leads_upload'),
+    path('score/', score_view, name='score_leads'),
+    path('score/jobs/<int:job_id>/', views.ScoringJobDetailView.as_view(), name='scoring_job_detail'),
+    path('results/', results_view, name='results_list'),
+    path('results/summary/', views.ResultsSummaryView.as_view(), name='results_summary'),
+    path('results/export/', export_view, name='results_export'),
+    path('metrics', views.metrics, name='metrics'),
+]
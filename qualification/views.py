@@ -1,19 +1,30 @@
 import csv
 import io
+import json
 import uuid
 from datetime import datetime
-from django.http import HttpResponse
+from itertools import islice
+from django.db.models import Avg, Count, F, Q
+from django.http import HttpResponse, StreamingHttpResponse
 from rest_framework import status, generics
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 from django.conf import settings
-from .models import Offer, Lead, LeadScore
+from .models import Offer, Lead, LeadScore, ScoringJob
 from .serializers import (
     OfferSerializer, LeadSerializer, LeadScoreSerializer,
-    LeadResultSerializer, CSVUploadSerializer, ScoreRequestSerializer
+    LeadResultSerializer, CSVUploadSerializer, ScoreRequestSerializer,
+    ScoringJobSerializer
 )
-from .services import ScoringService
+from .ai_cache import ai_response_cache
+from .jobs import enqueue_scoring_job
+from .metrics import PROMETHEUS_AVAILABLE, render_metrics
+from .circuit_breaker import STATE_CLOSED, openai_breaker
+from .pagination import KeysetPagination
+from .rate_limit import openai_limiter
+from .services import CSVFormatError, LeadImportService, ScoringService
 
 
 class OfferCreateView(APIView):
@@ -35,67 +46,32 @@ class LeadsUploadView(APIView):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        csv_file = serializer.validated_data['file']
+        return Response(*self.import_upload(serializer.validated_data))
+    
+    @staticmethod
+    def import_upload(data):
+        """Import a validated upload; return (response data, status code)"""
+        csv_file = data['file']
         batch_id = f"batch_{uuid.uuid4().hex[:8]}_{int(datetime.now().timestamp())}"
         
         try:
-            # Read and parse CSV
-            file_content = csv_file.read().decode('utf-8')
-            csv_reader = csv.DictReader(io.StringIO(file_content))
-            
-            # Validate CSV headers
-            expected_headers = {'name', 'role', 'company', 'industry', 'location', 'linkedin_bio'}
-            actual_headers = set(csv_reader.fieldnames or [])
+            import_service = LeadImportService(batch_id, dedup_policy=data.get('dedup'))
+            leads_created, errors = import_service.import_csv(csv_file)
             
-            if not expected_headers.issubset(actual_headers):
-                missing_headers = expected_headers - actual_headers
-                return Response(
-                    {'error': f'Missing required CSV columns: {", ".join(missing_headers)}'},
-                    status=status.HTTP_400_BAD_REQUEST
+            if leads_created == 0 and import_service.duplicates_skipped:
+                return (
+                    {
+                        'message': 'All leads were already uploaded',
+                        'leads_created': 0,
+                        'duplicates_skipped': import_service.duplicates_skipped
+                    },
+                    status.HTTP_200_OK
                 )
             
-            # Process leads
-            leads_created = 0
-            errors = []
-            
-            for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 for header
-                try:
-                    # Clean and validate row data
-                    lead_data = {
-                        'name': row.get('name', '').strip(),
-                        'role': row.get('role', '').strip(),
-                        'company': row.get('company', '').strip(),
-                        'industry': row.get('industry', '').strip(),
-                        'location': row.get('location', '').strip(),
-                        'linkedin_bio': row.get('linkedin_bio', '').strip(),
-                        'upload_batch': batch_id
-                    }
-                    
-                    # Skip empty rows
-                    if not any(lead_data[field] for field in ['name', 'company']):
-                        continue
-                    
-                    # Validate required fields
-                    if not lead_data['name']:
-                        errors.append(f"Row {row_num}: Name is required")
-                        continue
-                    
-                    # Create lead
-                    Lead.objects.create(**lead_data)
-                    leads_created += 1
-                    
-                    # Check upload limit
-                    if leads_created >= settings.MAX_LEADS_PER_UPLOAD:
-                        break
-                        
-                except Exception as e:
-                    errors.append(f"Row {row_num}: {str(e)}")
-                    continue
-            
             if leads_created == 0:
-                return Response(
+                return (
                     {'error': 'No valid leads found in CSV', 'details': errors},
-                    status=status.HTTP_400_BAD_REQUEST
+                    status.HTTP_400_BAD_REQUEST
                 )
             
             response_data = {
@@ -104,31 +80,63 @@ class LeadsUploadView(APIView):
                 'leads_created': leads_created
             }
             
+            if import_service.duplicates_linked:
+                response_data['duplicates_linked'] = import_service.duplicates_linked
+            if import_service.duplicates_skipped:
+                response_data['duplicates_skipped'] = import_service.duplicates_skipped
+            
             if errors:
                 response_data['warnings'] = errors[:10]  # Limit error messages
             
-            return Response(response_data, status=status.HTTP_201_CREATED)
+            return response_data, status.HTTP_201_CREATED
             
+        except CSVFormatError as e:
+            return {'error': str(e)}, status.HTTP_400_BAD_REQUEST
         except Exception as e:
-            return Response(
-                {'error': f'Failed to process CSV file: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            return {'error': f'Failed to process CSV file: {str(e)}'}, status.HTTP_400_BAD_REQUEST
+
+
+def ndjson_event(event: str, data: dict) -> str:
+    return json.dumps({'type': event, **data}, cls=JSONEncoder) + '\n'
+
+
+def sse_event(event: str, data: dict) -> str:
+    if event == 'heartbeat':
+        # A comment line: keeps proxies from timing out, ignored by EventSource
+        return ': heartbeat\n\n'
+    return f"event: {event}\ndata: {json.dumps(data, cls=JSONEncoder)}\n\n"
 
 
 class ScoreLeadsView(APIView):
-    """POST /score - Run scoring on uploaded leads"""
+    """POST /score - Run scoring on uploaded leads
+    
+    With ``"stream": "ndjson"`` or ``"sse"`` the response is streamed: a
+    start record, each lead's score as soon as it is written, error records,
+    heartbeats while AI calls are slow, and a final summary record.
+    """
+    
+    STREAM_FORMATS = {
+        'ndjson': ('application/x-ndjson', ndjson_event),
+        'sse': ('text/event-stream', sse_event),
+    }
     
     def post(self, request):
         serializer = ScoreRequestSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        offer_id = serializer.validated_data['offer_id']
+        offer_id = serializer.validated_data.get('offer_id')
+        offer_ids = serializer.validated_data.get('offer_ids')
         batch_id = serializer.validated_data.get('batch_id')
+        force = serializer.validated_data['force']
         
         try:
-            offer = Offer.objects.get(id=offer_id)
+            if offer_ids:
+                # Several offers: every lead is scored against each of them
+                offers = Offer.objects.in_bulk(offer_ids)
+                offers = [offers[pk] for pk in offer_ids]
+            else:
+                offers = [Offer.objects.get(id=offer_id)]
             
             # Determine which leads to score
             if batch_id:
@@ -147,34 +155,25 @@ class ScoreLeadsView(APIView):
                         status=status.HTTP_404_NOT_FOUND
                     )
             
+            # Hand large batches to the worker and return straight away
+            if serializer.validated_data['background']:
+                total_leads = leads.count()
+                jobs = [enqueue_scoring_job(offer, batch_id, total_leads=total_leads, force=force) for offer in offers]
+                return Response(self.queued(jobs, total_leads, serializer.validated_data),
+                                status=status.HTTP_202_ACCEPTED)
+            
             # Initialize scoring service
             scoring_service = ScoringService()
             
-            # Score leads
-            scored_count = 0
-            errors = []
+            if serializer.validated_data.get('stream'):
+                return self.stream_response(scoring_service, leads, offers, serializer.validated_data)
             
-            for lead in leads:
-                try:
-                    scoring_service.score_lead(lead, offer)
-                    scored_count += 1
-                except Exception as e:
-                    errors.append(f"Lead {lead.id} ({lead.name}): {str(e)}")
-                    continue
-            
-            response_data = {
-                'message': f'Successfully scored {scored_count} leads',
-                'total_leads': leads.count(),
-                'scored_leads': scored_count,
-                'offer_id': offer_id
-            }
-            
-            if batch_id:
-                response_data['batch_id'] = batch_id
-            
-            if errors:
-                response_data['errors'] = errors[:10]  # Limit error messages
+            # Score leads (AI calls run concurrently, see AI_SCORING_CONCURRENCY);
+            # unless forced, leads whose score is still current are skipped
+            scored_leads, errors = scoring_service.score_leads_for_offers(leads, offers, incremental=not force)
             
+            response_data = self.summary(scoring_service, leads.count(), len(scored_leads), errors,
+                                         offers, serializer.validated_data)
             return Response(response_data, status=status.HTTP_200_OK)
             
         except Offer.DoesNotExist:
@@ -187,116 +186,276 @@ class ScoreLeadsView(APIView):
                 {'error': f'Scoring failed: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+    
+    @staticmethod
+    def queued(jobs, total_leads, data):
+        offer_ids = data.get('offer_ids')
+        if offer_ids:
+            # One job per offer
+            response_data = {
+                'message': f'{len(jobs)} scoring jobs queued',
+                'job_ids': [job.id for job in jobs],
+                'offer_ids': offer_ids,
+            }
+        else:
+            response_data = {
+                'message': 'Scoring job queued',
+                'job_id': jobs[0].id,
+                'offer_id': data.get('offer_id'),
+            }
+        response_data.update({'status': jobs[0].status, 'total_leads': total_leads, 'batch_id': data.get('batch_id')})
+        return response_data
+    
+    @staticmethod
+    def summary(scoring_service, total_leads, scored_count, errors, offers, data):
+        offer_ids = data.get('offer_ids')
+        batch_id = data.get('batch_id')
+        response_data = {
+            'message': f'Successfully scored {scored_count} leads',
+            'total_leads': total_leads,
+            'scored_leads': scored_count,
+            'skipped_leads': scoring_service.skipped_leads,
+        }
+        if offer_ids:
+            # Counts are (lead, offer) scores
+            response_data['message'] = f'Successfully wrote {scored_count} scores for {len(offers)} offers'
+            response_data['offer_ids'] = offer_ids
+        else:
+            response_data['offer_id'] = data.get('offer_id')
+        
+        if batch_id:
+            response_data['batch_id'] = batch_id
+        
+        if errors:
+            response_data['errors'] = errors[:10]  # Limit error messages
+        
+        return response_data
+    
+    def stream_response(self, scoring_service, leads, offers, data):
+        content_type, encode = self.STREAM_FORMATS[data['stream']]
+        response = StreamingHttpResponse(
+            self.stream_events(scoring_service, leads, offers, data, encode), content_type=content_type
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx-style proxies from buffering the stream
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    def stream_events(self, scoring_service, leads, offers, data, encode):
+        total_leads = leads.count()
+        yield encode('start', {'total_leads': total_leads, 'offer_ids': [offer.id for offer in offers]})
+        
+        scored_count = 0
+        errors = []
+        try:
+            batches = scoring_service.iter_score_batches(
+                leads, offers, incremental=not data['force'],
+                flush_seconds=settings.SCORE_STREAM_FLUSH_SECONDS,
+                heartbeat_seconds=settings.SCORE_STREAM_HEARTBEAT_SECONDS,
+            )
+            for batch in batches:
+                if batch is None:
+                    yield encode('heartbeat', {})
+                    continue
+                saved, failed = batch
+                scored_count += len(saved)
+                errors.extend(failed)
+                chunk = ''.join(
+                    encode('score', {'lead_id': score.lead_id, **LeadResultSerializer(score).data}) for score in saved
+                ) + ''.join(encode('error', {'error': message}) for message in failed)
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            # Headers are long gone; report the failure in-band and stop
+            yield encode('error', {'error': f'Scoring failed: {str(e)}', 'fatal': True})
+            return
+        
+        yield encode('summary', self.summary(scoring_service, total_leads, scored_count, errors, offers, data))
+
+
+class ScoringJobDetailView(generics.RetrieveAPIView):
+    """GET /score/jobs/<id> - Report background scoring progress"""
+    serializer_class = ScoringJobSerializer
+    queryset = ScoringJob.objects.all()
+    lookup_url_kwarg = 'job_id'
+
+
+def filter_results(queryset, params):
+    """Apply the offer_id, batch_id and intent filters shared by /results and /results/export"""
+    # Filter by offer_id if provided
+    offer_id = params.get('offer_id')
+    if offer_id:
+        queryset = queryset.filter(offer_id=offer_id)
+    
+    # Filter by batch_id if provided
+    batch_id = params.get('batch_id')
+    if batch_id:
+        queryset = queryset.filter(upload_batch=batch_id)
+    
+    # Filter by intent if provided
+    intent = params.get('intent')
+    if intent in ['High', 'Medium', 'Low']:
+        queryset = queryset.filter(intent_label=intent)
+    
+    return queryset
 
 
 class ResultsListView(generics.ListAPIView):
     """GET /results - Return scored leads"""
     serializer_class = LeadResultSerializer
     
+    # Serialized fields plus the keyset ordering columns
+    COLUMNS = ['lead_name', 'lead_role', 'lead_company', 'offer', 'intent_label', 'total_score', 'reasoning',
+               'created_at']
+    
+    @property
+    def paginator(self):
+        # ?cursor= (empty for the first page) switches from limit/offset to keyset pages
+        if KeysetPagination.cursor_query_param in self.request.query_params:
+            self.pagination_class = KeysetPagination
+        return super().paginator
+    
     def get_queryset(self):
-        queryset = LeadScore.objects.select_related('lead', 'offer')
-        
-        # Filter by offer_id if provided
-        offer_id = self.request.query_params.get('offer_id')
-        if offer_id:
-            queryset = queryset.filter(offer_id=offer_id)
-        
-        # Filter by batch_id if provided
-        batch_id = self.request.query_params.get('batch_id')
-        if batch_id:
-            queryset = queryset.filter(lead__upload_batch=batch_id)
+        queryset = LeadScore.objects.only(*self.COLUMNS)
+        return filter_results(queryset, self.request.query_params)
+
+
+class ResultsSummaryView(APIView):
+    """GET /results/summary - Aggregates over the filtered results
+    
+    Intent counts, a total_score histogram, component averages and how many
+    scores came from the AI rather than the rule-based fallback, computed
+    by the database in a single aggregate query.
+    """
+    
+    BUCKET_SIZE = 10
+    AVERAGED = ['role_score', 'industry_score', 'completeness_score', 'ai_score', 'total_score']
+    # ai_reasoning written by ScoringService when it scored by rules instead
+    FALLBACKS = {
+        'disabled': Q(ai_reasoning__endswith='(AI fallback scoring)'),
+        'error': Q(ai_reasoning__startswith='AI unavailable'),
+    }
+    
+    @classmethod
+    def buckets(cls):
+        """(low, high) total_score ranges; the last one includes 100"""
+        lows = range(0, 100, cls.BUCKET_SIZE)
+        return [(low, low + cls.BUCKET_SIZE - 1 if low + cls.BUCKET_SIZE < 100 else 100) for low in lows]
+    
+    @classmethod
+    def summarize(cls, params):
+        aggregates = {'count': Count('id')}
+        for intent, _ in LeadScore.INTENT_CHOICES:
+            aggregates[f'intent_{intent}'] = Count('id', filter=Q(intent_label=intent))
+        for low, high in cls.buckets():
+            aggregates[f'bucket_{low}'] = Count('id', filter=Q(total_score__gte=low, total_score__lte=high))
+        for field in cls.AVERAGED:
+            aggregates[f'avg_{field}'] = Avg(field)
+        for reason, condition in cls.FALLBACKS.items():
+            aggregates[f'fallback_{reason}'] = Count('id', filter=condition)
         
-        # Filter by intent if provided
-        intent = self.request.query_params.get('intent')
-        if intent in ['High', 'Medium', 'Low']:
-            queryset = queryset.filter(intent_label=intent)
+        totals = filter_results(LeadScore.objects.all(), params).aggregate(**aggregates)
         
-        return queryset
+        count = totals['count']
+        fallbacks = {reason: totals[f'fallback_{reason}'] for reason in cls.FALLBACKS}
+        fallback_count = sum(fallbacks.values())
+        return {
+            'count': count,
+            'intents': {intent: totals[f'intent_{intent}'] for intent, _ in LeadScore.INTENT_CHOICES},
+            'score_histogram': [
+                {'min': low, 'max': high, 'count': totals[f'bucket_{low}']} for low, high in cls.buckets()
+            ],
+            'averages': {
+                field: round(totals[f'avg_{field}'], 1) if totals[f'avg_{field}'] is not None else None
+                for field in cls.AVERAGED
+            },
+            'ai': {
+                'ai_scored': count - fallback_count,
+                'fallback': fallbacks,
+                'fallback_ratio': round(fallback_count / count, 4) if count else None,
+            },
+        }
+    
+    def get(self, request):
+        return Response(self.summarize(request.query_params))
 
 
 class ExportResultsView(APIView):
-    """GET /results/export - Export results as CSV"""
+    """GET /results/export - Export results as CSV
+    
+    Rows are streamed: the precomputed result columns are read with a
+    server-side iterator and written out EXPORT_CHUNK_SIZE rows at a time,
+    so memory stays flat however many rows match.
+    """
+    
+    HEADER = [
+        'Name', 'Role', 'Company', 'Industry', 'Location',
+        'Intent', 'Score', 'Rule Score', 'AI Score', 'Reasoning'
+    ]
+    COLUMNS = [
+        'lead_name', 'lead_role', 'lead_company', 'lead_industry', 'lead_location',
+        'intent_label', 'total_score', 'rule_score_value', 'ai_score', 'reasoning',
+    ]
+    
+    @classmethod
+    def export_queryset(cls, params):
+        # Same filters as results
+        queryset = filter_results(LeadScore.objects.all(), params).annotate(
+            rule_score_value=F('role_score') + F('industry_score') + F('completeness_score')
+        )
+        return queryset.values_list(*cls.COLUMNS)
     
     def get(self, request):
-        # Get same queryset as results
-        queryset = LeadScore.objects.select_related('lead', 'offer')
-        
-        # Apply same filters
-        offer_id = request.query_params.get('offer_id')
-        if offer_id:
-            queryset = queryset.filter(offer_id=offer_id)
+        rows = self.export_queryset(request.query_params).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
         
-        batch_id = request.query_params.get('batch_id')
-        if batch_id:
-            queryset = queryset.filter(lead__upload_batch=batch_id)
-        
-        intent = request.query_params.get('intent')
-        if intent in ['High', 'Medium', 'Low']:
-            queryset = queryset.filter(intent_label=intent)
-        
-        # Create CSV response
-        response = HttpResponse(content_type='text/csv')
+        response = StreamingHttpResponse(self.stream_csv(rows), content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="lead_scores.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Name', 'Role', 'Company', 'Industry', 'Location', 
-            'Intent', 'Score', 'Rule Score', 'AI Score', 'Reasoning'
-        ])
-        
-        for score in queryset:
-            # Generate reasoning like in serializer
-            rule_reasoning = []
-            if score.role_score == 20:
-                rule_reasoning.append("decision maker role")
-            elif score.role_score == 10:
-                rule_reasoning.append("influencer role")
-            
-            if score.industry_score == 20:
-                rule_reasoning.append("exact ICP match")
-            elif score.industry_score == 10:
-                rule_reasoning.append("adjacent industry")
-            
-            if score.completeness_score > 0:
-                rule_reasoning.append("complete data profile")
-            
-            rule_part = ", ".join(rule_reasoning)
-            if rule_part and score.ai_reasoning:
-                reasoning = f"Fits {rule_part}. {score.ai_reasoning}"
-            elif rule_part:
-                reasoning = f"Fits {rule_part}."
-            else:
-                reasoning = score.ai_reasoning or "Basic scoring applied."
-            
-            writer.writerow([
-                score.lead.name,
-                score.lead.role,
-                score.lead.company,
-                score.lead.industry,
-                score.lead.location,
-                score.intent_label,
-                score.total_score,
-                score.rule_score,
-                score.ai_score,
-                reasoning
-            ])
-        
         return response
+    
+    def stream_csv(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.HEADER)
+        
+        while True:
+            writer.writerows(islice(rows, settings.EXPORT_CHUNK_SIZE))
+            chunk = buffer.getvalue()
+            if not chunk:
+                return
+            yield chunk
+            buffer.seek(0)
+            buffer.truncate()
 
 
 # API status and health check
 @api_view(['GET'])
 def api_status(request):
     """GET / - API status and health check"""
+    ai_circuit = openai_breaker.stats()
     return Response({
-        'status': 'healthy',
+        # Still serving; scoring falls back to rules while the AI circuit is open
+        'status': 'healthy' if ai_circuit['state'] == STATE_CLOSED else 'degraded',
         'service': 'Lead Qualification API',
         'version': '1.0.0',
         'endpoints': {
             'POST /offer': 'Create product/offer',
             'POST /leads/upload': 'Upload leads CSV',
             'POST /score': 'Score leads',
+            'GET /score/jobs/<id>': 'Get background scoring job progress',
             'GET /results': 'Get scored results',
-            'GET /results/export': 'Export results as CSV'
-        }
+            'GET /results/summary': 'Get intent, score and AI fallback aggregates',
+            'GET /results/export': 'Export results as CSV',
+            'GET /metrics': 'Prometheus metrics'
+        },
+        'ai_cache': ai_response_cache.stats(),
+        'ai_rate_limit': openai_limiter.stats(),
+        'ai_circuit': ai_circuit
     })
+
+
+def metrics(request):
+    """GET /metrics - Prometheus text exposition, summed across worker processes"""
+    if not PROMETHEUS_AVAILABLE:
+        return HttpResponse('prometheus_client is not installed\n', status=503, content_type='text/plain')
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)